@@ -1,6 +1,8 @@
+import os
 from flask import Flask
 from database import close_db, init_db
-from routes import main_bp, tree_bp, habit_bp
+from routes import main_bp, tree_bp, habit_bp, batch_bp, backup_bp
+from services import SchedulerService, init_metrics
 
 def create_app():
     """Application factory function"""
@@ -14,14 +16,26 @@ def create_app():
     app.register_blueprint(main_bp)
     app.register_blueprint(tree_bp)
     app.register_blueprint(habit_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(backup_bp)
     
     # Register teardown handler
     app.teardown_appcontext(close_db)
     
+    # Per-route latency and SQL instrumentation, served at /metrics
+    init_metrics(app)
+    
+    # Daily rollover scheduler, started once the database is initialized
+    app.extensions['scheduler'] = SchedulerService(app)
+    
     return app
 
 if __name__ == '__main__':
     app = create_app()
     with app.app_context():
         init_db()
+    
+    # The debug reloader runs this file twice; only schedule in the serving process
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        app.extensions['scheduler'].start()
     app.run(debug=True)
\ No newline at end of file
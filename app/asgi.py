@@ -0,0 +1,222 @@
+"""ASGI entry point: the same Flask blueprints, served without blocking on the database.
+
+Serve it with any ASGI server from the app directory, for example:
+
+    uvicorn asgi:app
+
+Flask views run in a bounded thread pool, so slow commits and SQLite lock waits only
+occupy a worker thread, never the event loop. Request bodies are read by the view as they
+arrive and responses are sent as they are produced, so an import or export streams through
+in constant memory. /events streams are served on the event loop itself, so a single
+process holds any number of them without a thread each.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import ClientDisconnected, HTTPException
+from app import create_app
+from config import ASGI_WORKER_THREADS, ASGI_RESPONSE_BATCH_BYTES, SSE_KEEPALIVE_SECONDS
+
+class AsgiApp:
+    """Adapts the Flask app to ASGI"""
+    def __init__(self, flask_app, max_workers=ASGI_WORKER_THREADS):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='asgi-worker')
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['path'] == '/events':
+                await self.stream_events(scope, receive, send)
+            else:
+                await self.handle_request(scope, receive, send)
+    
+    async def run_sync(self, function, *args):
+        """Run blocking work, such as anything touching the database, in the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+    
+    async def lifespan(self, receive, send):
+        """Initialize the database and run the rollover scheduler for as long as the server is up"""
+        scheduler = self.flask_app.extensions['scheduler']
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.run_sync(self.init_db)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                scheduler.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.run_sync(scheduler.stop)
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    def init_db(self):
+        """Create or migrate the schema before the first request"""
+        from database import init_db
+        with self.flask_app.app_context():
+            init_db()
+    
+    async def handle_request(self, scope, receive, send):
+        """Run a Flask view in the worker pool, streaming the request body in and its response out.
+        
+        Neither is ever held whole: the view pulls the body from the connection as it reads it,
+        and the response goes out a batch of chunks at a time as the view produces them.
+        """
+        environ = build_environ(scope, io.BufferedReader(RequestBody(receive, asyncio.get_running_loop())))
+        response = await self.run_sync(WsgiResponse, self.flask_app, environ)
+        try:
+            # The first read also covers apps that only call start_response once iterated
+            body, more_body = await self.run_sync(response.read)
+            await send({'type': 'http.response.start', 'status': response.status, 'headers': response.headers})
+            while more_body:
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+                body, more_body = await self.run_sync(response.read)
+            await send({'type': 'http.response.body', 'body': body})
+        finally:
+            await self.run_sync(response.close)
+    
+    def resolve_garden(self, environ):
+        """Find the garden a request is scoped to, the way get_garden_id does"""
+        from database import get_garden_id
+        with self.flask_app.request_context(environ):
+            return get_garden_id()
+    
+    async def stream_events(self, scope, receive, send):
+        """Serve the garden's change events as Server-Sent Events straight from the event loop"""
+        from routes.main import format_sse
+        from services.event_service import AsyncSubscription, event_broker
+        
+        try:
+            garden_id = await self.run_sync(self.resolve_garden, build_environ(scope, io.BytesIO()))
+        except HTTPException as e:
+            await send({'type': 'http.response.start', 'status': e.code, 'headers': [(b'content-type', b'text/plain')]})
+            await send({'type': 'http.response.body', 'body': (e.description or '').encode()})
+            return
+        
+        subscription = event_broker.subscribe(garden_id, AsyncSubscription)
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no')
+            ]})
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+            
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(subscription.get(timeout=SSE_KEEPALIVE_SECONDS))
+                await asyncio.wait([next_event, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    next_event.cancel()
+                    break
+                
+                event = next_event.result()
+                message = format_sse(event) if event is not None else ": keepalive\n\n"
+                await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+        finally:
+            disconnected.cancel()
+            subscription.close()
+
+class RequestBody(io.RawIOBase):
+    """A request body read from a worker thread, pulling each ASGI message off the event loop only when the view reads that far"""
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.chunk = memoryview(b'')
+        self.finished = False
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        while not self.chunk and not self.finished:
+            message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            self.chunk = memoryview(message.get('body', b''))
+            self.finished = not message.get('more_body', False)
+        
+        size = min(len(buffer), len(self.chunk))
+        buffer[:size] = self.chunk[:size]
+        self.chunk = self.chunk[size:]
+        return size
+
+class WsgiResponse:
+    """Calls a WSGI app and reads its response in batches, from worker threads, so it never has to be held whole"""
+    def __init__(self, wsgi_app, environ):
+        self.status = None
+        self.headers = None
+        self.iterable = wsgi_app(environ, self.start_response)
+        self.chunks = iter(self.iterable)
+    
+    def start_response(self, status, headers, exc_info=None):
+        self.status = int(status.split(' ', 1)[0])
+        self.headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    
+    def read(self):
+        """Return (body, more_body): the next chunks, joined until they reach ASGI_RESPONSE_BATCH_BYTES, and whether any are left"""
+        parts, size = [], 0
+        for chunk in self.chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= ASGI_RESPONSE_BATCH_BYTES:
+                return b''.join(parts), True
+        return b''.join(parts), False
+    
+    def close(self):
+        if hasattr(self.iterable, 'close'):
+            self.iterable.close()
+
+async def wait_for_disconnect(receive):
+    """Return once the client has gone away"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+def build_environ(scope, body):
+    """Build a WSGI environ for an ASGI http scope, reading the request body from the body stream"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    
+    # The stream ends with the body, so chunked requests without a length can be read too
+    environ['wsgi.input_terminated'] = True
+    return environ
+
+app = AsgiApp(create_app())
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("The async serving mode needs an ASGI server, e.g. pip install uvicorn, then run: uvicorn asgi:app")
+    uvicorn.run(app)
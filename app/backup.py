@@ -0,0 +1,98 @@
+"""Back up, export and import the save file while the app keeps running.
+
+Run from the app directory:
+
+    python backup.py backup                      # copy the save file into backups/
+    python backup.py export --output gardens.ndjson
+    python backup.py export --garden 3 > garden_3.ndjson
+    python backup.py import garden_3.ndjson --garden 5
+
+backup copies the whole file with SQLite's online backup API from one read snapshot, a few pages
+at a time, so writers are never locked out and the copy is never torn. export writes gardens,
+their trees, habits, habit history and weather as NDJSON, and import replaces gardens with
+the ones in such a file; both stream one row at a time, so memory use stays flat however
+long the habit history is.
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import time
+from config import DATABASE, BACKUP_DIRECTORY, BACKUP_PAGES_PER_STEP
+from database.backup import backup_database, export_gardens, import_gardens
+
+def connect(path):
+    """Open the save file the way the app does"""
+    from database.connection import ConnectionPool
+    return ConnectionPool(path, 1, instrumented=False).connect()
+
+def run_backup(args):
+    target = args.output or os.path.join(BACKUP_DIRECTORY, f"habit_tree_{datetime.datetime.utcnow():%Y%m%dT%H%M%S%f}.db")
+    
+    def progress(copied, total):
+        print(f"\r{copied}/{total} pages", end='', file=sys.stderr)
+    
+    db = connect(args.database)
+    try:
+        start = time.perf_counter()
+        pages = backup_database(db, target, pages=args.pages, progress=progress)
+    finally:
+        db.close()
+    print(f"\nBacked up {pages} pages to {target} in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 0
+
+def run_export(args):
+    db = connect(args.database)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        output.writelines(export_gardens(db, args.garden))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        db.close()
+    return 0
+
+def run_import(args):
+    from database.schema import migrate
+    
+    db = connect(args.database)
+    source = open(args.file, 'rb') if args.file != '-' else sys.stdin.buffer
+    try:
+        migrate(db)
+        imported = import_gardens(db, source, garden_id=args.garden)
+    except (ValueError, sqlite3.IntegrityError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        db.close()
+    print(f"Imported gardens {', '.join(map(str, imported)) or 'none'}", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python backup.py', description="Back up, export and import the save file.")
+    parser.add_argument('--database', default=DATABASE, help="Save file to work on")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    backup = commands.add_parser('backup', help="Copy the whole save file with the online backup API")
+    backup.add_argument('--output', help=f"Backup file (default: a timestamped file in {BACKUP_DIRECTORY}/)")
+    backup.add_argument('--pages', type=int, default=BACKUP_PAGES_PER_STEP, help="Pages copied per step")
+    backup.set_defaults(run=run_backup)
+    
+    export = commands.add_parser('export', help="Write gardens as NDJSON")
+    export.add_argument('--garden', type=int, action='append', help="Garden to export, may be repeated (default: every garden)")
+    export.add_argument('--output', help="NDJSON file to write (default: standard output)")
+    export.set_defaults(run=run_export)
+    
+    load = commands.add_parser('import', help="Replace gardens with the ones in an NDJSON export")
+    load.add_argument('file', help="NDJSON export to read, - for standard input")
+    load.add_argument('--garden', type=int, help="Import the export's single garden into this garden instead of its own")
+    load.set_defaults(run=run_import)
+    
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
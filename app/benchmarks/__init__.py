@@ -0,0 +1,2 @@
+from .fixtures import GardenFixture, fill_garden
+from .suite import Benchmark, run_suite, compare
@@ -0,0 +1,80 @@
+"""Run the hot path benchmarks against a synthetic garden.
+
+Run from the app directory:
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --trees 10 --habits 500 --save-baseline
+
+Results are written as JSON and compared against benchmarks/baseline.json when it exists;
+the exit status is 1 if any benchmark's median regressed past the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+from benchmarks import GardenFixture, run_suite, compare
+from config import WEATHER_FORECAST_DAYS
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Time the garden's hot paths.")
+    parser.add_argument('--trees', type=int, default=10, help="Trees planted in the garden")
+    parser.add_argument('--habits', type=int, default=50, help="Habits in the garden")
+    parser.add_argument('--weekday-spread', type=int, default=4, choices=range(1, 8), help="Weekdays each habit is scheduled on")
+    parser.add_argument('--weather-days', type=int, default=WEATHER_FORECAST_DAYS, help="Days in the weather forecast window")
+    parser.add_argument('--history-days', type=int, default=365, help="Days of habit completion history")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the generated garden")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per benchmark")
+    parser.add_argument('--only', nargs='+', help="Only run the named benchmarks")
+    parser.add_argument('--output', help="Write the results JSON to this file")
+    parser.add_argument('--baseline', default=BASELINE, help="Baseline results to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Median slowdown ratio that counts as a regression")
+    args = parser.parse_args(argv)
+    
+    fixture = GardenFixture(
+        trees=args.trees,
+        habits=args.habits,
+        weekday_spread=args.weekday_spread,
+        weather_days=args.weather_days,
+        history_days=args.history_days,
+        seed=args.seed
+    )
+    results = run_suite(fixture, repeat=args.repeat, only=args.only)
+    
+    for name, stats in results["benchmarks"].items():
+        print(f"{name:<28} median {stats['median'] * 1000:9.3f} ms   min {stats['min'] * 1000:9.3f} ms")
+    
+    if args.output:
+        _write_json(args.output, results)
+    
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        return 0
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("fixture") != results["fixture"]:
+        print("Warning: baseline was recorded with a different fixture, ratios are not comparable")
+    
+    regressions = 0
+    print(f"\nCompared to {args.baseline} (threshold {args.threshold:.2f}x):")
+    for name, previous, current, ratio, regressed in compare(results, baseline, args.threshold):
+        regressions += regressed
+        flag = "REGRESSED" if regressed else "ok"
+        print(f"{name:<28} {previous * 1000:9.3f} ms -> {current * 1000:9.3f} ms   {ratio:5.2f}x  {flag}")
+    return 1 if regressions else 0
+
+def _write_json(path, results):
+    """Write results as pretty printed JSON"""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import datetime
+import random
+from models.habit import WEEKDAYS, days_to_mask
+from config import DEFAULT_GARDEN_ID, WEATHER_FORECAST_DAYS
+
+class GardenFixture:
+    """Sizes of a synthetic garden used to seed a benchmark database"""
+    def __init__(self, trees=10, habits=50, weekday_spread=4, weather_days=WEATHER_FORECAST_DAYS, history_days=365, level=10, water=10 ** 9, seed=0):
+        self.trees = trees
+        self.habits = habits
+        self.weekday_spread = weekday_spread
+        self.weather_days = weather_days
+        self.history_days = history_days
+        self.level = level
+        self.water = water
+        self.seed = seed
+    
+    def as_dict(self):
+        """Describe the fixture for the results file"""
+        return dict(vars(self))
+
+def fill_garden(db, fixture, garden_id=DEFAULT_GARDEN_ID):
+    """Fill one garden of an initialized database according to the fixture.
+    
+    Rows are bulk inserted in a single transaction, so even large gardens build quickly.
+    """
+    from database.schema import ensure_garden
+    
+    ensure_garden(db, garden_id)
+    with db:
+        _fill_garden(db, garden_id, fixture, random.Random(fixture.seed))
+
+def _fill_garden(db, garden_id, fixture, rng):
+    """Insert the fixture's trees, habits, habit history and weather history (does not commit)"""
+    from models import WeatherModel
+    from services.weather_service import WeatherService
+    
+    db.execute('UPDATE Garden SET Level = ?, Water = ? WHERE Id = ?', (fixture.level, fixture.water, garden_id))
+    
+    start = datetime.datetime.now() - datetime.timedelta(days=fixture.trees)
+    db.executemany('''
+        INSERT INTO Trees (Name, Creation_Date, Stage, Water, Water_Required, Last_Watered, Moisture, Garden_Id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (
+            f"Tree {i}", (start + datetime.timedelta(minutes=i)).isoformat(), rng.randint(1, 5),
+            rng.randint(0, 40), 50, start.isoformat(), rng.randint(0, 100), garden_id
+        )
+        for i in range(fixture.trees)
+    ])
+    
+    # The first habit runs every day, so there is always one active habit to complete
+    habits = []
+    for i in range(fixture.habits):
+        spread = 7 if i == 0 else fixture.weekday_spread
+        scheduled = rng.sample(WEEKDAYS, spread)
+        days = ','.join(day for day in WEEKDAYS if day in scheduled)
+        habits.append((garden_id, habit_name(i), rng.randint(0, 5), days, days_to_mask(days)))
+    db.executemany('''
+        INSERT INTO Habits (Garden_Id, Name, Creation_Date, Priority, Days_Of_The_Week, Days_Mask, Completed)
+        VALUES (?, ?, datetime('now'), ?, ?, ?, 0)
+    ''', habits)
+    
+    # Every habit has a history entry on each of its scheduled days, completed 60% of the time
+    today = datetime.date.today()
+    history = []
+    for _, name, priority, _, mask in habits:
+        for offset in range(1, fixture.history_days + 1):
+            day = today - datetime.timedelta(days=offset)
+            if mask & (1 << day.weekday()):
+                completed = rng.random() < 0.6
+                history.append((garden_id, name, day.isoformat(), priority, completed, rng.randint(1, 10) if completed else 0))
+    db.executemany('''
+        INSERT INTO Habit_History (Garden_Id, Habit_Name, Day, Priority, Completed, Water_Earned)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', history)
+    
+    weather_model = WeatherModel(db, garden_id)
+    weather_model.replace_weather([
+        (day, temp, hum, state)
+        for day, (temp, hum, state) in enumerate(WeatherService(None).generate_weather(fixture.weather_days, rng=rng))
+    ], fixture.weather_days)
+    weather_model.set_meta('weather_horizon', str(fixture.weather_days))
+
+def habit_name(index):
+    """Name of the fixture's habit at index"""
+    return f"Habit {index}"
@@ -0,0 +1,123 @@
+"""Check that every query the garden's hot paths run is answered from an index.
+
+Run from the app directory:
+
+    python -m benchmarks.query_plans
+
+A seeded garden is driven through the index page, watering, habit completion, analytics and
+daily rollovers while every statement is captured, then each captured query is run through
+EXPLAIN QUERY PLAN. A full table scan or a temporary sort for ORDER BY is reported as a
+problem and the run exits with status 1; --verbose prints every plan.
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+from benchmarks.fixtures import GardenFixture, fill_garden, habit_name
+from config import DEFAULT_GARDEN_ID
+
+# Plan details that mean a query reads more than the rows it needs
+PROBLEMS = ('USE TEMP B-TREE FOR ORDER BY',)
+
+def capture_statements(fixture=None):
+    """Drive the hot paths against a seeded database and return (database path, statements run).
+    
+    The database is left in a temporary directory that the caller removes.
+    """
+    import database.connection as connection
+    from app import create_app
+    from database import get_db, init_db
+    
+    fixture = fixture or GardenFixture(trees=10, habits=50, history_days=60)
+    statements = []
+    
+    class TracingPool(connection.ConnectionPool):
+        def connect(self):
+            db = super().connect()
+            db.set_trace_callback(statements.append)
+            return db
+    
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'plans.db')
+    previous_pool = connection.pool
+    connection.pool = TracingPool(path, 2, instrumented=False)
+    try:
+        app = create_app()
+        with app.app_context():
+            init_db()
+            fill_garden(get_db(), fixture)
+        
+        # Only the hot paths count, not building the schema and fixture
+        statements.clear()
+        client = app.test_client()
+        client.get('/')
+        client.post('/water_tree', json={"index": 0, "water_amount": 1})
+        client.post('/complete_habit', json={"habit_name": habit_name(0)})
+        client.get('/analytics')
+        
+        # Wind the garden's clock back so the scheduler has a catch-up rollover to run
+        with app.app_context():
+            db = get_db()
+            last_run = (datetime.datetime.utcnow() - datetime.timedelta(days=3, hours=1)).isoformat()
+            with db:
+                db.execute("UPDATE Meta SET value = ? WHERE Garden_Id = ? AND key = 'global_last_run'", (last_run, DEFAULT_GARDEN_ID))
+        app.extensions['scheduler'].run_due_rollovers()
+    finally:
+        connection.pool = previous_pool
+    
+    return path, statements
+
+def query_plans(path, statements):
+    """EXPLAIN QUERY PLAN each distinct query, returning [(sql, [plan detail lines])]"""
+    db = sqlite3.connect(path)
+    plans = []
+    seen = set()
+    try:
+        for sql in statements:
+            sql = sql.strip()
+            # Skip trigger bodies, transaction control and pragmas; only queries have plans worth reading
+            if sql.startswith('--') or sql.split(None, 1)[0].upper() not in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'):
+                continue
+            if sql in seen:
+                continue
+            seen.add(sql)
+            plans.append((sql, [row[3] for row in db.execute(f'EXPLAIN QUERY PLAN {sql}')]))
+    finally:
+        db.close()
+    return plans
+
+def plan_problems(plan):
+    """The plan lines that show a full table scan or an unindexed sort"""
+    return [
+        detail for detail in plan
+        if any(problem in detail for problem in PROBLEMS) or (detail.startswith('SCAN ') and ' USING ' not in detail)
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.query_plans', description="Check the hot queries' plans for table scans.")
+    parser.add_argument('--verbose', action='store_true', help="Print every query's plan")
+    args = parser.parse_args(argv)
+    
+    path, statements = capture_statements()
+    try:
+        plans = query_plans(path, statements)
+    finally:
+        import shutil
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    
+    failures = 0
+    for sql, plan in plans:
+        problems = plan_problems(plan)
+        failures += bool(problems)
+        if problems or args.verbose:
+            print(' '.join(sql.split()))
+            for detail in plan:
+                print(f"    {'!! ' if detail in problems else ''}{detail}")
+    
+    print(f"{len(plans)} distinct queries, {failures} with table scans or unindexed sorts")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
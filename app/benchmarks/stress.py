@@ -0,0 +1,162 @@
+"""Concurrency stress test for the watering and habit reward paths.
+
+Run from the app directory:
+
+    python -m benchmarks.stress --threads 8 --operations 300
+
+Several threads water trees and complete habits in one garden at the same time, each on
+its own pooled connection like concurrent requests. The garden starts with little water,
+so waterings race for the last of it, and every one of today's habits is completed by
+several threads at once. The run fails (exit status 1) if water was overspent or conjured,
+the daily reward cap was exceeded, a habit was completed or rewarded more than once, or
+any operation errored.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.fixtures import GardenFixture, fill_garden
+from config import DEFAULT_GARDEN_ID, DB_POOL_SIZE
+
+def run_stress(threads=8, operations=300, starting_water=2000, water_amount=7, trees=10, habits=50):
+    """Hammer one garden from many threads and return a results dict with any invariant violations"""
+    import database.connection as connection
+    from app import create_app
+    from database import get_db, init_db
+    from models import GardenModel, TreeModel, HabitModel
+    from services import GardenService, TreeService, HabitService
+    from services.threshold_service import experience_thresholds
+    
+    fixture = GardenFixture(trees=trees, habits=habits, history_days=0, water=starting_water)
+    garden_id = DEFAULT_GARDEN_ID
+    
+    with tempfile.TemporaryDirectory() as directory:
+        previous_pool = connection.pool
+        connection.pool = connection.ConnectionPool(os.path.join(directory, 'stress.db'), max(DB_POOL_SIZE, threads))
+        try:
+            app = create_app()
+            with app.app_context():
+                init_db()
+                fill_garden(get_db(), fixture)
+                start_garden = dict(GardenModel(get_db(), garden_id).get_garden_data())
+                habit_service = HabitService(HabitModel(get_db(), garden_id), GardenService(GardenModel(get_db(), garden_id)))
+                garden_day = habit_service.garden_day()
+                # Every thread cycles through the same habits, so each one is raced for
+                active = [habit['name'] for habit in habit_service.get_active_habits(garden_day)]
+            
+            counts = {"watered": 0, "refused": 0, "completed": 0, "already_completed": 0, "not_completed": 0, "errors": 0}
+            completed = []
+            errors = []
+            lock = threading.Lock()
+            
+            def water(i):
+                db = get_db()
+                garden_model = GardenModel(db, garden_id)
+                return TreeService(TreeModel(db, garden_id), garden_model).water_tree(i % trees, water_amount)
+            
+            def complete(i):
+                db = get_db()
+                habit_service = HabitService(HabitModel(db, garden_id), GardenService(GardenModel(db, garden_id)))
+                name = active[i % len(active)]
+                success, error = habit_service.complete_habit(name)
+                if success:
+                    with lock:
+                        completed.append(name)
+                return success, error
+            
+            def worker(worker_index):
+                for i in range(operations):
+                    rewarding = (worker_index + i) % 4 == 0
+                    try:
+                        with app.app_context():
+                            success, error = (complete if rewarding else water)(i)
+                    except Exception as e:
+                        with lock:
+                            counts["errors"] += 1
+                            errors.append(repr(e))
+                        continue
+                    
+                    # Completions past the daily cap still succeed, only without water
+                    if rewarding:
+                        key = "completed" if success else "already_completed" if error == "Habit already completed" else "not_completed"
+                    else:
+                        key = "watered" if success else "refused"
+                    with lock:
+                        counts[key] += 1
+            
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            seconds = time.perf_counter() - start
+            
+            with app.app_context():
+                db = get_db()
+                garden = GardenModel(db, garden_id).get_garden_data()
+                planted = len(TreeModel(db, garden_id).get_trees_data())
+                max_daily = HabitService(None, None).calculate_max_daily_water(garden['Level'], planted)
+                history_water = db.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(Water_Earned), 0) FROM Habit_History WHERE Garden_Id = ? AND Day = ? AND Completed = 1',
+                    (garden_id, garden_day.isoformat())
+                ).fetchone()
+        finally:
+            connection.pool = previous_pool
+    
+    earned = garden['Daily_Water_Earned'] - start_garden['Daily_Water_Earned']
+    spent = counts["watered"] * water_amount
+    violations = []
+    if garden['Water'] != starting_water + earned - spent:
+        violations.append(f"water is {garden['Water']}, expected {starting_water} + {earned} earned - {spent} spent")
+    if garden['Water'] < 0:
+        violations.append(f"water went negative ({garden['Water']})")
+    if garden['Daily_Water_Earned'] > max_daily:
+        violations.append(f"daily water earned {garden['Daily_Water_Earned']} is over the cap of {max_daily}")
+    attempted = {active[i % len(active)] for worker_index in range(threads) for i in range(operations) if (worker_index + i) % 4 == 0}
+    if sorted(completed) != sorted(attempted):
+        violations.append(f"{len(completed)} completions succeeded for {len(attempted)} habits; each must succeed exactly once")
+    if tuple(history_water) != (len(completed), earned):
+        violations.append(f"history logs {history_water[0]} completions earning {history_water[1]} water, "
+                          f"expected {len(completed)} earning the {earned} granted")
+    levels, experience, _ = experience_thresholds.advance(start_garden['Experience'], start_garden['Experience_Required'], 200 * len(completed))
+    if (garden['Level'], garden['Experience']) != (start_garden['Level'] + levels, experience):
+        violations.append(f"garden is level {garden['Level']} with {garden['Experience']} experience, "
+                          f"expected level {start_garden['Level'] + levels} with {experience} from {len(completed)} completions")
+    if counts["errors"]:
+        violations.append(f"{counts['errors']} operations raised, first: {errors[0]}")
+    
+    return {
+        "threads": threads,
+        "operations": threads * operations,
+        "seconds": seconds,
+        "operations_per_second": threads * operations / seconds,
+        "counts": counts,
+        "final_water": garden['Water'],
+        "daily_water_earned": garden['Daily_Water_Earned'],
+        "violations": violations
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.stress', description="Race waterings and habit rewards in one garden.")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent workers")
+    parser.add_argument('--operations', type=int, default=300, help="Operations per worker")
+    parser.add_argument('--starting-water', type=int, default=2000, help="Water the garden starts with")
+    parser.add_argument('--water-amount', type=int, default=7, help="Water spent per watering")
+    args = parser.parse_args(argv)
+    
+    results = run_stress(args.threads, args.operations, args.starting_water, args.water_amount)
+    
+    print(f"{results['operations']} operations on {results['threads']} threads in {results['seconds']:.2f} s "
+          f"({results['operations_per_second']:.0f} ops/s)")
+    print(', '.join(f"{name} {count}" for name, count in results['counts'].items()))
+    print(f"final water {results['final_water']}, daily water earned {results['daily_water_earned']}")
+    
+    for violation in results['violations']:
+        print(f"VIOLATION: {violation}")
+    return 1 if results['violations'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import datetime
+import os
+import platform
+import statistics
+import tempfile
+import time
+from benchmarks.fixtures import fill_garden, habit_name
+from config import DEFAULT_GARDEN_ID, DB_POOL_SIZE, STARTING_EXPERIENCE_REQUIRED
+
+LARGE_EXPERIENCE = 10 ** 12   # XP granted per add_experience run, enough for dozens of level-ups
+ROLLOVER_DAYS = [1, 30, 365]  # Missed days simulated by the trigger_daily_updates benchmarks
+ANALYTICS_DAYS = 365          # Window aggregated by the analytics benchmark
+
+class Benchmark:
+    """A timed operation, with untimed setup that puts the garden back in a known state before each run"""
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+    
+    def measure(self, repeat):
+        """Run the benchmark repeat times and return timing statistics in seconds"""
+        timings = []
+        for _ in range(repeat):
+            if self.setup is not None:
+                self.setup()
+            start = time.perf_counter()
+            self.run()
+            timings.append(time.perf_counter() - start)
+        
+        return {
+            "repeat": repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings)
+        }
+
+def run_suite(fixture, repeat=20, only=None, garden_id=DEFAULT_GARDEN_ID):
+    """Build the garden garden_id from the fixture in a temporary database and time every hot path.
+    
+    Returns a results dict ready to be written as JSON.
+    """
+    import database.connection as connection
+    from app import create_app
+    from database import get_db, init_db
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Point get_db at a throwaway database for the whole run
+        previous_pool = connection.pool
+        connection.pool = connection.ConnectionPool(os.path.join(directory, 'benchmark.db'), DB_POOL_SIZE)
+        try:
+            app = create_app()
+            with app.app_context():
+                init_db()
+                fill_garden(get_db(), fixture, garden_id)
+                
+                benchmarks = [b for b in _benchmarks(app, get_db(), garden_id) if only is None or b.name in only]
+                results = {b.name: b.measure(repeat) for b in benchmarks}
+        finally:
+            connection.pool = previous_pool
+    
+    return {
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fixture": fixture.as_dict(),
+        "benchmarks": results
+    }
+
+def _benchmarks(app, db, garden_id):
+    """The hot paths, each bound to the benchmark garden"""
+    from models import GardenModel, TreeModel, HabitModel, WeatherModel
+    from services import GardenService, TreeService, HabitService, TimeService, AnalyticsService, fragment_cache
+    
+    garden_model = GardenModel(db, garden_id)
+    tree_service = TreeService(TreeModel(db, garden_id), garden_model)
+    garden_service = GardenService(garden_model)
+    habit_service = HabitService(HabitModel(db, garden_id), garden_service)
+    analytics_service = AnalyticsService(habit_service, garden_model, WeatherModel(db, garden_id))
+    client = app.test_client()
+    
+    def render_index():
+        # No If-None-Match, so the page is always rendered, from cached fragments unless they were cleared
+        response = client.get('/', headers={'X-Garden-Id': str(garden_id)})
+        assert response.status_code == 200
+    
+    def reset_habit():
+        with db:
+            db.execute('UPDATE Habits SET Completed = 0 WHERE Garden_Id = ? AND Name = ?', (garden_id, habit_name(0)))
+            garden_model.reset_daily_water_earned()
+    
+    def reset_experience():
+        # Back to a new garden's level 1, so every run climbs the same levels
+        garden_model.update_experience(1, 0, STARTING_EXPERIENCE_REQUIRED)
+    
+    def rewind_days(days):
+        def rewind():
+            last_run = datetime.datetime.utcnow() - datetime.timedelta(days=days, minutes=1)
+            with db:
+                db.execute(
+                    "UPDATE Meta SET value = ? WHERE Garden_Id = ? AND key = 'global_last_run'",
+                    (last_run.isoformat(), garden_id)
+                )
+        return rewind
+    
+    benchmarks = [
+        Benchmark("index", render_index),
+        Benchmark("index_uncached", render_index, setup=fragment_cache.clear),
+        Benchmark("water_tree", lambda: _expect_success(tree_service.water_tree(0, 1))),
+        Benchmark("complete_habit", lambda: _expect_success(habit_service.complete_habit(habit_name(0))), setup=reset_habit),
+        Benchmark("add_experience", lambda: garden_service.add_experience(LARGE_EXPERIENCE), setup=reset_experience),
+        # compute() bypasses the state-version cache, so every run aggregates the full window
+        Benchmark("analytics", lambda: analytics_service.compute(datetime.date.today(), ANALYTICS_DAYS))
+    ]
+    for days in ROLLOVER_DAYS:
+        benchmarks.append(Benchmark(
+            f"trigger_daily_updates_{days}",
+            lambda: TimeService(garden_id).trigger_daily_updates(),
+            setup=rewind_days(days)
+        ))
+    return benchmarks
+
+def _expect_success(result):
+    """Fail loudly if a service call took an error path, which would time the wrong thing"""
+    success, error = result
+    if not success:
+        raise RuntimeError(error)
+
+def compare(results, baseline, threshold=1.25):
+    """Compare median timings against a baseline results dict.
+    
+    Returns a list of (name, baseline_median, median, ratio, regressed) rows; a benchmark
+    regresses when its median is more than threshold times the baseline median.
+    """
+    rows = []
+    for name, stats in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+        
+        ratio = stats["median"] / previous["median"] if previous["median"] else float('inf')
+        rows.append((name, previous["median"], stats["median"], ratio, ratio > threshold))
+    return rows
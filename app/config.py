@@ -1,14 +1,27 @@
 #config.py - Responsible for storing all the configurable variables, for ease of access
 
 DATABASE = "habit_tree_save_file.db"                    # SQLite3 local database path for storing all the data
+DB_POOL_SIZE = 8                # How many idle SQLite connections are kept around for reuse between requests
+DB_STATEMENT_CACHE_SIZE = 128   # How many prepared statements each connection keeps cached
+DB_PRAGMAS = {                  # Applied once when a pooled connection is opened
+    'journal_mode': 'WAL',      # Readers and writers no longer block each other
+    'synchronous': 'NORMAL',    # Safe with WAL, fsyncs only at checkpoints
+    'mmap_size': 268435456,     # Memory-map up to 256 MB of the database file
+    'cache_size': -16000,       # Page cache size, negative means KiB (16 MB)
+    'busy_timeout': 2000        # Milliseconds to wait on a locked database before failing
+}
 TREE_REQUIREMENTS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]     # The garden level required to unlock each tree slot
 REQUIRED_WATER_INCREASE_PER_STAGE_PERCENTAGE = 50       # How much more water is needed to stage up a tree as a percentage per stage (each stage requires 50% more water than previous)
 REQUIRED_EXPERIENCE_INCREASE_PER_LEVEL_PERCENTAGE = 50  # How much more experience is needed to level up the garden as a percentage per level (each level requires 50% more XP)
+STARTING_EXPERIENCE_REQUIRED = 100  # Experience a new garden needs to reach level 2
+STARTING_WATER_REQUIRED = 50        # Water a newly planted tree needs to reach stage 2
+UPCOMING_LEVELS_SHOWN = 3           # How many upcoming garden levels and tree stages the dashboard shows the cost of
 
 # Weather defaults and ranges
 DEFAULT_TEMP = 25.0     # The baseline temperature that weather drifts toward (25°C)
 DEFAULT_HUM = 50.0      # The baseline humidity that weather drifts toward (50%)
 DEFAULT_STATE = 30.0    # The baseline weather state that drifts toward (30 = partly cloudy on 0-100 scale)
+WEATHER_FORECAST_DAYS = 4   # Days of weather kept per garden, today plus upcoming; a rollover writes only the new day, so weeks cost no more
 
 TEMP_DELTA_RANGE = (-5, 5)      # Daily temperature random change range
 HUM_DELTA_RANGE = (-5.0, 5.0)   # Daily humidity bonus random change range
@@ -60,4 +73,44 @@ MOISTURE_TOO_MOIST_LABEL = "Too moist"
 
 # Tree regression settings
 VERY_DRY_WATER_LOSS_PERCENTAGE = 15  # Percentage of water_required lost per day for very dry trees
-DRY_WATER_LOSS_PERCENTAGE = 5        # Percentage of water_required lost per day for dry trees
\ No newline at end of file
+DRY_WATER_LOSS_PERCENTAGE = 5        # Percentage of water_required lost per day for dry trees
+
+# Garden settings
+DEFAULT_GARDEN_ID = 1   # The garden used when a request does not name one (the original single-user garden)
+
+
+# Daily rollover scheduling
+ROLLOVER_SCHEDULER_ENABLED = True   # Run each garden's daily rollover in a background thread at its day boundary
+ROLLOVER_ON_REQUEST = True          # Also check for a pending rollover on every dashboard load, so days roll over even where no scheduler runs (e.g. under gunicorn); False relies on the scheduler alone
+SCHEDULER_MAX_SLEEP_SECONDS = 3600  # Longest the scheduler sleeps before re-checking, in case the clock or gardens changed
+SCHEDULER_RETRY_SECONDS = 60        # How long the scheduler waits after a failed rollover before trying again
+
+# Async serving settings (asgi.py)
+ASGI_WORKER_THREADS = 8   # Threads running Flask views and database work, so the event loop itself never blocks
+ASGI_RESPONSE_BATCH_BYTES = 65536   # Response chunks are sent once they add up to this many bytes, so streamed exports stay in constant memory
+
+# Server-Sent Events settings
+SSE_KEEPALIVE_SECONDS = 15      # How often an idle event stream sends a comment line to keep the connection open
+SSE_MAX_PENDING_EVENTS = 100    # Events queued per listener before the oldest ones are dropped
+SSE_MAX_THREADED_STREAMS = 32   # Event streams served at once by app.py's threaded server, each holding a thread; asgi.py holds none and has no limit
+
+# Habit analytics settings
+ANALYTICS_DEFAULT_DAYS = 365    # Window /analytics covers when no days are given
+ANALYTICS_MAX_DAYS = 3660       # Longest window /analytics accepts (about ten years)
+ANALYTICS_CACHE_SIZE = 64       # Analytics results kept, keyed by garden, state version and window
+
+# Page rendering settings
+FRAGMENT_CACHE_BYTES = 4 * 1024 * 1024  # Rendered tree, habit and weather fragments kept for the dashboard, by total size
+
+# Backup and export settings
+BACKUP_DIRECTORY = "backups"    # Where /backup and python backup.py write copies of the save file
+BACKUP_PAGES_PER_STEP = 256     # Pages the online backup copies per step
+BACKUP_STEP_PAUSE = 0.005       # Seconds the backup pauses between steps so writers can get in
+IMPORT_BATCH_ROWS = 500         # Imported rows written per statement batch, bounding memory whatever the export's size
+
+# Batch settings
+BATCH_MAX_OPERATIONS = 200   # Most operations a single /batch request may carry
+
+# Metrics settings
+METRICS_ENABLED = True  # Record per-route latency and SQL counters and serve them at /metrics (no overhead when off)
+METRICS_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]  # Histogram bucket upper bounds in seconds
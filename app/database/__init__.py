@@ -1,2 +1,2 @@
-from .connection import get_db, close_db
-from .schema import init_db
\ No newline at end of file
+from .connection import get_db, open_db, get_garden_id, close_db
+from .schema import init_db, ensure_garden, create_garden, garden_exists
\ No newline at end of file
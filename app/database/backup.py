@@ -0,0 +1,204 @@
+import datetime
+import json
+import os
+import sqlite3
+import time
+from config import BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, IMPORT_BATCH_ROWS
+from database.schema import SCHEMA_VERSION, schema_version
+
+EXPORT_FORMAT = 'habit-tree-export'
+
+# A garden's tables, in the order they are exported and imported
+GARDEN_TABLES = ('Meta', 'Trees', 'Habits', 'Habit_Stats', 'Habit_History', 'Weather')
+
+# Cache versions bumped by triggers; an import moves them forward instead of restoring them
+VERSION_COLUMNS = ('State_Version', 'Trees_Version', 'Habits_Version', 'Weather_Version')
+
+def backup_database(source, target_path, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE, progress=None):
+    """Copy the whole database behind the source connection to target_path with SQLite's online backup.
+    
+    The copy is taken from one read snapshot, so writes from other connections neither
+    restart it nor end up half in it, and with the WAL journal they are never blocked by it.
+    Pages are copied a step at a time with a pause in between. The copy is written next to
+    target_path and only moved there once complete, so target_path never holds a torn copy.
+    progress(copied, total) is called after every step. Returns the number of pages copied.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+    partial_path = f"{target_path}.partial"
+    copied = {"pages": 0}
+    
+    def step(status, remaining, total):
+        copied["pages"] = total
+        if progress is not None:
+            progress(total - remaining, total)
+        if remaining and pause:
+            time.sleep(pause)
+    
+    started = not source.in_transaction
+    target = sqlite3.connect(partial_path)
+    try:
+        if started:
+            # Without a snapshot held across steps, every write elsewhere restarts the copy
+            source.execute('BEGIN')
+            source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        source.backup(target, pages=pages, progress=step)
+    finally:
+        target.close()
+        if started:
+            source.rollback()
+    os.replace(partial_path, target_path)
+    return copied["pages"]
+
+def export_gardens(db, garden_ids=None):
+    """Yield the given gardens, or every garden, as NDJSON lines, one row at a time.
+    
+    The first line describes the export; every other one is a {"table", "garden_id", "row"}
+    record, each garden's Garden record first. All rows are read in one read transaction,
+    so the export is a consistent snapshot while writers carry on.
+    """
+    started = not db.in_transaction
+    if started:
+        db.execute('BEGIN')
+    try:
+        yield _line({
+            "format": EXPORT_FORMAT,
+            "schema_version": schema_version(db),
+            "exported": datetime.datetime.utcnow().isoformat()
+        })
+        
+        if garden_ids is None:
+            garden_ids = (row[0] for row in db.execute('SELECT Id FROM Garden ORDER BY Id'))
+        
+        for garden_id in garden_ids:
+            cursor = db.execute('SELECT * FROM Garden WHERE Id = ?', (garden_id,))
+            for row in _rows(cursor, ('Id',) + VERSION_COLUMNS):
+                yield _line({"table": "Garden", "garden_id": garden_id, "row": row})
+            
+            for table in GARDEN_TABLES:
+                order = ' ORDER BY Creation_Date' if table == 'Trees' else ''
+                cursor = db.execute(f'SELECT * FROM {table} WHERE Garden_Id = ?{order}', (garden_id,))
+                for row in _rows(cursor, ('Garden_Id',)):
+                    yield _line({"table": table, "garden_id": garden_id, "row": row})
+    finally:
+        if started:
+            db.rollback()
+
+def import_gardens(db, lines, garden_id=None):
+    """Replace gardens with the ones in an NDJSON export, reading it one line at a time.
+    
+    Each exported garden replaces the garden with the same id or, when garden_id is given,
+    the export must hold a single garden, which replaces that one. Rows are written in
+    batches inside one transaction, so memory use does not grow with the export and a bad
+    line leaves the database untouched. Raises ValueError for a malformed export and
+    returns the ids of the gardens imported.
+    """
+    from models import Transaction
+    
+    lines = iter(lines)
+    header = _record(next(lines, b''), 1)
+    if header.get('format') != EXPORT_FORMAT:
+        raise ValueError("Not a garden export")
+    if header.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"The export has schema version {header.get('schema_version')}, this app imports version {SCHEMA_VERSION}")
+    
+    columns = {table: _columns(db, table) for table in ('Garden',) + GARDEN_TABLES}
+    batch = _InsertBatch(db)
+    imported = []
+    source_id = None
+    
+    with Transaction(db):
+        for number, line in enumerate(lines, 2):
+            if not line.strip():
+                continue
+            
+            record = _record(line, number)
+            table, row = record.get('table'), record.get('row')
+            if table not in columns or not isinstance(row, dict):
+                raise ValueError(f"Line {number}: not a garden table row")
+            unknown = set(row) - columns[table]
+            if unknown:
+                raise ValueError(f"Line {number}: {table} has no column {sorted(unknown)[0]}")
+            
+            if table == 'Garden':
+                if garden_id is not None and imported:
+                    raise ValueError("The export holds more than one garden")
+                target_id = garden_id if garden_id is not None else record.get('garden_id')
+                if not isinstance(target_id, int) or target_id < 1:
+                    raise ValueError(f"Line {number}: invalid garden id")
+                
+                batch.flush()
+                _replace_garden(db, target_id, row)
+                imported.append(target_id)
+                source_id = record.get('garden_id')
+            elif not imported or record.get('garden_id') != source_id:
+                raise ValueError(f"Line {number}: {table} row does not follow its garden")
+            else:
+                batch.add(table, imported[-1], row)
+        batch.flush()
+    
+    return imported
+
+def _replace_garden(db, garden_id, row):
+    """Empty a garden, creating it if needed, and give it the exported garden row"""
+    # Newest tables first; deleting the habits also takes their stats and history
+    for table in reversed(GARDEN_TABLES):
+        db.execute(f'DELETE FROM {table} WHERE Garden_Id = ?', (garden_id,))
+    
+    names = [name for name in row if name not in VERSION_COLUMNS]
+    values = [row[name] for name in names]
+    if db.execute('SELECT 1 FROM Garden WHERE Id = ?', (garden_id,)).fetchone():
+        if names:
+            db.execute(f"UPDATE Garden SET {', '.join(f'{name} = ?' for name in names)} WHERE Id = ?", values + [garden_id])
+    else:
+        db.execute(f"INSERT INTO Garden (Id{''.join(f', {name}' for name in names)}) VALUES (?{', ?' * len(names)})", [garden_id] + values)
+
+class _InsertBatch:
+    """Buffers imported rows of one table and column set, writing them IMPORT_BATCH_ROWS at a time"""
+    def __init__(self, db, size=IMPORT_BATCH_ROWS):
+        self.db = db
+        self.size = size
+        self.key = None
+        self.rows = []
+    
+    def add(self, table, garden_id, row):
+        key = (table, tuple(row))
+        if key != self.key or len(self.rows) >= self.size:
+            self.flush()
+            self.key = key
+        self.rows.append((garden_id,) + tuple(row.values()))
+    
+    def flush(self):
+        if not self.rows:
+            return
+        
+        table, names = self.key
+        # Adding a habit already created its stats row, so the exported one replaces it
+        verb = 'INSERT OR REPLACE' if table == 'Habit_Stats' else 'INSERT'
+        self.db.executemany(
+            f"{verb} INTO {table} (Garden_Id{''.join(f', {name}' for name in names)}) VALUES (?{', ?' * len(names)})",
+            self.rows
+        )
+        self.rows = []
+
+def _columns(db, table):
+    """The columns an imported row of table may set; the garden id comes from the record, not the row"""
+    return {row[1] for row in db.execute(f'PRAGMA table_info({table})')} - {'Garden_Id', 'Id'}
+
+def _rows(cursor, skipped):
+    """Iterate a cursor's rows as dicts without the skipped columns"""
+    names = [description[0] for description in cursor.description]
+    for row in cursor:
+        yield {name: value for name, value in zip(names, row) if name not in skipped}
+
+def _record(line, number):
+    """Parse one NDJSON line into a dict"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        raise ValueError(f"Line {number}: not valid JSON")
+    if not isinstance(record, dict):
+        raise ValueError(f"Line {number}: not a JSON object")
+    return record
+
+def _line(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
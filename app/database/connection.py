@@ -1,16 +1,83 @@
+import queue
 import sqlite3
-from flask import g
-from config import DATABASE
+from flask import abort, g, request
+from config import DATABASE, DEFAULT_GARDEN_ID, DB_POOL_SIZE, DB_STATEMENT_CACHE_SIZE, DB_PRAGMAS, METRICS_ENABLED
+from database.instrumentation import InstrumentedConnection, SqlStats
+
+class ConnectionPool:
+    """Keeps tuned SQLite connections around so requests can reuse them"""
+    def __init__(self, database, size, instrumented=METRICS_ENABLED):
+        self.database = database
+        self.instrumented = instrumented
+        self.idle = queue.LifoQueue(maxsize=size)
+    
+    def acquire(self):
+        """Take an idle connection, or open a new one if none is free"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.connect()
+    
+    def release(self, db):
+        """Hand a connection back, closing it if the pool is already full"""
+        if db.in_transaction:
+            db.rollback()
+        try:
+            self.idle.put_nowait(db)
+        except queue.Full:
+            db.close()
+    
+    def connect(self):
+        """Open a connection and apply the configured pragmas once"""
+        db = sqlite3.connect(
+            self.database,
+            timeout=2,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE_SIZE,
+            factory=InstrumentedConnection if self.instrumented else sqlite3.Connection
+        )
+        db.row_factory = sqlite3.Row
+        for pragma, value in DB_PRAGMAS.items():
+            db.execute(f'PRAGMA {pragma} = {value}')
+        return db
+
+pool = ConnectionPool(DATABASE, DB_POOL_SIZE)
 
 def get_db():
-    """Get or create SQLite database connection using Flask's g object"""
+    """Get a pooled SQLite database connection for this request using Flask's g object"""
     if 'db' not in g:   
-        g.db = sqlite3.connect(DATABASE, timeout=2)
-        g.db.row_factory = sqlite3.Row
+        g.db = pool.acquire()
+        if pool.instrumented:
+            # Count only this request's statements on the pooled connection
+            g.db.stats = SqlStats()
     return g.db
 
+def open_db():
+    """Open a connection of the app's own, outside the pool, for work that outlives a request such as a streamed export"""
+    return pool.connect()
+
+def get_garden_id():
+    """Get the garden this request is scoped to, which must already exist.
+    
+    Clients pick their garden with the X-Garden-Id header or the garden_id cookie;
+    requests that name neither use the default garden. Gardens are only created
+    through POST /gardens, never by naming an id that is not taken.
+    """
+    if 'garden_id' not in g:
+        garden_id = request.headers.get('X-Garden-Id', type=int)
+        if garden_id is None:
+            garden_id = request.cookies.get('garden_id', DEFAULT_GARDEN_ID, type=int)
+        if garden_id < 1:
+            abort(400, "Invalid garden id")
+        
+        from database.schema import garden_exists
+        if not garden_exists(get_db(), garden_id):
+            abort(404, "No such garden")
+        g.garden_id = garden_id
+    return g.garden_id
+
 def close_db(e=None):
-    """Close database connection if it exists"""
+    """Return the database connection to the pool if it exists"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
\ No newline at end of file
+        pool.release(db)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import sqlite3
+import time
+
+class SqlStats:
+    """SQL counters for one app context (a request, or a scheduler run)"""
+    __slots__ = ('statements', 'seconds', 'commits', 'rows')
+    
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.commits = 0
+        self.rows = 0
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that adds its statements, fetch time and rows returned to its connection's stats"""
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(start, statements=1)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(start, statements=1)
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._record(start, rows=row is not None)
+        return row
+    
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._record(start, rows=len(rows))
+        return rows
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._record(start, rows=len(rows))
+        return rows
+    
+    def _record(self, start, statements=0, rows=0):
+        stats = self.connection.stats
+        stats.seconds += time.perf_counter() - start
+        stats.statements += statements
+        stats.rows += rows
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors and commits are counted in self.stats"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = SqlStats()
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    # The C shortcuts build a plain cursor, so route them through cursor() instead
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+    
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+    
+    def commit(self):
+        if self.in_transaction:
+            self.stats.commits += 1
+        super().commit()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The context manager commits in C without going through commit()
+        if exc_type is None and self.in_transaction:
+            self.stats.commits += 1
+        return super().__exit__(exc_type, exc_value, traceback)
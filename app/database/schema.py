@@ -1,10 +1,84 @@
 import datetime
 from database.connection import get_db
+from config import DEFAULT_GARDEN_ID, STARTING_EXPERIENCE_REQUIRED
 
 def init_db():
-    """Initialize database tables and default garden values"""
+    """Bring the schema up to date and make sure the default garden exists"""
     db = get_db()
+    migrate(db)
+    ensure_garden(db, DEFAULT_GARDEN_ID)
+
+def migrate(db):
+    """Apply the migrations the database has not had yet, all in one transaction.
+    
+    The version is kept in PRAGMA user_version, so starting on a current database costs
+    a single pragma read. Returns the number of migrations applied.
+    """
+    if schema_version(db) == SCHEMA_VERSION:
+        return 0
+    
+    from models import Transaction
+    
+    with Transaction(db):
+        # Another process may have migrated while this one waited for the write lock
+        version = schema_version(db)
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"Database schema version {version} is newer than this app supports ({SCHEMA_VERSION})")
+        
+        cursor = db.cursor()
+        for migration in MIGRATIONS[version:]:
+            migration(cursor)
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return SCHEMA_VERSION - version
+
+def schema_version(db):
+    """The schema version recorded in the database, 0 for new files and those from before versioning"""
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+def garden_exists(db, garden_id):
+    """Check whether a garden with the given id exists"""
+    return db.execute("SELECT 1 FROM Garden WHERE Id = ?", (garden_id,)).fetchone() is not None
+
+def ensure_garden(db, garden_id, rng=None):
+    """Create the garden with the given id, and its starting weather, if it does not exist yet"""
+    if not garden_exists(db, garden_id):
+        _insert_garden(db, garden_id, rng)
+
+def create_garden(db, rng=None):
+    """Create a new garden, and its starting weather, under the next free id and return the id"""
+    return _insert_garden(db, None, rng)
+
+def _insert_garden(db, garden_id, rng):
+    """Insert a garden with its day clock and starting weather; a garden_id of None takes the next free id"""
+    with db:
+        garden_id = db.execute('''
+            INSERT INTO Garden (Id, Creation_Date, Level, Experience, Experience_Required, Water, Daily_Water_Earned)
+            VALUES (?, ?, 1, 0, ?, 0, 0)
+            RETURNING Id
+        ''', (garden_id, datetime.date.today().isoformat(), STARTING_EXPERIENCE_REQUIRED)).fetchone()[0]
+        
+        # Start the garden's day clock now so the scheduler picks it up
+        db.execute('''
+            INSERT OR IGNORE INTO Meta (Garden_Id, key, value)
+            VALUES (?, 'global_last_run', ?)
+        ''', (garden_id, datetime.datetime.utcnow().isoformat()))
     
+    # Initialize weather with default values if empty
+    if not db.execute("SELECT 1 FROM Weather WHERE Garden_Id = ? LIMIT 1", (garden_id,)).fetchone():
+        from models import WeatherModel
+        from services import WeatherService
+        
+        weather_model = WeatherModel(db, garden_id)
+        weather_service = WeatherService(weather_model)
+        weather_service.simulate_weather(rng=rng)
+    return garden_id
+
+def _create_schema(cursor):
+    """Version 1: every table, index and trigger, upgrading save files from before versioning on the way.
+    
+    Databases older than the version counter are at version 0 whatever their shape, so
+    each step here tolerates finding its work already done.
+    """
     tables = {
         'Trees': '''
             CREATE TABLE IF NOT EXISTS Trees (
@@ -14,7 +88,8 @@ def init_db():
                 Water INTEGER NOT NULL DEFAULT 0 CHECK (Water >= 0),
                 Water_Required INTEGER NOT NULL DEFAULT 50 CHECK (Water_Required > 0),
                 Last_Watered TEXT NOT NULL,
-                Moisture INTEGER NOT NULL CHECK (Moisture >= 0 AND Moisture <= 100)
+                Moisture INTEGER NOT NULL CHECK (Moisture >= 0 AND Moisture <= 100),
+                Garden_Id INTEGER NOT NULL DEFAULT 1
             )
         ''',
         'Garden': '''
@@ -24,16 +99,20 @@ def init_db():
                 Experience INTEGER NOT NULL DEFAULT 0 CHECK (Experience >= 0),
                 Experience_Required INTEGER NOT NULL DEFAULT 100 CHECK (Experience_Required > 0),
                 Water INTEGER NOT NULL DEFAULT 0 CHECK (Water >= 0),
-                Daily_Water_Earned INTEGER NOT NULL DEFAULT 0 CHECK (Daily_Water_Earned >= 0)
+                Daily_Water_Earned INTEGER NOT NULL DEFAULT 0 CHECK (Daily_Water_Earned >= 0),
+                State_Version INTEGER NOT NULL DEFAULT 0
             )
         ''',
         'Habits': '''
             CREATE TABLE IF NOT EXISTS Habits (
-                Name TEXT PRIMARY KEY,
+                Garden_Id INTEGER NOT NULL DEFAULT 1,
+                Name TEXT,
                 Creation_Date TEXT NOT NULL,
                 Priority INTEGER NOT NULL CHECK (Priority >= 0 AND Priority <= 5),
                 Days_Of_The_Week TEXT NOT NULL CHECK (Days_Of_The_Week != ''),
-                Completed BOOLEAN NOT NULL DEFAULT 0
+                Completed BOOLEAN NOT NULL DEFAULT 0,
+                Days_Mask INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (Garden_Id, Name)
             )
         ''',
         'Weather': '''
@@ -41,34 +120,353 @@ def init_db():
                 Id INTEGER PRIMARY KEY,
                 Temperature INTEGER NOT NULL CHECK (Temperature >= -5 AND Temperature <= 35),
                 Humidity INTEGER NOT NULL CHECK (Humidity >= 0 AND Humidity <= 100),
-                State INTEGER NOT NULL CHECK (State >= 0 AND State <= 100)
+                State INTEGER NOT NULL CHECK (State >= 0 AND State <= 100),
+                Garden_Id INTEGER NOT NULL DEFAULT 1
+            )
+        ''',
+        'Habit_History': '''
+            CREATE TABLE IF NOT EXISTS Habit_History (
+                Garden_Id INTEGER NOT NULL,
+                Habit_Name TEXT NOT NULL,
+                Day TEXT NOT NULL,
+                Priority INTEGER NOT NULL,
+                Completed BOOLEAN NOT NULL,
+                Water_Earned INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (Garden_Id, Habit_Name, Day)
+            ) WITHOUT ROWID
+        ''',
+        'Habit_Stats': '''
+            CREATE TABLE IF NOT EXISTS Habit_Stats (
+                Garden_Id INTEGER NOT NULL,
+                Habit_Name TEXT NOT NULL,
+                Current_Streak INTEGER NOT NULL DEFAULT 0,
+                Best_Streak INTEGER NOT NULL DEFAULT 0,
+                Completions INTEGER NOT NULL DEFAULT 0,
+                Scheduled_Days INTEGER NOT NULL DEFAULT 0,
+                Last_Completed_Day TEXT,
+                PRIMARY KEY (Garden_Id, Habit_Name)
             )
         ''',
         'Meta': '''
             CREATE TABLE IF NOT EXISTS Meta (
-                key TEXT PRIMARY KEY NOT NULL CHECK (key != ''),
-                value TEXT NOT NULL CHECK (value != '')
+                Garden_Id INTEGER NOT NULL DEFAULT 1,
+                key TEXT NOT NULL CHECK (key != ''),
+                value TEXT NOT NULL CHECK (value != ''),
+                PRIMARY KEY (Garden_Id, key)
             )
         '''
     }
+    
+    indexes = [
+        'CREATE INDEX IF NOT EXISTS Trees_Garden_Creation_Date ON Trees (Garden_Id, Creation_Date)',
+        'CREATE INDEX IF NOT EXISTS Weather_Garden ON Weather (Garden_Id, Id)',
+        'CREATE INDEX IF NOT EXISTS Habits_Garden_Days_Mask ON Habits (Garden_Id, Days_Mask)',
+        'CREATE INDEX IF NOT EXISTS Habit_History_Garden_Day ON Habit_History (Garden_Id, Day, Priority, Completed, Water_Earned)'
+    ]
+    
+    for table, schema in tables.items():
+        cursor.execute(schema)
+    
+    _migrate_to_gardens(cursor)
+    _migrate_days_mask(cursor)
+    _migrate_state_version(cursor)
+    _migrate_habit_stats(cursor)
+    _migrate_history_columns(cursor)
+    
+    for index in indexes:
+        cursor.execute(index)
+    
+    for trigger in _state_version_triggers() + _habit_stats_triggers():
+        cursor.execute(trigger)
 
-    with db:
-        cursor = db.cursor()
-        for table, schema in tables.items():
-            cursor.execute(schema)
-        
-        # Initialize garden with default values if empty
-        if not cursor.execute("SELECT 1 FROM Garden LIMIT 1").fetchone():
-            cursor.execute('''
-                INSERT INTO Garden (Creation_Date, Level, Experience, Experience_Required, Water, Daily_Water_Earned)
-                VALUES (?, 1, 0, 100, 0, 0)
-            ''', (datetime.date.today().isoformat(),))
-            
-        # Initialize weather with default values if empty
-        if not cursor.execute("SELECT 1 FROM Weather LIMIT 1").fetchone():
-            from models import WeatherModel
-            from services import WeatherService
-            
-            weather_model = WeatherModel(db)
-            weather_service = WeatherService(weather_model)
-            weather_service.simulate_weather(n_days=4)
\ No newline at end of file
+def _index_scheduler_meta(cursor):
+    """Version 2: index Meta by key so the scheduler finds due gardens without scanning every garden's metadata"""
+    cursor.execute('CREATE INDEX Meta_Key_Value ON Meta (key, value)')
+
+def _weather_ring_buffer(cursor):
+    """Version 3: store weather as a ring buffer of forecast days, one fixed slot per day of the horizon.
+    
+    Existing rows are numbered as consecutive days in their slots as is; the window is laid out
+    for the configured horizon the first time the garden rolls over.
+    """
+    cursor.execute('ALTER TABLE Weather RENAME TO Weather_Old')
+    cursor.execute('''
+        CREATE TABLE Weather (
+            Garden_Id INTEGER NOT NULL DEFAULT 1,
+            Slot INTEGER NOT NULL CHECK (Slot >= 0),
+            Day INTEGER NOT NULL,
+            Temperature INTEGER NOT NULL CHECK (Temperature >= -5 AND Temperature <= 35),
+            Humidity INTEGER NOT NULL CHECK (Humidity >= 0 AND Humidity <= 100),
+            State INTEGER NOT NULL CHECK (State >= 0 AND State <= 100),
+            PRIMARY KEY (Garden_Id, Slot)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT INTO Weather (Garden_Id, Slot, Day, Temperature, Humidity, State)
+        SELECT Garden_Id, Day, Day, Temperature, Humidity, State FROM (
+            SELECT Garden_Id, ROW_NUMBER() OVER (PARTITION BY Garden_Id ORDER BY Id) - 1 AS Day, Temperature, Humidity, State
+            FROM Weather_Old
+        )
+    ''')
+    cursor.execute('DROP TABLE Weather_Old')
+    cursor.execute('CREATE INDEX Weather_Garden_Day ON Weather (Garden_Id, Day)')
+    
+    # Dropping the old table took its state version triggers with it
+    for trigger in _state_version_triggers():
+        cursor.execute(trigger)
+
+def _fragment_versions(cursor):
+    """Version 4: version a garden's trees, habits and weather separately so page fragments are cached per part.
+    
+    The state version triggers are replaced by ones that bump both the state version and the
+    version of the part that changed, and habit stats now count as a change to the habits.
+    """
+    for column in ('Trees_Version', 'Habits_Version', 'Weather_Version'):
+        cursor.execute(f'ALTER TABLE Garden ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+    
+    for table in ('Trees', 'Habits', 'Weather'):
+        for event in ('Insert', 'Update', 'Delete'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_{event}_State_Version')
+    
+    for trigger in _fragment_version_triggers():
+        cursor.execute(trigger)
+
+def _garden_primary_key(cursor):
+    """Version 5: give Garden an explicit Id primary key, so VACUUM can never renumber the gardens.
+    
+    Id takes over each garden's current rowid, which every Garden_Id already refers to. The
+    version triggers reference Garden, so they are dropped around the rebuild and recreated
+    keyed on Id.
+    """
+    for name in _fragment_version_trigger_names():
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    
+    cursor.execute('''
+        CREATE TABLE Garden_New (
+            Id INTEGER PRIMARY KEY,
+            Creation_Date TEXT NOT NULL,
+            Level INTEGER NOT NULL DEFAULT 1 CHECK (Level >= 1),
+            Experience INTEGER NOT NULL DEFAULT 0 CHECK (Experience >= 0),
+            Experience_Required INTEGER NOT NULL DEFAULT 100 CHECK (Experience_Required > 0),
+            Water INTEGER NOT NULL DEFAULT 0 CHECK (Water >= 0),
+            Daily_Water_Earned INTEGER NOT NULL DEFAULT 0 CHECK (Daily_Water_Earned >= 0),
+            State_Version INTEGER NOT NULL DEFAULT 0,
+            Trees_Version INTEGER NOT NULL DEFAULT 0,
+            Habits_Version INTEGER NOT NULL DEFAULT 0,
+            Weather_Version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO Garden_New (Id, Creation_Date, Level, Experience, Experience_Required, Water, Daily_Water_Earned,
+                                State_Version, Trees_Version, Habits_Version, Weather_Version)
+        SELECT rowid, Creation_Date, Level, Experience, Experience_Required, Water, Daily_Water_Earned,
+               State_Version, Trees_Version, Habits_Version, Weather_Version
+        FROM Garden
+    ''')
+    cursor.execute('DROP TABLE Garden')
+    cursor.execute('ALTER TABLE Garden_New RENAME TO Garden')
+    
+    for trigger in _fragment_version_triggers(garden_key='Id'):
+        cursor.execute(trigger)
+
+# Ordered schema migrations; a database at version n has had the first n applied.
+# Append new ones, never edit or reorder applied ones.
+MIGRATIONS = [
+    _create_schema,
+    _index_scheduler_meta,
+    _weather_ring_buffer,
+    _fragment_versions,
+    _garden_primary_key
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def _migrate_to_gardens(cursor):
+    """Add Garden_Id to save files created before gardens were partitioned.
+    
+    Every existing row belongs to the original garden (rowid 1). Habits and Meta
+    are rebuilt because their primary keys now include Garden_Id.
+    """
+    for table in ('Trees', 'Weather'):
+        if not _has_column(cursor, table, 'Garden_Id'):
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN Garden_Id INTEGER NOT NULL DEFAULT 1')
+    
+    if not _has_column(cursor, 'Habits', 'Garden_Id'):
+        cursor.execute('ALTER TABLE Habits RENAME TO Habits_Old')
+        cursor.execute('''
+            CREATE TABLE Habits (
+                Garden_Id INTEGER NOT NULL DEFAULT 1,
+                Name TEXT,
+                Creation_Date TEXT NOT NULL,
+                Priority INTEGER NOT NULL CHECK (Priority >= 0 AND Priority <= 5),
+                Days_Of_The_Week TEXT NOT NULL CHECK (Days_Of_The_Week != ''),
+                Completed BOOLEAN NOT NULL DEFAULT 0,
+                PRIMARY KEY (Garden_Id, Name)
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO Habits (Garden_Id, Name, Creation_Date, Priority, Days_Of_The_Week, Completed)
+            SELECT 1, Name, Creation_Date, Priority, Days_Of_The_Week, Completed FROM Habits_Old
+        ''')
+        cursor.execute('DROP TABLE Habits_Old')
+    
+    if not _has_column(cursor, 'Meta', 'Garden_Id'):
+        cursor.execute('ALTER TABLE Meta RENAME TO Meta_Old')
+        cursor.execute('''
+            CREATE TABLE Meta (
+                Garden_Id INTEGER NOT NULL DEFAULT 1,
+                key TEXT NOT NULL CHECK (key != ''),
+                value TEXT NOT NULL CHECK (value != ''),
+                PRIMARY KEY (Garden_Id, key)
+            )
+        ''')
+        cursor.execute('INSERT INTO Meta (Garden_Id, key, value) SELECT 1, key, value FROM Meta_Old')
+        cursor.execute('DROP TABLE Meta_Old')
+
+def _migrate_days_mask(cursor):
+    """Add the weekday bitmask to habits and fill it from their comma separated days"""
+    if _has_column(cursor, 'Habits', 'Days_Mask'):
+        return
+    
+    from models.habit import days_to_mask
+    
+    cursor.execute('ALTER TABLE Habits ADD COLUMN Days_Mask INTEGER NOT NULL DEFAULT 0')
+    habits = cursor.execute('SELECT rowid, Days_Of_The_Week FROM Habits').fetchall()
+    cursor.executemany(
+        'UPDATE Habits SET Days_Mask = ? WHERE rowid = ?',
+        [(days_to_mask(days), rowid) for rowid, days in habits]
+    )
+
+def _migrate_state_version(cursor):
+    """Add the per-garden state version counter to the Garden table"""
+    if not _has_column(cursor, 'Garden', 'State_Version'):
+        cursor.execute('ALTER TABLE Garden ADD COLUMN State_Version INTEGER NOT NULL DEFAULT 0')
+
+def _migrate_habit_stats(cursor):
+    """Give habits created before streaks were tracked an empty stats row"""
+    cursor.execute('''
+        INSERT OR IGNORE INTO Habit_Stats (Garden_Id, Habit_Name)
+        SELECT Garden_Id, Name FROM Habits WHERE Name IS NOT NULL
+    ''')
+
+def _migrate_history_columns(cursor):
+    """Rebuild a history table from before analytics as a clustered table that also logs priority and water.
+    
+    Rows keep the habit's current priority, the best estimate left for past days. The table is
+    built under a new name and renamed into place: renaming the old one out of the way would
+    also rewrite the habit triggers to point at it, and they would break once it is dropped.
+    Those triggers are dropped for the rebuild and recreated with the rest of the schema.
+    """
+    if _has_column(cursor, 'Habit_History', 'Priority'):
+        return
+    
+    for trigger in ('Habits_Rename_Stats', 'Habits_Delete_Stats'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    
+    cursor.execute('''
+        CREATE TABLE Habit_History_New (
+            Garden_Id INTEGER NOT NULL,
+            Habit_Name TEXT NOT NULL,
+            Day TEXT NOT NULL,
+            Priority INTEGER NOT NULL,
+            Completed BOOLEAN NOT NULL,
+            Water_Earned INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (Garden_Id, Habit_Name, Day)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT INTO Habit_History_New (Garden_Id, Habit_Name, Day, Priority, Completed)
+        SELECT o.Garden_Id, o.Habit_Name, o.Day, h.Priority, o.Completed
+        FROM Habit_History o
+        JOIN Habits h ON h.Garden_Id = o.Garden_Id AND h.Name = o.Habit_Name
+    ''')
+    cursor.execute('DROP TABLE Habit_History')
+    cursor.execute('ALTER TABLE Habit_History_New RENAME TO Habit_History')
+
+def _state_version_triggers():
+    """Triggers that bump a garden's State_Version whenever any of its rows change"""
+    triggers = []
+    for table in ('Trees', 'Habits', 'Weather'):
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            triggers.append(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.title()}_State_Version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE Garden SET State_Version = State_Version + 1 WHERE rowid = {row}.Garden_Id;
+                END
+            ''')
+    
+    triggers.append('''
+        CREATE TRIGGER IF NOT EXISTS Garden_Update_State_Version
+        AFTER UPDATE OF Level, Experience, Experience_Required, Water, Daily_Water_Earned ON Garden
+        BEGIN
+            UPDATE Garden SET State_Version = State_Version + 1 WHERE rowid = NEW.rowid;
+        END
+    ''')
+    return triggers
+
+# Tables whose rows are versioned, and the Garden column counting their changes
+FRAGMENT_VERSION_TABLES = (('Trees', 'Trees_Version'), ('Habits', 'Habits_Version'), ('Habit_Stats', 'Habits_Version'), ('Weather', 'Weather_Version'))
+
+def _fragment_version_triggers(garden_key='rowid'):
+    """Triggers that bump a garden's State_Version and the version of the part of it whose rows change.
+    
+    garden_key is the Garden column the rows' Garden_Id refers to: the implicit rowid until
+    version 5 gave the table an Id primary key.
+    """
+    triggers = []
+    for table, version in FRAGMENT_VERSION_TABLES:
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            triggers.append(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.title()}_State_Version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE Garden SET State_Version = State_Version + 1, {version} = {version} + 1 WHERE {garden_key} = {row}.Garden_Id;
+                END
+            ''')
+    
+    triggers.append(f'''
+        CREATE TRIGGER IF NOT EXISTS Garden_Update_State_Version
+        AFTER UPDATE OF Level, Experience, Experience_Required, Water, Daily_Water_Earned ON Garden
+        BEGIN
+            UPDATE Garden SET State_Version = State_Version + 1 WHERE {garden_key} = NEW.{garden_key};
+        END
+    ''')
+    return triggers
+
+def _fragment_version_trigger_names():
+    """Names of the triggers _fragment_version_triggers creates"""
+    names = [f'{table}_{event}_State_Version' for table, _ in FRAGMENT_VERSION_TABLES for event in ('Insert', 'Update', 'Delete')]
+    return names + ['Garden_Update_State_Version']
+
+def _habit_stats_triggers():
+    """Triggers that make a habit's stats row and history follow it when it is added, renamed or deleted"""
+    return [
+        '''
+        CREATE TRIGGER IF NOT EXISTS Habits_Insert_Stats
+        AFTER INSERT ON Habits
+        BEGIN
+            INSERT OR IGNORE INTO Habit_Stats (Garden_Id, Habit_Name) VALUES (NEW.Garden_Id, NEW.Name);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS Habits_Rename_Stats
+        AFTER UPDATE OF Name ON Habits
+        WHEN OLD.Name IS NOT NEW.Name
+        BEGIN
+            UPDATE Habit_Stats SET Habit_Name = NEW.Name WHERE Garden_Id = OLD.Garden_Id AND Habit_Name = OLD.Name;
+            UPDATE Habit_History SET Habit_Name = NEW.Name WHERE Garden_Id = OLD.Garden_Id AND Habit_Name = OLD.Name;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS Habits_Delete_Stats
+        AFTER DELETE ON Habits
+        BEGIN
+            DELETE FROM Habit_Stats WHERE Garden_Id = OLD.Garden_Id AND Habit_Name = OLD.Name;
+            DELETE FROM Habit_History WHERE Garden_Id = OLD.Garden_Id AND Habit_Name = OLD.Name;
+        END
+        '''
+    ]
+
+def _has_column(cursor, table, column):
+    """Check whether a table already has the given column"""
+    return any(row[1] == column for row in cursor.execute(f'PRAGMA table_info({table})').fetchall())
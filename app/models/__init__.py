@@ -1,4 +1,6 @@
+from .transaction import Transaction
 from .garden import GardenModel
 from .tree import TreeModel
 from .habit import HabitModel
-from .weather import WeatherModel
\ No newline at end of file
+from .weather import WeatherModel
+from .schedule import ScheduleModel
\ No newline at end of file
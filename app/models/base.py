@@ -0,0 +1,16 @@
+class BaseModel:
+    """Shared plumbing for garden-scoped models"""
+    def __init__(self, db, garden_id):
+        self.db = db
+        self.garden_id = garden_id
+    
+    def _write(self, sql, params=()):
+        """Run a write and return its cursor.
+        
+        It commits on its own unless a transaction is already open, which it joins.
+        """
+        if self.db.in_transaction:
+            return self.db.execute(sql, params)
+        
+        with self.db:
+            return self.db.execute(sql, params)
\ No newline at end of file
@@ -1,40 +1,60 @@
-class GardenModel:
-    def __init__(self, db):
-        self.db = db
-    
+from models.base import BaseModel
+
+class GardenModel(BaseModel):
     def get_garden_data(self):
         """Retrieve current garden status"""
         return self.db.execute('''
             SELECT Level, Experience, Experience_Required, Water, Daily_Water_Earned
             FROM Garden 
-            LIMIT 1
-        ''').fetchone()
+            WHERE Id = ?
+        ''', (self.garden_id,)).fetchone()
+    
+    def get_state_version(self):
+        """Return the garden's state version, bumped by database triggers on every write"""
+        row = self.db.execute('SELECT State_Version FROM Garden WHERE Id = ?', (self.garden_id,)).fetchone()
+        return row[0] if row else 0
+    
+    def get_fragment_versions(self):
+        """Return the versions of the garden's trees, habits and weather, each bumped by triggers when they change"""
+        return self.db.execute('''
+            SELECT Trees_Version, Habits_Version, Weather_Version
+            FROM Garden
+            WHERE Id = ?
+        ''', (self.garden_id,)).fetchone()
     
     def update_experience(self, level, experience, experience_required):
         """Update garden experience and level"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Garden 
-                SET Level = ?, Experience = ?, Experience_Required = ?
-            ''', (level, experience, experience_required))
+        self._write('''
+            UPDATE Garden 
+            SET Level = ?, Experience = ?, Experience_Required = ?
+            WHERE Id = ?
+        ''', (level, experience, experience_required, self.garden_id))
     
-    def update_water(self, water_amount):
-        """Update garden water reserves"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Garden 
-                SET Water = Water + ?
-            ''', (water_amount,))
+    def spend_water(self, water_amount):
+        """Take water from the reserves only if they hold enough, returning the remaining water or None.
+        
+        The check and the update are one statement, so concurrent spends can never overdraw the reserves.
+        """
+        row = self._write('''
+            UPDATE Garden 
+            SET Water = Water - ?
+            WHERE Id = ? AND Water >= ?
+            RETURNING Water
+        ''', (water_amount, self.garden_id, water_amount)).fetchone()
+        return row[0] if row else None
     
-    def add_daily_water_earned(self, water_amount):
-        """Add to daily water earned counter"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Garden 
-                SET Daily_Water_Earned = Daily_Water_Earned + ?
-            ''', (water_amount,))
+    def grant_water(self, water_amount, daily_limit):
+        """Add earned water unless it would take the day's earnings past daily_limit.
+        
+        Returns the updated garden row, or None if the cap refused the grant.
+        """
+        return self._write('''
+            UPDATE Garden 
+            SET Water = Water + ?, Daily_Water_Earned = Daily_Water_Earned + ?
+            WHERE Id = ? AND Daily_Water_Earned + ? <= ?
+            RETURNING Level, Experience, Experience_Required, Water, Daily_Water_Earned
+        ''', (water_amount, water_amount, self.garden_id, water_amount, daily_limit)).fetchone()
     
     def reset_daily_water_earned(self):
-        """Reset daily water earned counter"""
-        with self.db:
-            self.db.execute('UPDATE Garden SET Daily_Water_Earned = 0')
\ No newline at end of file
+        """Reset daily water earned counter (does not commit)"""
+        self.db.execute('UPDATE Garden SET Daily_Water_Earned = 0 WHERE Id = ?', (self.garden_id,))
\ No newline at end of file
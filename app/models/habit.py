@@ -1,61 +1,175 @@
 import sqlite3
+from models.base import BaseModel
 
-class HabitModel:
-    def __init__(self, db):
-        self.db = db
-    
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def days_to_mask(days_of_week):
+    """Convert a comma separated list of day names into a weekday bitmask (Monday = bit 0)"""
+    days = [d.strip() for d in (days_of_week or '').split(',')]
+    return sum(1 << i for i, day in enumerate(WEEKDAYS) if day in days)
+
+def weekday_bit(date):
+    """Bitmask value for the weekday of a date or datetime"""
+    return 1 << date.weekday()
+
+def check_habit(name, priority, days_of_week):
+    """Validate a habit's fields against the Habits table, returning (priority as an int, error)"""
+    if not isinstance(name, str) or not name.strip():
+        return None, "Habit name cannot be empty."
+    if not isinstance(days_of_week, str) or not days_of_week.strip():
+        return None, "Choose at least one day of the week."
+    try:
+        priority = int(priority)
+    except (TypeError, ValueError):
+        return None, "Habit priority must be a number from 0 to 5."
+    if not 0 <= priority <= 5:
+        return None, "Habit priority must be a number from 0 to 5."
+    return priority, None
+
+class HabitModel(BaseModel):
     def get_habits_data(self):
-        """Retrieve all habits"""
+        """Retrieve all habits with their streak counters"""
+        return self.db.execute('''
+            SELECT h.Name, h.Creation_Date, h.Priority, h.Days_Of_The_Week, h.Days_Mask, h.Completed,
+                   s.Current_Streak, s.Best_Streak, s.Completions, s.Scheduled_Days
+            FROM Habits h
+            LEFT JOIN Habit_Stats s ON s.Garden_Id = h.Garden_Id AND s.Habit_Name = h.Name
+            WHERE h.Garden_Id = ?
+        ''', (self.garden_id,)).fetchall()
+    
+    def get_active_habits_data(self, day_bit):
+        """Retrieve habits scheduled on the weekday given as a bitmask value"""
+        return self.db.execute('''
+            SELECT h.Name, h.Creation_Date, h.Priority, h.Days_Of_The_Week, h.Days_Mask, h.Completed,
+                   s.Current_Streak, s.Best_Streak, s.Completions, s.Scheduled_Days
+            FROM Habits h
+            LEFT JOIN Habit_Stats s ON s.Garden_Id = h.Garden_Id AND s.Habit_Name = h.Name
+            WHERE h.Garden_Id = ? AND h.Days_Mask & ? != 0
+        ''', (self.garden_id, day_bit)).fetchall()
+    
+    def get_habit(self, name):
+        """Retrieve a single habit by name"""
         return self.db.execute('''
-            SELECT Name, Creation_Date, Priority, Days_Of_The_Week, Completed 
-            FROM Habits
-        ''').fetchall()
+            SELECT h.Name, h.Creation_Date, h.Priority, h.Days_Of_The_Week, h.Days_Mask, h.Completed,
+                   s.Current_Streak, s.Best_Streak, s.Completions, s.Scheduled_Days
+            FROM Habits h
+            LEFT JOIN Habit_Stats s ON s.Garden_Id = h.Garden_Id AND s.Habit_Name = h.Name
+            WHERE h.Garden_Id = ? AND h.Name = ?
+        ''', (self.garden_id, name)).fetchone()
     
     def add_habit(self, name, priority, days_of_week):
         """Add a new habit"""
+        priority, error = check_habit(name, priority, days_of_week)
+        if error:
+            return False, error
+        
         try:
-            with self.db:
-                self.db.execute(
-                    "INSERT INTO Habits (Name, Creation_Date, Priority, Days_Of_The_Week, Completed) VALUES (?, datetime('now'), ?, ?, false)",
-                    (name, priority, days_of_week)
-                )
+            self._write(
+                "INSERT INTO Habits (Garden_Id, Name, Creation_Date, Priority, Days_Of_The_Week, Days_Mask, Completed) VALUES (?, ?, datetime('now'), ?, ?, ?, false)",
+                (self.garden_id, name, priority, days_of_week, days_to_mask(days_of_week))
+            )
             return True, None
-        except sqlite3.IntegrityError:
+        except sqlite3.IntegrityError as e:
+            if 'UNIQUE' not in str(e):
+                raise
             return False, "A habit with that name already exists."
     
     def update_habit(self, existing_name, new_name, priority, days_of_week):
         """Update an existing habit"""
+        priority, error = check_habit(new_name, priority, days_of_week)
+        if error:
+            return False, error
+        
         try:
-            with self.db:
-                cursor = self.db.execute('''
-                    UPDATE Habits 
-                    SET Name = ?, Priority = ?, Days_Of_The_Week = ?
-                    WHERE Name = ?
-                ''', (new_name, priority, days_of_week, existing_name))
-                
-                if cursor.rowcount == 0:
-                    return False, "No habit found with that name."
+            cursor = self._write('''
+                UPDATE Habits 
+                SET Name = ?, Priority = ?, Days_Of_The_Week = ?, Days_Mask = ?
+                WHERE Garden_Id = ? AND Name = ?
+            ''', (new_name, priority, days_of_week, days_to_mask(days_of_week), self.garden_id, existing_name))
+            
+            if cursor.rowcount == 0:
+                return False, "No habit found with that name."
             return True, None
-        except sqlite3.IntegrityError:
+        except sqlite3.IntegrityError as e:
+            if 'UNIQUE' not in str(e):
+                raise
             return False, "The new habit name already exists."
     
     def delete_habit(self, name):
         """Delete a habit"""
-        with self.db:
-            cursor = self.db.execute('DELETE FROM Habits WHERE Name = ?', (name,))
-            return cursor.rowcount > 0
+        cursor = self._write('DELETE FROM Habits WHERE Garden_Id = ? AND Name = ?', (self.garden_id, name))
+        return cursor.rowcount > 0
     
     def complete_habit(self, name):
-        """Mark a habit as completed"""
-        with self.db:
-            result = self.db.execute('''
-                UPDATE Habits 
-                SET Completed = 1 
-                WHERE Name = ?
-            ''', (name,))
-            return result.rowcount > 0
+        """Mark a habit as completed, returning False if there is no such habit or it already is"""
+        result = self._write('''
+            UPDATE Habits 
+            SET Completed = 1 
+            WHERE Garden_Id = ? AND Name = ? AND Completed = 0
+        ''', (self.garden_id, name))
+        return result.rowcount > 0
     
     def reset_all_habits(self):
-        """Reset all habits to incomplete"""
-        with self.db:
-            self.db.execute('UPDATE Habits SET Completed = 0')
\ No newline at end of file
+        """Reset all habits to incomplete (does not commit)"""
+        self.db.execute('UPDATE Habits SET Completed = 0 WHERE Garden_Id = ?', (self.garden_id,))
+    
+    def record_completion(self, name, day, priority, water_earned):
+        """Append a day's completion to the history and extend the habit's streak, once per day"""
+        self._write('''
+            INSERT INTO Habit_History (Garden_Id, Habit_Name, Day, Priority, Completed, Water_Earned)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT (Garden_Id, Habit_Name, Day) DO UPDATE SET Water_Earned = Water_Earned + excluded.Water_Earned
+        ''', (self.garden_id, name, day, priority, water_earned))
+        self._write('''
+            UPDATE Habit_Stats 
+            SET Current_Streak = Current_Streak + 1,
+                Best_Streak = MAX(Best_Streak, Current_Streak + 1),
+                Completions = Completions + 1,
+                Scheduled_Days = Scheduled_Days + 1,
+                Last_Completed_Day = ?
+            WHERE Garden_Id = ? AND Habit_Name = ? AND Last_Completed_Day IS NOT ?
+        ''', (day, self.garden_id, name, day))
+    
+    def record_missed_days(self, days, incomplete_only):
+        """Log every habit scheduled on each of the given dates as missed and break its streak (does not commit).
+        
+        With incomplete_only, habits already completed (the Completed flag) are left out,
+        which is how the day the flags belong to is closed.
+        """
+        completed_filter = 'AND Completed = 0' if incomplete_only else ''
+        self.db.executemany(f'''
+            INSERT OR IGNORE INTO Habit_History (Garden_Id, Habit_Name, Day, Priority, Completed)
+            SELECT Garden_Id, Name, ?, Priority, 0 FROM Habits
+            WHERE Garden_Id = ? AND Days_Mask & ? != 0 {completed_filter}
+        ''', [(day.isoformat(), self.garden_id, weekday_bit(day)) for day in days])
+        
+        # A weekday repeats across a long catch-up, so count its misses once per weekday
+        misses = {}
+        for day in days:
+            misses[weekday_bit(day)] = misses.get(weekday_bit(day), 0) + 1
+        
+        self.db.executemany(f'''
+            UPDATE Habit_Stats 
+            SET Current_Streak = 0, Scheduled_Days = Scheduled_Days + ?
+            WHERE Garden_Id = ? AND Habit_Name IN (
+                SELECT Name FROM Habits WHERE Garden_Id = ? AND Days_Mask & ? != 0 {completed_filter}
+            )
+        ''', [(count, self.garden_id, self.garden_id, day_bit) for day_bit, count in misses.items()])
+    
+    def get_history_by_day(self, since):
+        """Totals of the history from the date since on, one row per (day, priority), read from a covering index"""
+        return self.db.execute('''
+            SELECT Day, Priority, COUNT(*) AS Scheduled, SUM(Completed) AS Completed, SUM(Water_Earned) AS Water_Earned
+            FROM Habit_History
+            WHERE Garden_Id = ? AND Day >= ?
+            GROUP BY Day, Priority
+        ''', (self.garden_id, since)).fetchall()
+    
+    def get_history_by_habit(self, since):
+        """Totals of the history from the date since on, one row per habit"""
+        return self.db.execute('''
+            SELECT Habit_Name, COUNT(*) AS Scheduled, SUM(Completed) AS Completed, SUM(Water_Earned) AS Water_Earned
+            FROM Habit_History
+            WHERE Garden_Id = ? AND Day >= ?
+            GROUP BY Habit_Name
+        ''', (self.garden_id, since)).fetchall()
\ No newline at end of file
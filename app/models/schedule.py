@@ -0,0 +1,19 @@
+class ScheduleModel:
+    """Cross-garden queries used by the rollover scheduler"""
+    def __init__(self, db):
+        self.db = db
+    
+    def get_earliest_last_run(self):
+        """Return the oldest global_last_run across all gardens"""
+        row = self.db.execute('''
+            SELECT MIN(value) FROM Meta WHERE key = 'global_last_run'
+        ''').fetchone()
+        return row[0] if row else None
+    
+    def get_gardens_due(self, cutoff):
+        """Return ids of gardens whose last rollover is at or before the cutoff timestamp"""
+        return [row[0] for row in self.db.execute('''
+            SELECT Garden_Id FROM Meta
+            WHERE key = 'global_last_run' AND value <= ?
+            ORDER BY value
+        ''', (cutoff,)).fetchall()]
\ No newline at end of file
@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+
+class Transaction:
+    """Holds one database transaction open across many model and service calls.
+    
+    Model writes join the open transaction instead of committing on their own. It
+    commits on a clean exit and rolls back if the block raises; savepoint() scopes part
+    of the work so it can be undone without abandoning the rest. Opened inside another
+    transaction (a batch), it becomes a savepoint of that one.
+    """
+    def __init__(self, db):
+        self.db = db
+        self.savepoints = 0
+        self.nested = None
+    
+    def __enter__(self):
+        if self.db.in_transaction:
+            self.nested = f'tx_{id(self)}'
+            self.db.execute(f'SAVEPOINT {self.nested}')
+        else:
+            self.db.execute('BEGIN IMMEDIATE')
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.nested is not None:
+            if exc_type is not None:
+                self.db.execute(f'ROLLBACK TO {self.nested}')
+            self.db.execute(f'RELEASE {self.nested}')
+            self.nested = None
+        elif exc_type is None:
+            self.db.commit()
+        else:
+            self.db.rollback()
+    
+    @contextmanager
+    def savepoint(self):
+        """Undo the writes made inside the block if it raises, keeping earlier work"""
+        name = f'sp_{self.savepoints}'
+        self.savepoints += 1
+        
+        self.db.execute(f'SAVEPOINT {name}')
+        try:
+            yield
+        except BaseException:
+            self.db.execute(f'ROLLBACK TO {name}')
+            raise
+        finally:
+            self.db.execute(f'RELEASE {name}')
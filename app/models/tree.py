@@ -1,81 +1,75 @@
 import datetime
+from models.base import BaseModel
+from config import STARTING_WATER_REQUIRED
 
-class TreeModel:
-    def __init__(self, db):
-        self.db = db
-    
+class TreeModel(BaseModel):
     def get_trees_data(self):
         """Retrieve first 10 trees ordered by creation date"""
         return self.db.execute('''
             SELECT rowid, *, Creation_Date 
             FROM Trees 
+            WHERE Garden_Id = ?
             ORDER BY Creation_Date 
             LIMIT 10
-        ''').fetchall()
+        ''', (self.garden_id,)).fetchall()
     
     def get_tree_by_id(self, tree_id):
         """Get a specific tree by its rowid"""
         return self.db.execute('''
-            SELECT rowid, * FROM Trees WHERE rowid = ?
-        ''', (tree_id,)).fetchone()
+            SELECT rowid, * FROM Trees WHERE rowid = ? AND Garden_Id = ?
+        ''', (tree_id, self.garden_id)).fetchone()
+    
+    def get_tree_by_index(self, tree_index):
+        """Get the tree at a slot index (position in get_trees_data), or None"""
+        if not 0 <= tree_index < 10:
+            return None
+        
+        return self.db.execute('''
+            SELECT rowid, * 
+            FROM Trees 
+            WHERE Garden_Id = ?
+            ORDER BY Creation_Date 
+            LIMIT 1 OFFSET ?
+        ''', (self.garden_id, tree_index)).fetchone()
     
     def plant_tree(self, name="My Tree"):
         """Plant a new tree"""
         now = datetime.datetime.now().isoformat()
-        with self.db:
-            self.db.execute('''
-                INSERT INTO Trees (Name, Creation_Date, Stage, Water, Water_Required, Last_Watered, Moisture)
-                VALUES (?, ?, 1, 0, 50, ?, 60)
-            ''', (name, now, now))
+        self._write('''
+            INSERT INTO Trees (Name, Creation_Date, Stage, Water, Water_Required, Last_Watered, Moisture, Garden_Id)
+            VALUES (?, ?, 1, 0, ?, ?, 60, ?)
+        ''', (name, now, STARTING_WATER_REQUIRED, now, self.garden_id))
     
     def update_tree_name(self, tree_id, new_name):
-        """Update tree name"""
-        with self.db:
-            self.db.execute("UPDATE Trees SET Name = ? WHERE rowid = ?", (new_name, tree_id))
-    
-    def water_tree(self, tree_id, amount):
-        """Add water to a tree"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Trees 
-                SET Water = Water + ? 
-                WHERE rowid = ?
-            ''', (amount, tree_id))
+        """Update tree name, returning (success, error)"""
+        if not isinstance(new_name, str) or not new_name.strip():
+            return False, "Tree name cannot be empty."
+        
+        self._write("UPDATE Trees SET Name = ? WHERE rowid = ? AND Garden_Id = ?", (new_name, tree_id, self.garden_id))
+        return True, None
     
-    def update_tree_growth(self, tree_id, water, stage, water_required):
-        """Update tree growth parameters"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Trees 
-                SET Water = ?, Stage = ?, Water_Required = ? 
-                WHERE rowid = ?
-            ''', (water, stage, water_required, tree_id))
-    
-    def update_tree_moisture(self, tree_id, moisture):
-        """Update tree moisture level"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Trees 
-                SET Moisture = ? 
-                WHERE rowid = ?
-            ''', (moisture, tree_id))
+    def update_watered_tree(self, tree_id, water, stage, water_required, moisture):
+        """Store a watered tree's growth and moisture and stamp it as watered, in one statement"""
+        now = datetime.datetime.now().isoformat()
+        self._write('''
+            UPDATE Trees 
+            SET Water = ?, Stage = ?, Water_Required = ?, Moisture = ?, Last_Watered = ?
+            WHERE rowid = ? AND Garden_Id = ?
+        ''', (water, stage, water_required, moisture, now, tree_id, self.garden_id))
     
-    def update_last_watered(self, tree_id):
-        """Update the last watered timestamp"""
-        import datetime
+    def update_watered_trees(self, rows):
+        """Bulk store watered trees from (rowid, water, stage, water_required, moisture) rows (does not commit)"""
         now = datetime.datetime.now().isoformat()
-        with self.db:
-            self.db.execute('''
-                UPDATE Trees 
-                SET Last_Watered = ? 
-                WHERE rowid = ?
-            ''', (now, tree_id))
+        self.db.executemany('''
+            UPDATE Trees
+            SET Water = ?, Stage = ?, Water_Required = ?, Moisture = ?, Last_Watered = ?
+            WHERE rowid = ? AND Garden_Id = ?
+        ''', [(water, stage, water_required, moisture, now, tree_id, self.garden_id) for tree_id, water, stage, water_required, moisture in rows])
     
-    def update_tree_water_only(self, tree_id, water_amount):
-        """Update tree water amount without triggering growth"""
-        with self.db:
-            self.db.execute('''
-                UPDATE Trees 
-                SET Water = ? 
-                WHERE rowid = ?
-            ''', (water_amount, tree_id))
\ No newline at end of file
+    def update_trees_moisture_and_water(self, rows):
+        """Bulk update trees from (moisture, water, rowid) rows (does not commit)"""
+        self.db.executemany('''
+            UPDATE Trees 
+            SET Moisture = ?, Water = ? 
+            WHERE rowid = ? AND Garden_Id = ?
+        ''', [(moisture, water, tree_id, self.garden_id) for moisture, water, tree_id in rows])
\ No newline at end of file
@@ -1,62 +1,59 @@
-import random
+import datetime
 from config import *
+from models.base import BaseModel
 
-class WeatherModel:
-    def __init__(self, db):
-        self.db = db
-    
+class WeatherModel(BaseModel):
     def get_all_weather(self):
-        """Return all weather rows ordered oldest→newest"""
+        """Return the forecast window ordered from today onward"""
         return self.db.execute('''
-            SELECT Temperature, Humidity, State
+            SELECT Day, Temperature, Humidity, State
             FROM Weather
-            ORDER BY ROWID ASC
-        ''').fetchall()
-    
-    def get_weather_count(self):
-        """Return number of rows in Weather."""
-        cur = self.db.execute('SELECT COUNT(*) FROM Weather')
-        return cur.fetchone()[0]
+            WHERE Garden_Id = ?
+            ORDER BY Day ASC
+        ''', (self.garden_id,)).fetchall()
     
     def get_last_weather(self):
-        """Return the last (most recent) weather row."""
+        """Return the furthest forecast day as (Day, Temperature, Humidity, State), or None"""
         return self.db.execute('''
-            SELECT Temperature, Humidity, State 
+            SELECT Day, Temperature, Humidity, State 
             FROM Weather
-            ORDER BY ROWID DESC
+            WHERE Garden_Id = ?
+            ORDER BY Day DESC
             LIMIT 1
-        ''').fetchone()
+        ''', (self.garden_id,)).fetchone()
     
-    def insert_weather(self, temp, hum, state):
-        """Insert new weather data"""
-        self.db.execute('''
-            INSERT OR REPLACE INTO Weather (Temperature, Humidity, State)
-            VALUES (?, ?, ?)
-        ''', (int(temp), int(hum), int(state)))
-        self.db.commit()
+    def put_weather(self, rows, horizon):
+        """Write (day, temp, hum, state) rows over the ring buffer slots of a horizon-day window (does not commit)"""
+        self.db.executemany('''
+            INSERT INTO Weather (Garden_Id, Slot, Day, Temperature, Humidity, State)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (Garden_Id, Slot) DO UPDATE SET
+                Day = excluded.Day, Temperature = excluded.Temperature,
+                Humidity = excluded.Humidity, State = excluded.State
+        ''', [(self.garden_id, day % horizon, day, int(temp), int(hum), int(state)) for day, temp, hum, state in rows])
     
-    def delete_oldest_weather(self):
-        """Delete the oldest weather record"""
-        self.db.execute('''
-            DELETE FROM Weather
-            WHERE ROWID = (
-                SELECT ROWID FROM Weather
-                ORDER BY ROWID ASC LIMIT 1
-            )
-        ''')
-        self.db.commit()
+    def replace_weather(self, rows, horizon):
+        """Replace the whole forecast window with (day, temp, hum, state) rows (does not commit)"""
+        self.db.execute('DELETE FROM Weather WHERE Garden_Id = ?', (self.garden_id,))
+        self.put_weather(rows, horizon)
     
     def get_meta(self, key):
         """Get metadata value"""
-        cur = self.db.execute('SELECT value FROM Meta WHERE key = ?', (key,))
+        cur = self.db.execute('SELECT value FROM Meta WHERE Garden_Id = ? AND key = ?', (self.garden_id, key))
         row = cur.fetchone()
         return row[0] if row else None
     
+    def get_garden_day(self):
+        """Date of the garden day in progress, the day its last rollover started"""
+        last_run = self.get_meta('global_last_run')
+        if last_run is None:
+            return datetime.date.today()
+        return datetime.datetime.fromisoformat(last_run).date()
+    
     def set_meta(self, key, value):
-        """Set metadata value"""
+        """Set metadata value (does not commit)"""
         self.db.execute('''
-            INSERT INTO Meta(key, value)
-            VALUES(?, ?)
-            ON CONFLICT(key) DO UPDATE SET value=excluded.value
-        ''', (key, value))
-        self.db.commit()
\ No newline at end of file
+            INSERT INTO Meta(Garden_Id, key, value)
+            VALUES(?, ?, ?)
+            ON CONFLICT(Garden_Id, key) DO UPDATE SET value=excluded.value
+        ''', (self.garden_id, key, value))
\ No newline at end of file
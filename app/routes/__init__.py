@@ -1,3 +1,5 @@
 from .main import main_bp
 from .tree_routes import tree_bp
-from .habit_routes import habit_bp
\ No newline at end of file
+from .habit_routes import habit_bp
+from .batch_routes import batch_bp
+from .backup_routes import backup_bp
\ No newline at end of file
@@ -0,0 +1,49 @@
+import datetime
+import os
+import sqlite3
+import time
+from flask import Blueprint, Response, jsonify, request
+from database import get_db, open_db, get_garden_id
+from database.backup import backup_database, export_gardens, import_gardens
+from services import event_broker
+from config import BACKUP_DIRECTORY
+
+backup_bp = Blueprint('backup', __name__)
+
+@backup_bp.route('/backup', methods=['POST'])
+def backup():
+    """Copy the save file into the backup directory without blocking writers"""
+    name = f"habit_tree_{datetime.datetime.utcnow():%Y%m%dT%H%M%S%f}.db"
+    start = time.perf_counter()
+    pages = backup_database(get_db(), os.path.join(BACKUP_DIRECTORY, name))
+    return jsonify(success=True, backup=name, pages=pages, seconds=time.perf_counter() - start)
+
+@backup_bp.route('/export')
+def export():
+    """Stream the garden as NDJSON"""
+    garden_id = get_garden_id()
+    
+    # The stream outlives the request, so it reads on a connection of its own
+    db = open_db()
+    
+    def stream():
+        try:
+            yield from export_gardens(db, [garden_id])
+        finally:
+            db.close()
+    
+    return Response(stream(), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename=garden_{garden_id}.ndjson'
+    })
+
+@backup_bp.route('/import', methods=['POST'])
+def import_garden():
+    """Replace the garden with the one in an NDJSON export, read from the request body line by line"""
+    garden_id = get_garden_id()
+    try:
+        import_gardens(get_db(), request.stream, garden_id=garden_id)
+    except (ValueError, sqlite3.IntegrityError) as e:
+        return jsonify(success=False, error=str(e)), 400
+    
+    event_broker.publish(garden_id, "import", {})
+    return jsonify(success=True)
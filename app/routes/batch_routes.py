@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, request
+from database import get_db, get_garden_id
+from services import BatchService, event_broker
+from config import BATCH_MAX_OPERATIONS
+
+batch_bp = Blueprint('batch', __name__)
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch():
+    """Apply an ordered list of habit and tree operations in one transaction"""
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    
+    if not isinstance(operations, list) or not operations:
+        return jsonify(success=False, error="operations must be a non-empty list"), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify(success=False, error=f"A batch can hold at most {BATCH_MAX_OPERATIONS} operations"), 413
+    
+    db = get_db()
+    garden_id = get_garden_id()
+    response, events = BatchService(db, garden_id).run(operations, atomic=bool(data.get('atomic')))
+    
+    # Listeners only hear about the batch once it is committed
+    for event_type, event_data in events:
+        event_broker.publish(garden_id, event_type, event_data)
+    return jsonify(response)
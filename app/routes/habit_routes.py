@@ -1,10 +1,15 @@
 from flask import Blueprint, jsonify, request
-from database import get_db
+from database import get_db, get_garden_id
 from models import GardenModel, HabitModel
-from services import GardenService, HabitService
+from services import GardenService, HabitService, event_broker
 
 habit_bp = Blueprint('habit', __name__)
 
+def _habit_service(db, garden_id):
+    """Build the habit service for the current garden"""
+    garden_service = GardenService(GardenModel(db, garden_id))
+    return HabitService(HabitModel(db, garden_id), garden_service)
+
 @habit_bp.route('/add_habit', methods=['POST'])
 def add_habit():
     """Add a new habit"""
@@ -14,13 +19,16 @@ def add_habit():
     habit_days_of_the_week = data.get('days_of_the_week')
     
     db = get_db()
-    habit_model = HabitModel(db)
-    success, error = habit_model.add_habit(habit_name, habit_priority, habit_days_of_the_week)
+    garden_id = get_garden_id()
+    habit_service = _habit_service(db, garden_id)
+    success, error = habit_service.habit_model.add_habit(habit_name, habit_priority, habit_days_of_the_week)
     
     if not success:
         return jsonify(success=False, error=error), 400
     
-    return jsonify(success=True)
+    habit = habit_service.get_habit_state(habit_name)
+    event_broker.publish(garden_id, "habit", {"habit": habit})
+    return jsonify(success=True, habit=habit)
 
 @habit_bp.route('/edit_habit', methods=['PUT'])
 def edit_habit():
@@ -32,14 +40,17 @@ def edit_habit():
     habit_days_of_the_week = data.get('days_of_the_week')
     
     db = get_db()
-    habit_model = HabitModel(db)
-    success, error = habit_model.update_habit(existing_habit_name, new_habit_name, habit_priority, habit_days_of_the_week)
+    garden_id = get_garden_id()
+    habit_service = _habit_service(db, garden_id)
+    success, error = habit_service.habit_model.update_habit(existing_habit_name, new_habit_name, habit_priority, habit_days_of_the_week)
     
     if not success:
         status_code = 404 if "not found" in error.lower() else 400
         return jsonify(success=False, error=error), status_code
     
-    return jsonify(success=True)
+    habit = habit_service.get_habit_state(new_habit_name)
+    event_broker.publish(garden_id, "habit", {"habit": habit, "previous_name": existing_habit_name})
+    return jsonify(success=True, previous_name=existing_habit_name, habit=habit)
 
 @habit_bp.route('/delete_habit', methods=['DELETE'])
 def delete_habit():
@@ -48,13 +59,15 @@ def delete_habit():
     habit_name = data.get('habit_name')
     
     db = get_db()
-    habit_model = HabitModel(db)
+    garden_id = get_garden_id()
+    habit_model = HabitModel(db, garden_id)
     success = habit_model.delete_habit(habit_name)
     
     if not success:
         return jsonify(success=False, error="No habit found with that name."), 404
     
-    return jsonify(success=True)
+    event_broker.publish(garden_id, "habit_deleted", {"name": habit_name})
+    return jsonify(success=True, name=habit_name)
 
 @habit_bp.route('/complete_habit', methods=['POST'])
 def complete_habit():
@@ -62,14 +75,16 @@ def complete_habit():
     habit_name = request.json.get('habit_name')
     
     db = get_db()
-    garden_model = GardenModel(db)
-    habit_model = HabitModel(db)
-    garden_service = GardenService(garden_model)
-    habit_service = HabitService(habit_model, garden_service)
+    garden_id = get_garden_id()
+    habit_service = _habit_service(db, garden_id)
     
     success, error = habit_service.complete_habit(habit_name)
     
     if not success:
-        return jsonify(success=False, error=error), 404
+        return jsonify(success=False, error=error), 404 if "not found" in error.lower() else 409
     
-    return jsonify(success=True)
\ No newline at end of file
+    habit = habit_service.get_habit_state(habit_name)
+    garden = habit_service.garden_service.get_garden_state()
+    event_broker.publish(garden_id, "habit", {"habit": habit})
+    event_broker.publish(garden_id, "garden", garden)
+    return jsonify(success=True, habit=habit, garden=garden)
\ No newline at end of file
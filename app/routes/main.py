@@ -1,17 +1,19 @@
-from flask import Blueprint, render_template
-from database import get_db
+import json
+from flask import Blueprint, Response, abort, jsonify, make_response, render_template, request
+from database import get_db, get_garden_id, create_garden
 from models import GardenModel, TreeModel, HabitModel, WeatherModel
-from services import GardenService, TreeService, HabitService, TimeService
-from config import (
-    MOISTURE_VERY_DRY_THRESHOLD, MOISTURE_DRY_THRESHOLD, 
-    MOISTURE_NEUTRAL_THRESHOLD, MOISTURE_HEALTHY_THRESHOLD,
-    MOISTURE_VERY_DRY_LABEL, MOISTURE_DRY_LABEL,
-    MOISTURE_NEUTRAL_LABEL, MOISTURE_HEALTHY_LABEL, MOISTURE_TOO_MOIST_LABEL
-)
+from models.habit import weekday_bit
+from services import GardenService, TreeService, HabitService, TimeService, AnalyticsService, event_broker, metrics, fragment_cache
+from services.time_service import rollover_metrics
+from config import ROLLOVER_ON_REQUEST, SSE_KEEPALIVE_SECONDS, SSE_MAX_THREADED_STREAMS, METRICS_ENABLED, ANALYTICS_DEFAULT_DAYS, ANALYTICS_MAX_DAYS
 import datetime
+import threading
 
 main_bp = Blueprint('main', __name__)
 
+# Open /events streams under the threaded server, each of which holds a worker thread
+threaded_streams = threading.BoundedSemaphore(SSE_MAX_THREADED_STREAMS)
+
 def state_to_text(state):
     """Convert numeric state (0–100) into weather description."""
     s = float(state)
@@ -28,75 +30,178 @@ def state_to_text(state):
     else:
         return "Unknown"
 
-def calculate_time_until_day_ends(weather_model):
-    """Calculate time remaining until day ends"""
+def get_day_end(weather_model):
+    """Return the UTC datetime at which the garden's current day ends, or None"""
     last_run_text = weather_model.get_meta('global_last_run')
     if not last_run_text:
-        return "Unknown"
+        return None
     
     try:
-        last_run = datetime.datetime.fromisoformat(last_run_text)
-        next_day = last_run + datetime.timedelta(days=1)
-        now = datetime.datetime.utcnow()
-        
-        if now >= next_day:
-            return "Day ended"
-        
-        time_left = next_day - now
-        hours = time_left.seconds // 3600
-        minutes = (time_left.seconds % 3600) // 60
-        
-        return f"{hours}h {minutes}m"
-    except:
+        return datetime.datetime.fromisoformat(last_run_text) + datetime.timedelta(days=1)
+    except ValueError:
+        return None
+
+def calculate_time_until_day_ends(day_end):
+    """Calculate time remaining until day ends"""
+    if day_end is None:
         return "Unknown"
+    
+    now = datetime.datetime.utcnow()
+    if now >= day_end:
+        return "Day ended"
+    
+    time_left = day_end - now
+    hours = time_left.seconds // 3600
+    minutes = (time_left.seconds % 3600) // 60
+    
+    return f"{hours}h {minutes}m"
 
 @main_bp.route('/')
 def index():
     """Main dashboard showing garden status, trees, and habits"""
     db = get_db()
+    garden_id = get_garden_id()
     
     # Initialize models
-    garden_model = GardenModel(db)
-    tree_model = TreeModel(db)
-    habit_model = HabitModel(db)
-    weather_model = WeatherModel(db)
+    garden_model = GardenModel(db, garden_id)
+    tree_model = TreeModel(db, garden_id)
+    habit_model = HabitModel(db, garden_id)
+    weather_model = WeatherModel(db, garden_id)
+    
+    # Rollover normally runs in the scheduler; unless opted out, the request path also checks,
+    # which keeps days rolling over on servers where no scheduler was started
+    if ROLLOVER_ON_REQUEST:
+        TimeService(garden_id).trigger_daily_updates()
+    
+    # The page only depends on the garden's state, so answer unchanged views with 304 before
+    # building anything. Active habits follow the garden day, which only moves on a rollover,
+    # and a rollover rewrites the weather and so bumps the state version too
+    etag = f"{garden_id}-{garden_model.get_state_version()}"
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_index(garden_model, tree_model, habit_model, weather_model))
     
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(['Cookie', 'X-Garden-Id'])
+    return response
+
+def render_index(garden_model, tree_model, habit_model, weather_model):
+    """Render the dashboard template, reusing the cached fragments whose data has not changed"""
     # Initialize services
     garden_service = GardenService(garden_model)
     tree_service = TreeService(tree_model, garden_model)
     habit_service = HabitService(habit_model, garden_service)
-    time_service = TimeService()
-    
-    # Check time and trigger global daily updates
-    time_service.trigger_daily_updates()
     
-    # Get processed data
+    # Read the versions before the data, so a fragment is never cached under a newer version than it shows
+    garden_id = garden_model.garden_id
+    versions = garden_model.get_fragment_versions()
     garden_data = garden_model.get_garden_data()
-    active_habits, scheduled_habits = habit_service.process_habits()
-    trees = tree_service.process_trees(garden_data['Level'])
-    weather = weather_model.get_all_weather()
-    time_until_day_ends = calculate_time_until_day_ends(weather_model)
-    
-    # Moisture configuration for template
-    moisture_config = {
-        'very_dry_threshold': MOISTURE_VERY_DRY_THRESHOLD,
-        'dry_threshold': MOISTURE_DRY_THRESHOLD,
-        'neutral_threshold': MOISTURE_NEUTRAL_THRESHOLD,
-        'healthy_threshold': MOISTURE_HEALTHY_THRESHOLD,
-        'very_dry_label': MOISTURE_VERY_DRY_LABEL,
-        'dry_label': MOISTURE_DRY_LABEL,
-        'neutral_label': MOISTURE_NEUTRAL_LABEL,
-        'healthy_label': MOISTURE_HEALTHY_LABEL,
-        'too_moist_label': MOISTURE_TOO_MOIST_LABEL
+    today = weather_model.get_garden_day()
+    
+    # Each fragment is only queried and rendered when its current version is not cached
+    fragments = {
+        "trees": fragment_cache.get_or_render(
+            "trees", (garden_id, versions['Trees_Version'], garden_data['Level']),
+            lambda: render_template("fragments/trees.html", trees=tree_service.process_trees(garden_data['Level']))
+        ),
+        "weather": fragment_cache.get_or_render(
+            "weather", (garden_id, versions['Weather_Version']),
+            lambda: render_template("fragments/weather.html", weather=weather_model.get_all_weather())
+        ),
+        "habits": fragment_cache.get_or_render(
+            "habits", (garden_id, versions['Habits_Version'], weekday_bit(today)),
+            lambda: render_habits(habit_service, today)
+        )
     }
+    day_end = get_day_end(weather_model)
+    time_until_day_ends = calculate_time_until_day_ends(day_end)
     
     return render_template("index.html",
-        trees=trees,
-        active_habits=active_habits,
-        scheduled_habits=scheduled_habits,
+        fragments=fragments,
         garden=garden_data,
-        weather=weather,
         time_until_day_ends=time_until_day_ends,
-        state_to_text=state_to_text,
-        moisture_config=moisture_config
-    )
\ No newline at end of file
+        day_ends_at=day_end.isoformat() + "Z" if day_end else "",
+        state_to_text=state_to_text
+    )
+
+def render_habits(habit_service, today):
+    """Render the active and scheduled habit lists for the weekday of today, the garden day"""
+    active_habits, scheduled_habits = habit_service.process_habits(today)
+    return render_template("fragments/habits.html", active_habits=active_habits, scheduled_habits=scheduled_habits)
+
+@main_bp.route('/gardens', methods=['POST'])
+def new_garden():
+    """Create a new garden and switch this browser to it with the garden_id cookie"""
+    garden_id = create_garden(get_db())
+    response = jsonify(success=True, garden_id=garden_id)
+    response.set_cookie('garden_id', str(garden_id), samesite='Lax')
+    return response, 201
+
+@main_bp.route('/analytics')
+def get_analytics():
+    """Habit completion heatmap, weekday rates and priority-weighted scores over the last days garden days"""
+    days = request.args.get('days', ANALYTICS_DEFAULT_DAYS, type=int)
+    if not 1 <= days <= ANALYTICS_MAX_DAYS:
+        return jsonify(success=False, error=f"days must be between 1 and {ANALYTICS_MAX_DAYS}"), 400
+    
+    db = get_db()
+    garden_id = get_garden_id()
+    garden_model = GardenModel(db, garden_id)
+    habit_service = HabitService(HabitModel(db, garden_id), GardenService(garden_model))
+    analytics_service = AnalyticsService(habit_service, garden_model, WeatherModel(db, garden_id))
+    return jsonify(analytics_service.get_analytics(days))
+
+@main_bp.route('/rollover_metrics')
+def get_rollover_metrics():
+    """Report how long daily rollovers have taken"""
+    return jsonify(rollover_metrics.snapshot())
+
+@main_bp.route('/metrics')
+def get_metrics():
+    """Expose per-route latency, SQL, rollover and render timings and fragment cache counters in Prometheus text format"""
+    if not METRICS_ENABLED:
+        abort(404)
+    return Response(metrics.render() + fragment_cache.render(), mimetype='text/plain; version=0.0.4')
+
+@main_bp.route('/events')
+def events():
+    """Stream the garden's change events to the browser as Server-Sent Events.
+    
+    This view serves /events under app.py and other threaded WSGI servers, where every open
+    stream holds a worker thread for as long as its page stays open. Their number is capped
+    at SSE_MAX_THREADED_STREAMS so idle pages cannot take every thread; past it, clients get
+    a 503 and the page goes without live updates. Many idle connections need the ASGI entry
+    point (asgi.py), which serves /events on its event loop without a thread each.
+    """
+    garden_id = get_garden_id()
+    if not threaded_streams.acquire(blocking=False):
+        return Response("Too many open event streams", status=503, headers={'Retry-After': str(SSE_KEEPALIVE_SECONDS)})
+    
+    subscription = event_broker.subscribe(garden_id)
+    
+    def stream():
+        yield "retry: 5000\n\n"
+        while True:
+            event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    
+    def close():
+        subscription.close()
+        threaded_streams.release()
+    
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, even if the stream never started
+    response.call_on_close(close)
+    return response
+
+def format_sse(event):
+    """Encode an event as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
\ No newline at end of file
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request, redirect, url_for
-from database import get_db
+from database import get_db, get_garden_id
 from models import GardenModel, TreeModel
-from services import TreeService
+from services import GardenService, TreeService, event_broker
 
 tree_bp = Blueprint('tree', __name__)
 
@@ -9,8 +9,10 @@ tree_bp = Blueprint('tree', __name__)
 def plant_tree():
     """Plant a new tree in the first available slot"""
     db = get_db()
-    tree_model = TreeModel(db)
+    garden_id = get_garden_id()
+    tree_model = TreeModel(db, garden_id)
     tree_model.plant_tree()
+    event_broker.publish(garden_id, "tree_planted")
     return redirect(url_for('main.index'))
 
 @tree_bp.route('/edit_tree', methods=['PUT'])
@@ -21,16 +23,22 @@ def edit_tree():
     tree_index = data.get('index')
     
     db = get_db()
-    tree_model = TreeModel(db)
+    garden_id = get_garden_id()
+    tree_model = TreeModel(db, garden_id)
     trees_data = tree_model.get_trees_data()
     
     if tree_index >= len(trees_data):
         return jsonify(success=False, error="Tree not found"), 404
     
     tree = trees_data[tree_index]
-    tree_model.update_tree_name(tree['rowid'], new_name)
+    success, error = tree_model.update_tree_name(tree['rowid'], new_name)
+    if not success:
+        return jsonify(success=False, error=error), 400
     
-    return jsonify(success=True)
+    tree_service = TreeService(tree_model, GardenModel(db, garden_id))
+    tree = tree_service.get_tree_state(tree_index)
+    event_broker.publish(garden_id, "tree", tree)
+    return jsonify(success=True, tree=tree)
 
 @tree_bp.route('/water_tree', methods=['POST'])
 def water_tree():
@@ -40,8 +48,9 @@ def water_tree():
     amount = int(data['water_amount'])
     
     db = get_db()
-    garden_model = GardenModel(db)
-    tree_model = TreeModel(db)
+    garden_id = get_garden_id()
+    garden_model = GardenModel(db, garden_id)
+    tree_model = TreeModel(db, garden_id)
     tree_service = TreeService(tree_model, garden_model)
     
     success, error = tree_service.water_tree(tree_index, amount)
@@ -49,4 +58,8 @@ def water_tree():
     if not success:
         return jsonify(success=False, error=error), 403
     
-    return jsonify(success=True)
\ No newline at end of file
+    tree = tree_service.get_tree_state(tree_index)
+    garden = GardenService(garden_model).get_garden_state()
+    event_broker.publish(garden_id, "tree", tree)
+    event_broker.publish(garden_id, "garden", garden)
+    return jsonify(success=True, tree=tree, garden=garden)
\ No newline at end of file
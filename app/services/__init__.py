@@ -1,5 +1,13 @@
 from .garden_service import GardenService
 from .tree_service import TreeService
+from .tree_kernel_service import TreeKernel, MoistureTables, moisture_tables
 from .habit_service import HabitService
 from .weather_service import WeatherService
-from .time_service import TimeService
\ No newline at end of file
+from .time_service import TimeService
+from .scheduler_service import SchedulerService
+from .event_service import EventBroker, event_broker
+from .metrics_service import MetricsRegistry, metrics, init_metrics
+from .threshold_service import ThresholdTables, experience_thresholds, water_thresholds
+from .batch_service import BatchService, BatchError
+from .analytics_service import AnalyticsService, AnalyticsCache, analytics_cache
+from .fragment_service import FragmentCache, fragment_cache
\ No newline at end of file
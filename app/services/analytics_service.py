@@ -0,0 +1,122 @@
+import datetime
+import threading
+from array import array
+from collections import OrderedDict
+from config import ANALYTICS_CACHE_SIZE
+from models.habit import WEEKDAYS
+
+class AnalyticsCache:
+    """Thread-safe LRU of computed analytics, keyed so that any garden change misses it"""
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+            return result
+    
+    def put(self, key, result):
+        """Store a result, evicting the least recently used one when full"""
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+analytics_cache = AnalyticsCache(ANALYTICS_CACHE_SIZE)
+
+class AnalyticsService:
+    """Heatmap, weekday and priority-weighted aggregates over a window of habit history.
+    
+    SQLite groups the history per day and priority, straight from a covering index. The
+    totals are then laid out as one array per column, indexed by day in the window, and
+    every further aggregate is taken over whole columns or strided slices of them rather
+    than row by row.
+    """
+    def __init__(self, habit_service, garden_model, weather_model):
+        self.habit_service = habit_service
+        self.habit_model = habit_service.habit_model
+        self.garden_model = garden_model
+        self.weather_model = weather_model
+    
+    def get_analytics(self, days):
+        """Analytics for the days garden days up to and including the current one, cached by state version"""
+        end = self.weather_model.get_garden_day()
+        key = (self.habit_model.garden_id, self.garden_model.get_state_version(), end, days)
+        
+        result = analytics_cache.get(key)
+        if result is None:
+            result = self.compute(end, days)
+            analytics_cache.put(key, result)
+        return result
+    
+    def compute(self, end, days):
+        """Aggregate the history of the days days ending at the date end"""
+        start = end - datetime.timedelta(days=days - 1)
+        start_ordinal = start.toordinal()
+        
+        scheduled = array('l', [0]) * days
+        completed = array('l', [0]) * days
+        water = array('l', [0]) * days
+        weight = array('d', [0.0]) * days
+        weight_completed = array('d', [0.0]) * days
+        
+        for row in self.habit_model.get_history_by_day(start.isoformat()):
+            i = datetime.date.fromisoformat(row['Day']).toordinal() - start_ordinal
+            if i >= days:
+                continue
+            habit_weight = self.habit_service.calculate_priority_weight(row['Priority'])
+            scheduled[i] += row['Scheduled']
+            completed[i] += row['Completed']
+            water[i] += row['Water_Earned']
+            weight[i] += habit_weight * row['Scheduled']
+            weight_completed[i] += habit_weight * row['Completed']
+        
+        # Day i falls on weekday (start weekday + i) % 7, so each weekday is a stride-7 slice
+        offsets = [(weekday - start.weekday()) % 7 for weekday in range(7)]
+        weekday_scheduled = [sum(scheduled[offset::7]) for offset in offsets]
+        weekday_completed = [sum(completed[offset::7]) for offset in offsets]
+        
+        habits = self.habit_model.get_history_by_habit(start.isoformat())
+        
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": days,
+            "daily": {
+                "date": [datetime.date.fromordinal(start_ordinal + i).isoformat() for i in range(days)],
+                "scheduled": scheduled.tolist(),
+                "completed": completed.tolist(),
+                "water": water.tolist(),
+                "score": list(map(_ratio, weight_completed, weight))
+            },
+            "weekdays": {
+                "name": WEEKDAYS,
+                "scheduled": weekday_scheduled,
+                "completed": weekday_completed,
+                "rate": list(map(_ratio, weekday_completed, weekday_scheduled))
+            },
+            "habits": {
+                "name": [habit['Habit_Name'] for habit in habits],
+                "scheduled": [habit['Scheduled'] for habit in habits],
+                "completed": [habit['Completed'] for habit in habits],
+                "water": [habit['Water_Earned'] for habit in habits],
+                "rate": [_ratio(habit['Completed'], habit['Scheduled']) for habit in habits]
+            },
+            "totals": {
+                "scheduled": sum(scheduled),
+                "completed": sum(completed),
+                "water": sum(water),
+                "rate": _ratio(sum(completed), sum(scheduled)),
+                "score": _ratio(sum(weight_completed), sum(weight))
+            }
+        }
+
+def _ratio(part, whole):
+    """part / whole rounded for JSON, or None when there is nothing to divide by"""
+    return round(part / whole, 4) if whole else None
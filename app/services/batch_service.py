@@ -0,0 +1,209 @@
+from models import GardenModel, TreeModel, HabitModel, WeatherModel, Transaction
+from models.habit import weekday_bit
+from services.garden_service import GardenService
+from services.tree_service import TreeService
+from services.habit_service import HabitService
+
+class BatchError(Exception):
+    """A batch operation failed; carries the error message and HTTP status the single-operation route would use"""
+    def __init__(self, error, status=400):
+        super().__init__(error)
+        self.error = error
+        self.status = status
+
+class BatchService:
+    """Runs an ordered list of habit and tree operations against one garden in a single transaction.
+    
+    The garden row, planted trees and habits are read once per batch and kept current in memory
+    as operations apply, so rewards and watering never re-read or re-scan them.
+    """
+    def __init__(self, db, garden_id):
+        self.db = db
+        self.garden_model = GardenModel(db, garden_id)
+        self.tree_model = TreeModel(db, garden_id)
+        self.habit_model = HabitModel(db, garden_id)
+        self.weather_model = WeatherModel(db, garden_id)
+        self.garden_service = GardenService(self.garden_model)
+        self.tree_service = TreeService(self.tree_model, self.garden_model)
+        self.habit_service = HabitService(self.habit_model, self.garden_service)
+        
+        self.operations = {
+            "add_habit": self.add_habit,
+            "edit_habit": self.edit_habit,
+            "delete_habit": self.delete_habit,
+            "complete_habit": self.complete_habit,
+            "water_tree": self.water_tree,
+            "rename_tree": self.rename_tree
+        }
+    
+    def run(self, operations, atomic=False):
+        """Apply operations in order and return (response, events).
+        
+        A failed operation is rolled back on its own and the rest still run; with atomic,
+        the first failure rolls back the whole batch instead. events are the change
+        events to publish once the batch is committed.
+        """
+        results = []
+        self.events = []
+        self.garden_changed = False
+        
+        try:
+            with Transaction(self.db) as transaction:
+                self.load()
+                for operation in operations:
+                    try:
+                        with transaction.savepoint():
+                            result = self.apply(operation)
+                    except BatchError as e:
+                        results.append({"success": False, "error": e.error, "status": e.status})
+                        if atomic:
+                            raise
+                        continue
+                    results.append(dict(success=True, **result))
+        except BatchError:
+            return {
+                "success": False,
+                "rolled_back": True,
+                "results": results,
+                "garden": self.garden_service.get_garden_state()
+            }, []
+        
+        garden = self.garden_service.get_garden_state(self.garden)
+        if self.garden_changed:
+            self.events.append(("garden", garden))
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "rolled_back": False,
+            "results": results,
+            "garden": garden
+        }, self.events
+    
+    def load(self):
+        """Read the state every operation shares"""
+        self.garden = dict(self.garden_model.get_garden_data())
+        self.trees = [dict(tree) for tree in self.tree_model.get_trees_data()]
+        self.habits = {habit['Name']: dict(habit) for habit in self.habit_model.get_habits_data()}
+        self.garden_day = self.weather_model.get_garden_day()
+        self.today = weekday_bit(self.garden_day)
+        self.active_habits = None
+    
+    def apply(self, operation):
+        """Run a single operation, raising BatchError if it fails"""
+        if not isinstance(operation, dict):
+            raise BatchError("Operation must be an object")
+        
+        handler = self.operations.get(operation.get('op'))
+        if handler is None:
+            raise BatchError(f"Unknown operation: {operation.get('op')}")
+        return handler(operation)
+    
+    def get_active_habits(self):
+        """Today's habits in the format the reward calculation expects, built once until habits change"""
+        if self.active_habits is None:
+            self.active_habits = [
+                self.habit_service.habit_state(habit, self.garden_day) for habit in self.habits.values()
+                if habit['Days_Mask'] & self.today
+            ]
+        return self.active_habits
+    
+    def get_tree(self, operation):
+        """The planted tree an operation's index points at"""
+        tree_index = operation.get('index')
+        if not isinstance(tree_index, int) or not 0 <= tree_index < len(self.trees):
+            raise BatchError("Tree not found", 404)
+        return tree_index, self.trees[tree_index]
+    
+    def refresh_habit(self, name):
+        """Re-read a habit after a write and return its state"""
+        habit = dict(self.habit_model.get_habit(name))
+        self.habits[name] = habit
+        self.active_habits = None
+        return self.habit_service.habit_state(habit, self.garden_day)
+    
+    def add_habit(self, operation):
+        name = operation.get('habit_name')
+        success, error = self.habit_model.add_habit(name, operation.get('habit_priority'), operation.get('days_of_the_week'))
+        if not success:
+            raise BatchError(error)
+        
+        habit = self.refresh_habit(name)
+        self.events.append(("habit", {"habit": habit}))
+        return {"habit": habit}
+    
+    def edit_habit(self, operation):
+        existing_name = operation.get('existing_habit_name')
+        new_name = operation.get('new_habit_name')
+        success, error = self.habit_model.update_habit(
+            existing_name, new_name, operation.get('habit_priority'), operation.get('days_of_the_week')
+        )
+        if not success:
+            raise BatchError(error, 404 if "not found" in error.lower() else 400)
+        
+        self.habits.pop(existing_name, None)
+        habit = self.refresh_habit(new_name)
+        self.events.append(("habit", {"habit": habit, "previous_name": existing_name}))
+        return {"previous_name": existing_name, "habit": habit}
+    
+    def delete_habit(self, operation):
+        name = operation.get('habit_name')
+        if not self.habit_model.delete_habit(name):
+            raise BatchError("No habit found with that name.", 404)
+        
+        self.habits.pop(name, None)
+        self.active_habits = None
+        self.events.append(("habit_deleted", {"name": name}))
+        return {"name": name}
+    
+    def complete_habit(self, operation):
+        name = operation.get('habit_name')
+        if not self.habit_model.complete_habit(name):
+            if name not in self.habits:
+                raise BatchError("Habit not found", 404)
+            raise BatchError("Habit already completed", 409)
+        
+        garden, error = self.habit_service.reward_completion(
+            name, self.garden_model, self.garden, len(self.trees), self.get_active_habits(), self.garden_day
+        )
+        if garden is None:
+            raise BatchError(error, 404)
+        
+        self.garden = garden
+        self.garden_changed = True
+        # Completing also moved the habit's streak counters, so re-read its row
+        self.habits[name] = dict(self.habit_model.get_habit(name))
+        habit = self.habit_service.habit_state(self.habits[name], self.garden_day)
+        self.events.append(("habit", {"habit": habit}))
+        return {"habit": habit}
+    
+    def water_tree(self, operation):
+        tree_index, tree = self.get_tree(operation)
+        try:
+            amount = int(operation.get('water_amount'))
+        except (TypeError, ValueError):
+            raise BatchError("Invalid water amount")
+        if amount <= 0:
+            raise BatchError("Invalid water amount")
+        
+        success, error = self.tree_service.water_tree(tree_index, amount, tree=tree)
+        if not success:
+            raise BatchError(error, 403)
+        
+        self.garden = dict(self.garden, Water=self.garden['Water'] - amount)
+        self.garden_changed = True
+        self.trees[tree_index] = dict(self.tree_model.get_tree_by_id(tree['rowid']))
+        state = self.tree_service.get_tree_state(tree_index, self.trees[tree_index])
+        self.events.append(("tree", state))
+        return {"tree": state}
+    
+    def rename_tree(self, operation):
+        tree_index, tree = self.get_tree(operation)
+        name = operation.get('name')
+        success, error = self.tree_model.update_tree_name(tree['rowid'], name)
+        if not success:
+            raise BatchError(error)
+        
+        self.trees[tree_index] = dict(tree, Name=name)
+        state = self.tree_service.get_tree_state(tree_index, self.trees[tree_index])
+        self.events.append(("tree", state))
+        return {"tree": state}
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from collections import deque
+from config import SSE_MAX_PENDING_EVENTS
+
+class Subscription:
+    """One listener's queue of pending events for a single garden"""
+    def __init__(self, broker, garden_id):
+        self.broker = broker
+        self.garden_id = garden_id
+        self.events = deque(maxlen=SSE_MAX_PENDING_EVENTS)
+        self.condition = threading.Condition()
+    
+    def push(self, event):
+        """Queue an event, dropping the oldest one if the listener has fallen too far behind"""
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify()
+    
+    def get(self, timeout=None):
+        """Wait up to timeout seconds for the next event, returning None if there was none"""
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            return self.events.popleft() if self.events else None
+    
+    def close(self):
+        """Stop receiving events"""
+        self.broker.unsubscribe(self)
+
+class AsyncSubscription(Subscription):
+    """Subscription awaited on an asyncio event loop, so an open stream holds no thread.
+    
+    Create it from the loop it is read on; publishers on other threads hand events over
+    to that loop.
+    """
+    def __init__(self, broker, garden_id):
+        super().__init__(broker, garden_id)
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+    
+    def push(self, event):
+        """Queue an event from any thread"""
+        self.loop.call_soon_threadsafe(self._deliver, event)
+    
+    def _deliver(self, event):
+        self.events.append(event)
+        self.ready.set()
+    
+    async def get(self, timeout=None):
+        """Wait up to timeout seconds for the next event, returning None if there was none"""
+        if not self.events:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        self.ready.clear()
+        return self.events.popleft() if self.events else None
+
+class EventBroker:
+    """Small in-process pub/sub that fans garden change events out to every listener of that garden"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+    
+    def subscribe(self, garden_id, subscription_class=Subscription):
+        """Register a new listener for a garden"""
+        subscription = subscription_class(self, garden_id)
+        with self.lock:
+            self.subscribers.setdefault(garden_id, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        """Remove a listener"""
+        with self.lock:
+            listeners = self.subscribers.get(subscription.garden_id)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self.subscribers[subscription.garden_id]
+    
+    def publish(self, garden_id, event_type, data=None):
+        """Send an event to every listener of a garden"""
+        with self.lock:
+            listeners = list(self.subscribers.get(garden_id, ()))
+        
+        event = {"type": event_type, "data": data if data is not None else {}}
+        for subscription in listeners:
+            subscription.push(event)
+
+event_broker = EventBroker()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from markupsafe import Markup
+from config import FRAGMENT_CACHE_BYTES
+
+class FragmentCache:
+    """Thread-safe LRU of rendered page fragments, capped by their total size in bytes.
+    
+    Each fragment is keyed by the versions of the data it shows, so a write only misses the
+    fragments whose data it changed; hits and misses are counted per fragment name.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = {}
+        self.misses = {}
+        self.lock = threading.Lock()
+    
+    def get_or_render(self, name, key, render):
+        """Return the name fragment cached under key, calling render() to build it on a miss"""
+        key = (name,) + tuple(key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits[name] = self.hits.get(name, 0) + 1
+                return entry[0]
+            self.misses[name] = self.misses.get(name, 0) + 1
+        
+        # Render outside the lock; two requests missing together both render and the last one is kept
+        fragment = Markup(render())
+        self.put(key, fragment)
+        return fragment
+    
+    def put(self, key, fragment):
+        """Store a fragment, evicting the least recently used ones until the cache fits its cap"""
+        size = len(fragment.encode())
+        if size > self.max_bytes:
+            return
+        
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (fragment, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+    
+    def clear(self):
+        """Drop every fragment and reset the counters"""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.hits.clear()
+            self.misses.clear()
+    
+    def snapshot(self):
+        """Return the hit and miss counters per fragment and the cache's current size"""
+        with self.lock:
+            return {
+                "fragments": {
+                    name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                    for name in sorted(set(self.hits) | set(self.misses))
+                },
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes
+            }
+    
+    def render(self):
+        """Return the counters in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        counters = [
+            ('hits', 'Dashboard fragments served from the cache'),
+            ('misses', 'Dashboard fragments rendered because they were not cached')
+        ]
+        for counter, description in counters:
+            lines.append(f'# HELP habit_tree_fragment_cache_{counter}_total {description}, by fragment.')
+            lines.append(f'# TYPE habit_tree_fragment_cache_{counter}_total counter')
+            for name, counts in snapshot["fragments"].items():
+                lines.append(f'habit_tree_fragment_cache_{counter}_total{{fragment="{name}"}} {counts[counter]}')
+        
+        lines.append('# HELP habit_tree_fragment_cache_bytes Size of the rendered fragments held in the cache.')
+        lines.append('# TYPE habit_tree_fragment_cache_bytes gauge')
+        lines.append(f'habit_tree_fragment_cache_bytes {snapshot["bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE_BYTES)
@@ -1,19 +1,35 @@
-from config import REQUIRED_EXPERIENCE_INCREASE_PER_LEVEL_PERCENTAGE
+from config import UPCOMING_LEVELS_SHOWN
+from services.threshold_service import experience_thresholds
 
 class GardenService:
     def __init__(self, garden_model):
         self.garden_model = garden_model
     
-    def add_experience(self, amount):
-        """Add experience to garden and handle level-ups"""
-        garden = self.garden_model.get_garden_data()
-        new_exp = garden['Experience'] + amount
-        level = garden['Level']
-        exp_required = garden['Experience_Required']
-        
-        while new_exp >= exp_required:
-            new_exp -= exp_required
-            level += 1
-            exp_required += round(exp_required / 100 * REQUIRED_EXPERIENCE_INCREASE_PER_LEVEL_PERCENTAGE, -1)
+    def get_garden_state(self, garden=None):
+        """Get the garden's current status in frontend-friendly format"""
+        if garden is None:
+            garden = self.garden_model.get_garden_data()
+        return {
+            "level": garden['Level'],
+            "experience": garden['Experience'],
+            "experience_required": garden['Experience_Required'],
+            "water": garden['Water'],
+            "daily_water_earned": garden['Daily_Water_Earned'],
+            "experience_to_next_levels": self.experience_to_next_levels(garden)
+        }
+    
+    def add_experience(self, amount, garden=None):
+        """Add experience to garden and handle level-ups, returning the new (level, experience, experience_required)"""
+        if garden is None:
+            garden = self.garden_model.get_garden_data()
+        levels_gained, new_exp, exp_required = experience_thresholds.advance(
+            garden['Experience'], garden['Experience_Required'], amount
+        )
         
-        self.garden_model.update_experience(level, new_exp, exp_required)
\ No newline at end of file
+        level = garden['Level'] + levels_gained
+        self.garden_model.update_experience(level, new_exp, exp_required)
+        return level, new_exp, exp_required
+    
+    def experience_to_next_levels(self, garden, count=UPCOMING_LEVELS_SHOWN):
+        """Experience still needed to reach each of the next count levels"""
+        return experience_thresholds.to_next(garden['Experience'], garden['Experience_Required'], count)
\ No newline at end of file
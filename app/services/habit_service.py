@@ -1,38 +1,81 @@
 import datetime
 from config import WATER_PER_PLANTED_TREE
+from models.habit import weekday_bit
 
 class HabitService:
     def __init__(self, habit_model, garden_service):
         self.habit_model = habit_model
         self.garden_service = garden_service
     
-    def process_habits(self):
-        """Separate habits into active (today) and scheduled (other days)"""
+    def garden_day(self):
+        """Date of the garden day in progress.
+        
+        It decides both which habits are active and which day completions are logged under,
+        the same day the rollover closes, so the two can never disagree.
+        """
+        from models import WeatherModel
+        return WeatherModel(self.habit_model.db, self.habit_model.garden_id).get_garden_day()
+    
+    def process_habits(self, today=None):
+        """Separate habits into active (today, the garden day unless given) and scheduled (other days)"""
         habits_data = self.habit_model.get_habits_data()
-        current_day = datetime.datetime.now().strftime("%A")
+        today = weekday_bit(today or self.garden_day())
         active, scheduled = [], []
         
         for habit in habits_data:
-            days = [d.strip() for d in habit['Days_Of_The_Week'].split(',')]
-            habit_dict = {
-                "name": habit['Name'],
-                "creation_date": habit['Creation_Date'],
-                "priority": habit['Priority'],
-                "days": habit['Days_Of_The_Week'],
-                "completed": bool(habit['Completed'])
-            }
-            
-            if current_day in days:
-                active.append(habit_dict)
+            if habit['Days_Mask'] & today:
+                active.append(self._habit_to_dict(habit))
             else:
-                scheduled.append(habit_dict)
+                scheduled.append(self._habit_to_dict(habit))
         
         return active, scheduled
     
+    def get_active_habits(self, today=None):
+        """Get the habits active today, the garden day unless given, with a single indexed query"""
+        habits_data = self.habit_model.get_active_habits_data(weekday_bit(today or self.garden_day()))
+        return [self._habit_to_dict(habit) for habit in habits_data]
+    
+    def get_habit_state(self, name):
+        """Get a single habit in frontend-friendly format, flagged with whether it is active today"""
+        habit = self.habit_model.get_habit(name)
+        if habit is None:
+            return None
+        return self.habit_state(habit)
+    
+    def habit_state(self, habit, today=None):
+        """Convert a habit row into the get_habit_state format, active meaning scheduled today, the garden day unless given"""
+        habit_dict = self._habit_to_dict(habit)
+        habit_dict["active"] = bool(habit['Days_Mask'] & weekday_bit(today or self.garden_day()))
+        return habit_dict
+    
+    def _habit_to_dict(self, habit):
+        """Convert a habit row into the frontend-friendly format"""
+        return {
+            "name": habit['Name'],
+            "creation_date": habit['Creation_Date'],
+            "priority": habit['Priority'],
+            "days": habit['Days_Of_The_Week'],
+            "completed": bool(habit['Completed']),
+            "current_streak": habit['Current_Streak'] or 0,
+            "best_streak": habit['Best_Streak'] or 0,
+            "completion_rate": habit['Completions'] / habit['Scheduled_Days'] if habit['Scheduled_Days'] else None
+        }
+    
     def reset_daily_habits(self):
         """Reset all habits to incomplete for the new day"""
         self.habit_model.reset_all_habits()
     
+    def record_missed_days(self, first_day, days_elapsed):
+        """Log the habits missed over the days a rollover closes (does not commit).
+        
+        The first day is the one today's Completed flags belong to; any further days passed
+        without a rollover, so every habit scheduled on them counts as missed.
+        """
+        days = [first_day + datetime.timedelta(days=i) for i in range(days_elapsed)]
+        self.habit_model.record_missed_days(days[:1], incomplete_only=True)
+        if len(days) > 1:
+            self.habit_model.record_missed_days(days[1:], incomplete_only=False)
+    
     def calculate_max_daily_water(self, garden_level, planted_tree_count):
         """Calculate maximum daily water based on trees and garden level"""
         return planted_tree_count * WATER_PER_PLANTED_TREE + garden_level
@@ -43,9 +86,10 @@ class HabitService:
         # Priority 5 = lowest priority = weight 1
         return 6 - priority
     
-    def calculate_water_reward_for_habit(self, habit_priority, garden_level, planted_tree_count):
+    def calculate_water_reward_for_habit(self, habit_priority, garden_level, planted_tree_count, active_habits=None):
         """Calculate water reward for a specific habit based on its priority"""
-        active_habits, _ = self.process_habits()
+        if active_habits is None:
+            active_habits = self.get_active_habits()
         
         if not active_habits:
             return 0
@@ -62,54 +106,83 @@ class HabitService:
         
         return int((habit_weight / total_weight) * max_daily_water)
     
-    def get_active_habits_count(self):
-        """Get count of today's active habits"""
-        active_habits, _ = self.process_habits()
-        return len(active_habits)
+    def complete_habit(self, habit_name, today=None):
+        """Mark a habit as completed, log it and reward resources.
+        
+        The habit must be active today, the garden day unless given, which is also the day
+        the completion is logged under and the reward is shared among that day's habits. A
+        habit already completed today is refused before anything is logged or rewarded.
+        """
+        from models import GardenModel, TreeModel, Transaction
+        
+        db = self.habit_model.db
+        garden_model = GardenModel(db, self.habit_model.garden_id)
+        tree_model = TreeModel(db, self.habit_model.garden_id)
+        
+        # The reward is sized from the garden as it stands, so read it under the write lock
+        with Transaction(db):
+            today = today or self.garden_day()
+            active_habits = self.get_active_habits(today)
+            if not any(habit['name'] == habit_name for habit in active_habits):
+                if self.habit_model.get_habit(habit_name) is None:
+                    return False, "Habit not found"
+                return False, "Habit not found in active habits"
+            
+            if not self.habit_model.complete_habit(habit_name):
+                return False, "Habit already completed"
+            garden, error = self.reward_completion(
+                habit_name,
+                garden_model,
+                garden_model.get_garden_data(),
+                len(tree_model.get_trees_data()),
+                active_habits,
+                today
+            )
+        return garden is not None, error
     
-    def complete_habit(self, habit_name):
-        """Mark a habit as completed and reward resources"""
-        if not self.habit_model.complete_habit(habit_name):
-            return False, "Habit not found"
-        
-        # Get current garden data and planted tree count
-        from models import GardenModel, TreeModel
-        from database import get_db
-        
-        db = get_db()
-        garden_model = GardenModel(db)
-        tree_model = TreeModel(db)
-        
-        garden_data = garden_model.get_garden_data()
-        planted_trees = tree_model.get_trees_data()
-        planted_tree_count = len(planted_trees)
+    def reward_completion(self, habit_name, garden_model, garden_data, planted_tree_count, active_habits, day):
+        """Log a completed habit and reward it from inputs the caller already holds.
+        
+        The completion is logged under day, the garden day in progress, and extends the
+        habit's streak whether or not water is left to grant: once the daily cap is reached
+        the completion still counts and earns experience, only no water. Returns (garden,
+        error), where garden is the garden row after the reward as a dict, so callers
+        completing many habits can carry it on to the next one, or None with an error if the
+        habit is not active. The daily cap is enforced by the update itself, so a stale
+        garden_data can never grant water past it.
+        """
+        from models import Transaction
+        from services import GardenService
         
         # Find the completed habit's priority
-        active_habits, _ = self.process_habits()
         completed_habit = next((h for h in active_habits if h['name'] == habit_name), None)
         
         if not completed_habit:
-            return False, "Habit not found in active habits"
+            return None, "Habit not found in active habits"
         
         # Calculate water reward based on priority
         water_reward = self.calculate_water_reward_for_habit(
             completed_habit['priority'],
             garden_data['Level'], 
-            planted_tree_count
+            planted_tree_count,
+            active_habits
         )
         
-        # Check if adding this water would exceed daily limit
+        # Only grant what is left of the daily limit
         max_daily_water = self.calculate_max_daily_water(garden_data['Level'], planted_tree_count)
-        current_daily_earned = garden_data['Daily_Water_Earned']
-        
-        if current_daily_earned + water_reward > max_daily_water:
-            water_reward = max_daily_water - current_daily_earned
-            if water_reward <= 0:
-                return False, "Daily water limit already reached"
-        
-        # Award resources
-        garden_model.update_water(water_reward)
-        garden_model.add_daily_water_earned(water_reward)
-        self.garden_service.add_experience(200)
+        water_reward = max(0, min(water_reward, max_daily_water - garden_data['Daily_Water_Earned']))
+        
+        # Award resources and log the completion in a single transaction
+        with Transaction(garden_model.db):
+            updated = garden_model.grant_water(water_reward, max_daily_water) if water_reward else None
+            if updated is None:
+                # Nothing left to grant, or the cap was reached since garden_data was read
+                water_reward = 0
+                updated = garden_model.get_garden_data()
+            
+            self.habit_model.record_completion(habit_name, day.isoformat(), completed_habit['priority'], water_reward)
+            level, experience, experience_required = GardenService(garden_model).add_experience(200, updated)
         
-        return True, None
\ No newline at end of file
+        garden = dict(updated)
+        garden.update(Level=level, Experience=experience, Experience_Required=experience_required)
+        return garden, None
@@ -0,0 +1,145 @@
+import bisect
+import threading
+import time
+from flask import g, request
+from flask.signals import before_render_template, template_rendered
+from config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS
+
+class Histogram:
+    """Cumulative Prometheus-style histogram of durations in seconds"""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, seconds):
+        """Add one observation (callers hold the registry lock)"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+    
+    def lines(self, name, labels):
+        """Render the bucket, sum and count samples"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ['+Inf'], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{_labels(labels)} {self.count}')
+        return lines
+
+class RouteMetrics:
+    """Latency and SQL totals for one route"""
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.commits = 0
+        self.rows = 0
+
+class MetricsRegistry:
+    """Thread-safe store of per-route request metrics and named timers, rendered for Prometheus"""
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.timers = {}
+    
+    def observe_request(self, route, method, seconds, stats=None):
+        """Record a finished request and the SQL counters of its connection"""
+        with self.lock:
+            route_metrics = self.routes.get((route, method))
+            if route_metrics is None:
+                route_metrics = self.routes[(route, method)] = RouteMetrics(self.buckets)
+            
+            route_metrics.latency.observe(seconds)
+            if stats is not None:
+                route_metrics.statements += stats.statements
+                route_metrics.sql_seconds += stats.seconds
+                route_metrics.commits += stats.commits
+                route_metrics.rows += stats.rows
+    
+    def observe(self, timer, seconds, **labels):
+        """Record one duration for a named timer such as the rollover or a template render"""
+        key = (timer, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.timers.get(key)
+            if histogram is None:
+                histogram = self.timers[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+    
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        with self.lock:
+            lines = [
+                '# HELP habit_tree_request_duration_seconds Request latency by route.',
+                '# TYPE habit_tree_request_duration_seconds histogram'
+            ]
+            for (route, method), route_metrics in sorted(self.routes.items()):
+                lines += route_metrics.latency.lines('habit_tree_request_duration_seconds', {'route': route, 'method': method})
+            
+            counters = [
+                ('sql_statements', 'SQL statements executed', 'statements'),
+                ('sql_seconds', 'Time spent executing SQL and fetching rows', 'sql_seconds'),
+                ('sql_commits', 'Transactions committed', 'commits'),
+                ('sql_rows', 'Rows returned by queries', 'rows')
+            ]
+            for name, description, attribute in counters:
+                lines.append(f'# HELP habit_tree_request_{name}_total {description}, by route.')
+                lines.append(f'# TYPE habit_tree_request_{name}_total counter')
+                for (route, method), route_metrics in sorted(self.routes.items()):
+                    labels = _labels({'route': route, 'method': method})
+                    lines.append(f'habit_tree_request_{name}_total{labels} {getattr(route_metrics, attribute)}')
+            
+            for timer in sorted({timer for timer, _ in self.timers}):
+                lines.append(f'# TYPE habit_tree_{timer}_duration_seconds histogram')
+                for (name, labels), histogram in sorted(self.timers.items()):
+                    if name == timer:
+                        lines += histogram.lines(f'habit_tree_{timer}_duration_seconds', dict(labels))
+        
+        return '\n'.join(lines) + '\n'
+
+def _labels(labels, **extra):
+    """Format a Prometheus label set"""
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+metrics = MetricsRegistry()
+
+def init_metrics(app):
+    """Time every request and template render of the app; does nothing when metrics are disabled"""
+    if not METRICS_ENABLED:
+        return
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.teardown_request
+    def record_request(exc=None):
+        started = g.pop('request_started', None)
+        if started is None:
+            return
+        
+        db = g.get('db')
+        route = request.endpoint or 'unmatched'
+        metrics.observe_request(route, request.method, time.perf_counter() - started, getattr(db, 'stats', None))
+    
+    def start_render_timer(sender, template, context, **extra):
+        g.render_started = time.perf_counter()
+    
+    def record_render(sender, template, context, **extra):
+        started = g.pop('render_started', None)
+        if started is not None:
+            metrics.observe('template_render', time.perf_counter() - started, template=template.name)
+    
+    # Signals hold weak references by default, so keep these alive alongside the app
+    before_render_template.connect(start_render_timer, app, weak=False)
+    template_rendered.connect(record_render, app, weak=False)
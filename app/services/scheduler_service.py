@@ -0,0 +1,71 @@
+import datetime
+import logging
+import threading
+from config import ROLLOVER_SCHEDULER_ENABLED, SCHEDULER_MAX_SLEEP_SECONDS, SCHEDULER_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class SchedulerService:
+    """Runs every garden's daily rollover in a background thread, off the request path"""
+    def __init__(self, app):
+        self.app = app
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Start the scheduler thread; the first pass catches up every garden that is behind"""
+        if not ROLLOVER_SCHEDULER_ENABLED or self.thread is not None:
+            return
+        
+        self.thread = threading.Thread(target=self._run, name="rollover-scheduler", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Ask the scheduler thread to exit and wait for it"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+    
+    def run_due_rollovers(self):
+        """Roll over every garden whose day has ended and return seconds until the next boundary, or until a retry"""
+        from database import get_db
+        from models import ScheduleModel
+        from services import TimeService
+        
+        with self.app.app_context():
+            schedule_model = ScheduleModel(get_db())
+            now = datetime.datetime.utcnow()
+            
+            # A garden whose rollover fails stays due and sorts first on every pass,
+            # so it is logged and skipped rather than holding up every other garden
+            failed = 0
+            for garden_id in schedule_model.get_gardens_due((now - datetime.timedelta(days=1)).isoformat()):
+                try:
+                    TimeService(garden_id).trigger_daily_updates()
+                except Exception:
+                    logger.exception("Daily rollover failed for garden %s", garden_id)
+                    failed += 1
+            
+            earliest_last_run = schedule_model.get_earliest_last_run()
+        
+        if earliest_last_run is None:
+            return SCHEDULER_MAX_SLEEP_SECONDS
+        
+        # The failed gardens are still due, so retry them later instead of spinning on them now
+        if failed:
+            return SCHEDULER_RETRY_SECONDS
+        
+        next_boundary = datetime.datetime.fromisoformat(earliest_last_run) + datetime.timedelta(days=1)
+        return max(0.0, (next_boundary - datetime.datetime.utcnow()).total_seconds())
+    
+    def _run(self):
+        """Scheduler loop: roll over due gardens, then sleep until the next day boundary"""
+        while not self.stop_event.is_set():
+            try:
+                delay = self.run_due_rollovers()
+            except Exception:
+                logger.exception("Daily rollover failed")
+                delay = SCHEDULER_RETRY_SECONDS
+            
+            self.stop_event.wait(min(delay, SCHEDULER_MAX_SLEEP_SECONDS))
\ No newline at end of file
@@ -0,0 +1,120 @@
+import bisect
+import threading
+from config import (
+    STARTING_EXPERIENCE_REQUIRED, STARTING_WATER_REQUIRED,
+    REQUIRED_EXPERIENCE_INCREASE_PER_LEVEL_PERCENTAGE, REQUIRED_WATER_INCREASE_PER_STAGE_PERCENTAGE
+)
+
+class ThresholdTable:
+    """Cumulative requirements of a chain of levels, each needing a percentage more than the one before.
+    
+    requirements[i] is what level i of the chain costs and cumulative[i] is the total spent to reach it.
+    The table grows lazily, and uses exactly the rounding of the old level-by-level loops.
+    Small requirements can round to no increase at all; such a chain is stationary from
+    there on and stops growing, every later level costing the same as its last one.
+    """
+    def __init__(self, first_requirement, percentage):
+        self.percentage = percentage
+        self.requirements = [first_requirement]
+        self.cumulative = [0, first_requirement]
+        self.positions = {first_requirement: 0}
+        self.lock = threading.Lock()
+    
+    def next_requirement(self, requirement):
+        """Requirement of the level after one costing requirement"""
+        return requirement + int(round(requirement / 100 * self.percentage, -1))
+    
+    @property
+    def stationary(self):
+        return self.next_requirement(self.requirements[-1]) <= self.requirements[-1]
+    
+    def extend_to_total(self, total):
+        """Grow the table until the last cumulative threshold is above total, or the chain turns stationary"""
+        if self.cumulative[-1] > total:
+            return
+        
+        with self.lock:
+            while self.cumulative[-1] <= total and not self.stationary:
+                self._append()
+    
+    def extend_to_requirement(self, requirement):
+        """Grow the table until it reaches a requirement at least as large as the given one"""
+        if self.requirements[-1] >= requirement:
+            return
+        
+        with self.lock:
+            while self.requirements[-1] < requirement and not self.stationary:
+                self._append()
+    
+    def extend_to_levels(self, levels):
+        """Grow the table until it holds at least the given number of levels"""
+        if len(self.requirements) >= levels:
+            return
+        
+        with self.lock:
+            while len(self.requirements) < levels:
+                self._append()
+    
+    def _append(self):
+        # Readers do not take the lock, so publish the position last
+        requirement = self.next_requirement(self.requirements[-1])
+        self.requirements.append(requirement)
+        self.cumulative.append(self.cumulative[-1] + requirement)
+        self.positions[requirement] = len(self.requirements) - 1
+    
+    def position(self, requirement):
+        """Index of the level costing requirement in this chain, or None if it is not part of it"""
+        self.extend_to_requirement(requirement)
+        return self.positions.get(requirement)
+
+class ThresholdTables:
+    """Resolves level-ups for any current requirement by binary search over shared threshold tables"""
+    def __init__(self, first_requirement, percentage):
+        self.percentage = percentage
+        self.tables = [ThresholdTable(first_requirement, percentage)]
+        self.lock = threading.Lock()
+    
+    def locate(self, requirement):
+        """Find the table and position of a level costing requirement.
+        
+        Rows written by the old loops or an earlier config may sit off the default chain;
+        those get a table of their own, starting at their current requirement.
+        """
+        for table in self.tables:
+            position = table.position(requirement)
+            if position is not None:
+                return table, position
+        
+        with self.lock:
+            table = ThresholdTable(requirement, self.percentage)
+            self.tables.append(table)
+        return table, 0
+    
+    def advance(self, progress, requirement, amount=0):
+        """Apply amount to a level's progress and return (levels_gained, progress, requirement)"""
+        progress += amount
+        if progress < requirement:
+            return 0, progress, requirement
+        
+        table, position = self.locate(requirement)
+        total = table.cumulative[position] + progress
+        table.extend_to_total(total)
+        
+        reached = min(bisect.bisect_right(table.cumulative, total) - 1, len(table.requirements) - 1)
+        progress = total - table.cumulative[reached]
+        requirement = table.requirements[reached]
+        
+        # Past the end of a stationary chain every level costs the same
+        extra, progress = divmod(progress, requirement)
+        return reached - position + int(extra), progress, requirement
+    
+    def to_next(self, progress, requirement, count):
+        """Amount still needed to reach each of the next count levels"""
+        table, position = self.locate(requirement)
+        table.extend_to_levels(position + count)
+        
+        start = table.cumulative[position] + progress
+        return [int(table.cumulative[position + i] - start) for i in range(1, count + 1)]
+
+experience_thresholds = ThresholdTables(STARTING_EXPERIENCE_REQUIRED, REQUIRED_EXPERIENCE_INCREASE_PER_LEVEL_PERCENTAGE)
+water_thresholds = ThresholdTables(STARTING_WATER_REQUIRED, REQUIRED_WATER_INCREASE_PER_STAGE_PERCENTAGE)
\ No newline at end of file
@@ -1,16 +1,73 @@
 import datetime
+import threading
+import time
 from database import get_db
 from models import WeatherModel
+from services.event_service import event_broker
+from services.metrics_service import metrics
+from services.tree_kernel_service import TreeKernel
 
-class TimeService:
+class RolloverMetrics:
+    """Thread-safe counters describing how long daily rollovers take"""
     def __init__(self):
-        self.db = get_db()
-        self.weather_model = WeatherModel(self.db)
+        self.lock = threading.Lock()
+        self.rollovers = 0
+        self.days_simulated = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self.last_run = None
+    
+    def record(self, days_elapsed, seconds):
+        """Record one garden's rollover"""
+        with self.lock:
+            self.rollovers += 1
+            self.days_simulated += days_elapsed
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.last_seconds = seconds
+            self.last_run = datetime.datetime.utcnow().isoformat()
+    
+    def snapshot(self):
+        """Return the current counters as a dict"""
+        with self.lock:
+            return {
+                "rollovers": self.rollovers,
+                "days_simulated": self.days_simulated,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+                "last_seconds": self.last_seconds,
+                "last_run": self.last_run
+            }
+
+rollover_metrics = RolloverMetrics()
+
+class TimeService:
+    """Rolls one garden over to the next day.
+    
+    Outside a request, pass the connection to use; clock (returning the UTC time) and rng
+    (driving the weather) let simulations run on their own time and seed.
+    """
+    def __init__(self, garden_id, db=None, clock=None, rng=None):
+        self.db = db if db is not None else get_db()
+        self.garden_id = garden_id
+        self.clock = clock or datetime.datetime.utcnow
+        self.rng = rng
+        self.weather_model = WeatherModel(self.db, garden_id)
+    
+    def is_day_due(self):
+        """Cheap read-only check for whether a rollover (or first-run setup) is pending"""
+        last_run_text = self.weather_model.get_meta('global_last_run')
+        if last_run_text is None:
+            return True
+        
+        last_run = datetime.datetime.fromisoformat(last_run_text)
+        return self.clock() - last_run >= datetime.timedelta(days=1)
     
     def check_global_time(self):
-        """Check if a day has passed and return number of days elapsed"""
+        """Check if a day has passed and return number of days elapsed (does not commit)"""
         last_run_text = self.weather_model.get_meta('global_last_run')
-        now = datetime.datetime.utcnow()
+        now = self.clock()
         
         if last_run_text is None:
             self.weather_model.set_meta('global_last_run', now.isoformat())
@@ -28,44 +85,58 @@ class TimeService:
     
     def trigger_daily_updates(self):
         """Trigger all daily update services"""
-        days_elapsed = self.check_global_time()
+        # Most calls happen mid-day, so skip the write lock unless a rollover is pending
+        if not self.is_day_due():
+            return 0
         
-        if days_elapsed > 0:
-            # Import services here to avoid circular imports
-            from services import WeatherService, HabitService, TreeService
-            from models import WeatherModel, HabitModel, GardenModel, TreeModel
-            from services import GardenService
-            
-            # Initialize models and services
-            weather_model = WeatherModel(self.db)
-            habit_model = HabitModel(self.db)
-            garden_model = GardenModel(self.db)
-            tree_model = TreeModel(self.db)
+        start = time.perf_counter()
+        with self.db:
+            # Take the write lock before re-checking, so a concurrent scheduler or
+            # request that already rolled this garden over is seen and not repeated
+            self.db.execute('BEGIN IMMEDIATE')
+            days_elapsed = self.check_global_time()
             
-            weather_service = WeatherService(weather_model)
-            garden_service = GardenService(garden_model)
-            habit_service = HabitService(habit_model, garden_service)
-            tree_service = TreeService(tree_model, garden_model)
-            
-            # Run daily updates for each elapsed day
-            for _ in range(days_elapsed):
-                self._run_daily_cycle(weather_service, habit_service, tree_service, garden_model)
+            if days_elapsed > 0:
+                # Import services here to avoid circular imports
+                from services import WeatherService, HabitService, TreeService
+                from models import WeatherModel, HabitModel, GardenModel, TreeModel
+                from services import GardenService
+                
+                # Initialize models and services
+                weather_model = WeatherModel(self.db, self.garden_id)
+                habit_model = HabitModel(self.db, self.garden_id)
+                garden_model = GardenModel(self.db, self.garden_id)
+                tree_model = TreeModel(self.db, self.garden_id)
+                
+                weather_service = WeatherService(weather_model)
+                garden_service = GardenService(garden_model)
+                habit_service = HabitService(habit_model, garden_service)
+                tree_service = TreeService(tree_model, garden_model)
+                
+                # Simulate every elapsed day in memory and write the result once
+                self._run_catch_up(days_elapsed, weather_service, habit_service, tree_service, garden_model)
+        
+        if days_elapsed > 0:
+            seconds = time.perf_counter() - start
+            rollover_metrics.record(days_elapsed, seconds)
+            metrics.observe('rollover', seconds)
+            event_broker.publish(self.garden_id, "rollover", {"days": days_elapsed})
         
         return days_elapsed
     
-    def _run_daily_cycle(self, weather_service, habit_service, tree_service, garden_model):
-        """Run a single day's worth of updates"""
-        # Update weather first
-        weather_service.simulate_weather()
+    def _run_catch_up(self, days_elapsed, weather_service, habit_service, tree_service, garden_model):
+        """Run days_elapsed daily cycles in memory, then persist the final state (does not commit)"""
+        kernel = TreeKernel(tree_service.tree_model.get_trees_data())
         
-        # Get current weather for tree updates
-        current_weather = self.weather_model.get_last_weather()
+        # Roll the forecast forward first; only the days still inside the window are written
+        for temp, hum, state in weather_service.advance(days_elapsed, rng=self.rng):
+            # Update trees with new weather
+            kernel.advance_day(temp, hum, state)
         
-        # Update trees with new weather
-        tree_service.daily_tree_update(current_weather)
+        tree_service.tree_model.update_trees_moisture_and_water(kernel.rows())
         
-        # Reset habits for new day
+        # Log missed habits, then reset habits and daily water earned counter for the new day
+        new_last_run = datetime.datetime.fromisoformat(self.weather_model.get_meta('global_last_run'))
+        habit_service.record_missed_days((new_last_run - datetime.timedelta(days=days_elapsed)).date(), days_elapsed)
         habit_service.reset_daily_habits()
-        
-        # Reset daily water earned counter
         garden_model.reset_daily_water_earned()
\ No newline at end of file
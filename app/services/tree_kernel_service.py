@@ -0,0 +1,126 @@
+from array import array
+from config import (
+    MIN_MOISTURE, MAX_MOISTURE, HUMIDITY_INFLUENCE, TEMP_INFLUENCE, WEATHER_STATE_INFLUENCE,
+    DEFAULT_HUM, DEFAULT_TEMP, DEFAULT_STATE,
+    WATER_EFFICIENCY_REDUCTION, WATER_TO_MOISTURE_RATIO, MOISTURE_BOOST_THRESHOLD, MOISTURE_BOOST_MULTIPLIER,
+    VERY_DRY_WATER_LOSS_PERCENTAGE, DRY_WATER_LOSS_PERCENTAGE,
+    MOISTURE_VERY_DRY_THRESHOLD, MOISTURE_DRY_THRESHOLD, MOISTURE_NEUTRAL_THRESHOLD, MOISTURE_HEALTHY_THRESHOLD,
+    MOISTURE_VERY_DRY_LABEL, MOISTURE_DRY_LABEL, MOISTURE_NEUTRAL_LABEL,
+    MOISTURE_HEALTHY_LABEL, MOISTURE_TOO_MOIST_LABEL
+)
+from services.threshold_service import water_thresholds
+
+class MoistureTables:
+    """Everything that depends on a tree's moisture alone, looked up by moisture level.
+    
+    Moisture is stored as an integer from 0 to 100, so each table holds one entry per level,
+    computed once with exactly the arithmetic of the threshold chains it replaces.
+    """
+    def __init__(self):
+        levels = range(MAX_MOISTURE + 1)
+        self.efficiency = array('d', [self.water_efficiency(moisture) for moisture in levels])
+        self.boost = array('d', [MOISTURE_BOOST_MULTIPLIER if moisture < MOISTURE_BOOST_THRESHOLD else 1.0 for moisture in levels])
+        self.water_loss = array('d', [self.water_loss_percentage(moisture) for moisture in levels])
+        self.status = tuple(self.moisture_status(moisture) for moisture in levels)
+    
+    @staticmethod
+    def water_efficiency(moisture):
+        """Share of the water given to a tree that it absorbs; very moist trees waste some"""
+        if moisture > MOISTURE_HEALTHY_THRESHOLD:
+            # Linear reduction: efficiency = 1.0 - (excess / max_excess) * reduction_factor
+            excess_moisture = moisture - MOISTURE_HEALTHY_THRESHOLD
+            max_excess = MAX_MOISTURE - MOISTURE_HEALTHY_THRESHOLD
+            return max(0.1, 1.0 - (excess_moisture / max_excess) * WATER_EFFICIENCY_REDUCTION)  # Minimum 10% efficiency
+        return 1.0
+    
+    @staticmethod
+    def water_loss_percentage(moisture):
+        """Percentage of its water requirement a tree at the end of a day at this moisture loses"""
+        if moisture < MOISTURE_VERY_DRY_THRESHOLD:
+            return VERY_DRY_WATER_LOSS_PERCENTAGE
+        elif moisture < MOISTURE_DRY_THRESHOLD:
+            return DRY_WATER_LOSS_PERCENTAGE
+        return 0
+    
+    @staticmethod
+    def moisture_status(moisture):
+        """Return the (label, text colour class) shown for a moisture level"""
+        if moisture < MOISTURE_VERY_DRY_THRESHOLD:
+            return MOISTURE_VERY_DRY_LABEL, "text-danger"
+        elif moisture < MOISTURE_DRY_THRESHOLD:
+            return MOISTURE_DRY_LABEL, "text-warning"
+        elif moisture < MOISTURE_NEUTRAL_THRESHOLD:
+            return MOISTURE_NEUTRAL_LABEL, "text-secondary"
+        elif moisture < MOISTURE_HEALTHY_THRESHOLD:
+            return MOISTURE_HEALTHY_LABEL, "text-success"
+        return MOISTURE_TOO_MOIST_LABEL, "text-info"
+
+moisture_tables = MoistureTables()
+
+class TreeKernel:
+    """A garden's trees held as parallel arrays, with daily weather and waterings applied to all of them in bulk.
+    
+    Load it from tree rows once, run any number of days and waterings against the arrays,
+    then write rows() back in a single statement.
+    """
+    def __init__(self, trees, tables=moisture_tables):
+        self.tables = tables
+        self.ids = array('q')
+        self.moisture = array('q')
+        self.water = array('q')
+        self.water_required = array('q')
+        self.stage = array('q')
+        for tree in trees:
+            self.ids.append(tree['rowid'])
+            self.moisture.append(tree['Moisture'])
+            self.water.append(tree['Water'])
+            self.water_required.append(tree['Water_Required'])
+            self.stage.append(tree['Stage'])
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def advance_day(self, temperature, humidity, state):
+        """Apply one day of weather: every tree's moisture follows it, and dry trees lose water"""
+        humidity_change = HUMIDITY_INFLUENCE * (humidity - DEFAULT_HUM)
+        state_change = WEATHER_STATE_INFLUENCE * (state - DEFAULT_STATE)
+        temperature_change = TEMP_INFLUENCE * (temperature - DEFAULT_TEMP)
+        water_loss = self.tables.water_loss
+        
+        moisture, water, water_required = self.moisture, self.water, self.water_required
+        for i in range(len(moisture)):
+            new_moisture = int(max(MIN_MOISTURE, min(MAX_MOISTURE, moisture[i] + humidity_change + state_change - temperature_change)))
+            moisture[i] = new_moisture
+            
+            percentage = water_loss[new_moisture]
+            if percentage:
+                water[i] = max(0, water[i] - int(water_required[i] * percentage / 100))
+    
+    def water_trees(self, waterings):
+        """Water trees from (index, amount) pairs, growing each through every stage its absorbed water pays for.
+        
+        The whole amount always raises the moisture, but only the share the tree's
+        moisture lets it absorb counts towards growth.
+        """
+        efficiency, boost = self.tables.efficiency, self.tables.boost
+        for i, amount in waterings:
+            moisture = self.moisture[i]
+            effective_water = int(amount * efficiency[moisture])
+            self.moisture[i] = int(min(MAX_MOISTURE, moisture + amount / WATER_TO_MOISTURE_RATIO * boost[moisture]))
+            
+            stages_gained, self.water[i], self.water_required[i] = water_thresholds.advance(
+                self.water[i] + effective_water, self.water_required[i]
+            )
+            self.stage[i] += stages_gained
+    
+    def status(self, i):
+        """The (label, text colour class) shown for tree i's moisture"""
+        return self.tables.status[self.moisture[i]]
+    
+    def tree(self, i):
+        """Tree i's (water, stage, water_required, moisture)"""
+        return self.water[i], self.stage[i], self.water_required[i], self.moisture[i]
+    
+    def rows(self):
+        """(moisture, water, rowid) of every tree, as TreeModel.update_trees_moisture_and_water takes them"""
+        return list(zip(self.moisture, self.water, self.ids))
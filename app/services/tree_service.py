@@ -1,10 +1,7 @@
-from config import (
-    MOISTURE_DRY_THRESHOLD, MOISTURE_VERY_DRY_THRESHOLD, TREE_REQUIREMENTS, 
-    REQUIRED_WATER_INCREASE_PER_STAGE_PERCENTAGE, DEFAULT_MOISTURE, HUMIDITY_INFLUENCE, 
-    TEMP_INFLUENCE, WEATHER_STATE_INFLUENCE, MIN_MOISTURE, MAX_MOISTURE, 
-    DEFAULT_HUM, DEFAULT_TEMP, DEFAULT_STATE,
-    VERY_DRY_WATER_LOSS_PERCENTAGE, DRY_WATER_LOSS_PERCENTAGE
-)
+from models import Transaction
+from config import TREE_REQUIREMENTS, UPCOMING_LEVELS_SHOWN
+from services.threshold_service import water_thresholds
+from services.tree_kernel_service import TreeKernel, moisture_tables
 
 class TreeService:
     def __init__(self, tree_model, garden_model):
@@ -28,133 +25,99 @@ class TreeService:
             }
             
             if unlocked and planted:
-                tree.update({
-                    "name": trees_data[i]['Name'],
-                    "stage": trees_data[i]['Stage'],
-                    "water": trees_data[i]['Water'],
-                    "water_required": trees_data[i]['Water_Required'],
-                    "last_watered": trees_data[i]['Last_Watered'],
-                    "moisture": trees_data[i]["Moisture"]
-                })
+                tree.update(self._tree_to_dict(trees_data[i]))
             
             trees.append(tree)
         return trees
     
-    def water_tree(self, tree_index, amount):
-        """Water a specific tree using garden water reserves"""
-        garden = self.garden_model.get_garden_data()
-        if garden['Water'] < amount:
-            return False, "Not enough water!"
-        
-        trees_data = self.tree_model.get_trees_data()
-        if tree_index >= len(trees_data):
-            return False, "Tree not found!"
-        
-        tree = trees_data[tree_index]
-        
-        # Calculate water efficiency based on moisture level
-        water_efficiency = self._calculate_water_efficiency(tree['Moisture'])
-        effective_water = int(amount * water_efficiency)
-        
-        # Calculate moisture increase from watering
-        moisture_increase = self._calculate_moisture_increase(tree['Moisture'], amount)
-        new_moisture = min(MAX_MOISTURE, tree['Moisture'] + moisture_increase)
-        
-        # Update tree water (reduced amount), moisture, and last watered time
-        self.tree_model.water_tree(tree['rowid'], effective_water)
-        self.tree_model.update_tree_moisture(tree['rowid'], int(new_moisture))
-        self.tree_model.update_last_watered(tree['rowid'])
-        
-        # Update garden water reserves (full amount is still consumed)
-        self.garden_model.update_water(-amount)
-        
-        # Check for tree growth
-        self.check_tree_growth(tree['rowid'])
-        
-        return True, None
-
-    def _calculate_water_efficiency(self, current_moisture):
-        """Calculate water efficiency based on current moisture level"""
-        from config import MOISTURE_HEALTHY_THRESHOLD, WATER_EFFICIENCY_REDUCTION
-        
-        if current_moisture > MOISTURE_HEALTHY_THRESHOLD:
-            # Reduce efficiency for high moisture trees
-            excess_moisture = current_moisture - MOISTURE_HEALTHY_THRESHOLD
-            max_excess = MAX_MOISTURE - MOISTURE_HEALTHY_THRESHOLD
-            
-            # Linear reduction: efficiency = 1.0 - (excess / max_excess) * reduction_factor
-            efficiency_penalty = (excess_moisture / max_excess) * WATER_EFFICIENCY_REDUCTION
-            return max(0.1, 1.0 - efficiency_penalty)  # Minimum 10% efficiency
-        
-        return 1.0  # Full efficiency for normal/low moisture
+    def get_tree_state(self, tree_index, tree=None):
+        """Get a single planted tree in the same format as process_trees, or None"""
+        if tree is None:
+            tree = self.tree_model.get_tree_by_index(tree_index)
+        if tree is None:
+            return None
+        
+        state = {"index": tree_index, "unlocked": True, "planted": True, "required_level": TREE_REQUIREMENTS[tree_index]}
+        state.update(self._tree_to_dict(tree))
+        return state
     
-    def _calculate_moisture_increase(self, current_moisture, water_amount):
-        """Calculate how much moisture increases based on water amount and current moisture level"""
-        from config import WATER_TO_MOISTURE_RATIO, MOISTURE_BOOST_THRESHOLD, MOISTURE_BOOST_MULTIPLIER
-        
-        # Base moisture increase
-        base_increase = water_amount / WATER_TO_MOISTURE_RATIO
-        
-        # Apply boost for low moisture
-        if current_moisture < MOISTURE_BOOST_THRESHOLD:
-            base_increase *= MOISTURE_BOOST_MULTIPLIER
-        
-        return base_increase
+    def _tree_to_dict(self, tree):
+        """Convert a tree row into the frontend-friendly format"""
+        moisture_label, moisture_class = self.moisture_status(tree['Moisture'])
+        return {
+            "name": tree['Name'],
+            "stage": tree['Stage'],
+            "water": tree['Water'],
+            "water_required": tree['Water_Required'],
+            "last_watered": tree['Last_Watered'],
+            "moisture": tree['Moisture'],
+            "moisture_label": moisture_label,
+            "moisture_class": moisture_class,
+            "water_to_next_stages": water_thresholds.to_next(tree['Water'], tree['Water_Required'], UPCOMING_LEVELS_SHOWN)
+        }
     
-    def check_tree_growth(self, tree_id):
-        """Check if tree has enough water to advance stages"""
-        tree = self.tree_model.get_tree_by_id(tree_id)
-        if not tree:
-            return 0
-        
-        tree = dict(tree)  # Convert to dict for mutations
-        
-        while tree['Water'] >= tree['Water_Required']:
-            tree['Water'] -= tree['Water_Required']
-            tree['Stage'] += 1
-            tree['Water_Required'] += round(tree['Water_Required'] / 100 * REQUIRED_WATER_INCREASE_PER_STAGE_PERCENTAGE, -1)
-        
-        self.tree_model.update_tree_growth(tree_id, tree['Water'], tree['Stage'], tree['Water_Required'])
-        return tree['Stage']
+    def moisture_status(self, moisture):
+        """Return the (label, text colour class) shown for a moisture level"""
+        return moisture_tables.status[moisture]
     
-    def daily_tree_update(self, current_weather):
-        """Update all trees' moisture levels based on current weather"""
-        trees_data = self.tree_model.get_trees_data()
-        
-        current_humidity = current_weather['Humidity']
-        current_temp = current_weather['Temperature']
-        current_state = current_weather['State']
-        
-        for tree in trees_data:
-            previous_moisture = tree['Moisture']
+    def water_tree(self, tree_index, amount, tree=None):
+        """Water a specific tree using garden water reserves.
+        
+        The reserves are spent with a guarded update inside one short write transaction, so
+        concurrent waterings can never overspend them. Batches pass the tree row they already
+        hold instead of reading it again.
+        """
+        with Transaction(self.tree_model.db):
+            if tree is None:
+                tree = self.tree_model.get_tree_by_index(tree_index)
+            if tree is None:
+                return False, "Tree not found!"
             
-            # Calculate new moisture using the formula
-            new_moisture = (
-                previous_moisture +
-                HUMIDITY_INFLUENCE * (current_humidity - DEFAULT_HUM) +
-                WEATHER_STATE_INFLUENCE * (current_state - DEFAULT_STATE) -
-                TEMP_INFLUENCE * (current_temp - DEFAULT_TEMP)
-            )
+            # Full amount is consumed from the reserves, whatever the tree can absorb
+            if self.garden_model.spend_water(amount) is None:
+                return False, "Not enough water!"
             
-            # Clamp moisture to valid range
-            new_moisture = max(MIN_MOISTURE, min(MAX_MOISTURE, new_moisture))
+            # Absorb the share of the water the tree's moisture allows and grow it
+            kernel = TreeKernel([tree])
+            kernel.water_trees([(0, amount)])
             
-            # Update tree moisture in database
-            self.tree_model.update_tree_moisture(tree['rowid'], int(new_moisture))
+            # Update tree water, growth, moisture, and last watered time
+            self.tree_model.update_watered_tree(tree['rowid'], *kernel.tree(0))
+        
+        return True, None
+    
+    def water_trees(self, waterings):
+        """Water several trees from (tree_index, amount) pairs in one transaction.
+        
+        The reserves are spent once for the total, so either every watering happens or,
+        when they cannot cover it, none does.
+        """
+        with Transaction(self.tree_model.db):
+            trees = self.tree_model.get_trees_data()
+            if any(not 0 <= tree_index < len(trees) for tree_index, _ in waterings):
+                return False, "Tree not found!"
             
-            # Water regression for dry trees
-            current_water = tree['Water']
-            new_water = current_water
+            if self.garden_model.spend_water(sum(amount for _, amount in waterings)) is None:
+                return False, "Not enough water!"
             
-            if new_moisture < MOISTURE_VERY_DRY_THRESHOLD:
-                # Very dry trees lose water faster
-                water_loss = int(tree['Water_Required'] * VERY_DRY_WATER_LOSS_PERCENTAGE / 100)
-                new_water = max(0, current_water - water_loss)
-            elif new_moisture < MOISTURE_DRY_THRESHOLD:
-                # Dry trees lose water slowly
-                water_loss = int(tree['Water_Required'] * DRY_WATER_LOSS_PERCENTAGE / 100)
-                new_water = max(0, current_water - water_loss)
+            kernel = TreeKernel(trees)
+            kernel.water_trees(waterings)
             
-            # Update water if it changed
-            if new_water != current_water:
-                self.tree_model.update_tree_water_only(tree['rowid'], new_water)
\ No newline at end of file
+            watered = sorted({tree_index for tree_index, _ in waterings})
+            self.tree_model.update_watered_trees([(kernel.ids[i],) + kernel.tree(i) for i in watered])
+        
+        return True, None
+    
+    def calculate_tree_growth(self, water, stage, water_required):
+        """Return (water, stage, water_required) after advancing every stage the water pays for"""
+        stages_gained, water, water_required = water_thresholds.advance(water, water_required)
+        return water, stage + stages_gained, water_required
+    
+    def daily_tree_update(self, current_weather):
+        """Update all trees' moisture levels based on current weather"""
+        kernel = TreeKernel(self.tree_model.get_trees_data())
+        kernel.advance_day(current_weather['Temperature'], current_weather['Humidity'], current_weather['State'])
+        
+        # Write every tree in a single executemany and commit
+        with self.tree_model.db:
+            self.tree_model.update_trees_moisture_and_water(kernel.rows())
@@ -7,50 +7,93 @@ def clamp(value, min_val, max_val):
     return max(min_val, min(max_val, value))
 
 class WeatherService:
-    def __init__(self, weather_model):
+    def __init__(self, weather_model, horizon=WEATHER_FORECAST_DAYS):
         self.weather_model = weather_model
+        self.horizon = horizon
     
-    def simulate_weather(self, n_days=4):
-        """Run a rolling window of at most n_days in the Weather table."""
-        # Count existing rows
-        count = self.weather_model.get_weather_count()
-        
-        # Seed defaults if empty
-        if count == 0:
-            self.weather_model.insert_weather(DEFAULT_TEMP, DEFAULT_HUM, DEFAULT_STATE)
-            count = 1
-        
-        # Rotate out oldest to keep at most n_days-1 existing
-        if count >= n_days:
-            to_delete = count - (n_days - 1)
-            for _ in range(to_delete):
-                self.weather_model.delete_oldest_weather()
-            count = self.weather_model.get_weather_count()
-        
-        # Append new days until we have n_days
-        while count < n_days:
-            temp_prev, hum_prev, state_prev = self.weather_model.get_last_weather()
-            
-            # Temperature
-            temp_delta = random.uniform(*TEMP_DELTA_RANGE)
-            temp_curr = clamp(
-                temp_prev + temp_delta + DRIFT_TEMP * (DEFAULT_TEMP - temp_prev),
-                MIN_TEMP, MAX_TEMP
-            )
-            
-            # Humidity
-            hum_delta = random.uniform(*HUM_DELTA_RANGE)
-            hum_curr = clamp(
-                hum_prev + hum_delta - HUMIDITY_TEMP_INFLUENCE * (temp_curr - temp_prev) + DRIFT_HUM * (DEFAULT_HUM - hum_prev),
-                MIN_HUM, MAX_HUM
-            )
-            
-            # State
-            state_delta = random.uniform(*STATE_DELTA_RANGE)
-            state_curr = clamp(
-                state_prev + state_delta + STATE_HUM_INFLUENCE * (hum_curr - hum_prev) + STATE_TEMP_INFLUENCE * (temp_curr - temp_prev) + DRIFT_STATE * (DEFAULT_STATE - state_prev),
-                MIN_STATE, MAX_STATE
-            )
-            
-            self.weather_model.insert_weather(temp_curr, hum_curr, state_curr)
-            count += 1
\ No newline at end of file
+    def simulate_weather(self, rng=None):
+        """Fill the garden's forecast window out to the horizon and commit"""
+        with self.weather_model.db:
+            self.ensure_window(rng=rng)
+    
+    def ensure_window(self, rng=None):
+        """Return the furthest forecast day as (day, temp, hum, state), first laying the window out
+        again if it is missing or was stored for a different horizon (does not commit).
+        """
+        last = self.weather_model.get_last_weather()
+        if last is not None and self.weather_model.get_meta('weather_horizon') == str(self.horizon):
+            return tuple(last)
+        
+        # Keep the furthest days that still fit and forecast the rest
+        rows = [tuple(row) for row in self.weather_model.get_all_weather()][-self.horizon:]
+        if not rows:
+            rows = [(0, int(DEFAULT_TEMP), int(DEFAULT_HUM), int(DEFAULT_STATE))]
+        rows += self.following_days(rows[-1], self.horizon - len(rows), rng=rng)
+        
+        self.weather_model.replace_weather(rows, self.horizon)
+        self.weather_model.set_meta('weather_horizon', str(self.horizon))
+        return rows[-1]
+    
+    def advance(self, days, rng=None):
+        """Roll the forecast window forward by days and return each new day's (temp, hum, state) (does not commit).
+        
+        Every new day is forecast from the one before and written over the slot of the day that
+        ended, so a rollover writes at most min(days, horizon) rows, one per day, whatever the horizon.
+        """
+        new_days = self.following_days(self.ensure_window(rng=rng), days, rng=rng)
+        self.weather_model.put_weather(new_days[-self.horizon:], self.horizon)
+        return [(temp, hum, state) for _, temp, hum, state in new_days]
+    
+    def following_days(self, last, k_days, rng=None):
+        """Forecast the k_days after last, a (day, temp, hum, state) row, as rows of the same shape"""
+        day, temp, hum, state = last
+        rows = self.generate_weather(k_days, start=(temp, hum, state), rng=rng)
+        return [(day + 1 + i, *row) for i, row in enumerate(rows)]
+    
+    def generate_weather(self, k_days, start=None, seed=None, rng=None):
+        """Generate k_days of (temp, hum, state) rows following start, without touching the database.
+        
+        Pass a seed or a random.Random instance to make the output reproducible. Each day is
+        truncated to ints like the Weather table stores it. This is the one weather generator:
+        the forecast window and every rollover are filled from it.
+        """
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        
+        temp, hum, state = start if start is not None else (DEFAULT_TEMP, DEFAULT_HUM, DEFAULT_STATE)
+        
+        # Draw every day's deltas up front, then run the recurrence over them
+        deltas = [
+            (rng.uniform(*TEMP_DELTA_RANGE), rng.uniform(*HUM_DELTA_RANGE), rng.uniform(*STATE_DELTA_RANGE))
+            for _ in range(k_days)
+        ]
+        
+        rows = []
+        for temp_delta, hum_delta, state_delta in deltas:
+            temp, hum, state = self._apply_weather_deltas(temp, hum, state, temp_delta, hum_delta, state_delta)
+            temp, hum, state = int(temp), int(hum), int(state)
+            rows.append((temp, hum, state))
+        
+        return rows
+    
+    def _apply_weather_deltas(self, temp_prev, hum_prev, state_prev, temp_delta, hum_delta, state_delta):
+        """Apply one day's random deltas, drift and clamping to the previous day's weather."""
+        # Temperature
+        temp_curr = clamp(
+            temp_prev + temp_delta + DRIFT_TEMP * (DEFAULT_TEMP - temp_prev),
+            MIN_TEMP, MAX_TEMP
+        )
+        
+        # Humidity
+        hum_curr = clamp(
+            hum_prev + hum_delta - HUMIDITY_TEMP_INFLUENCE * (temp_curr - temp_prev) + DRIFT_HUM * (DEFAULT_HUM - hum_prev),
+            MIN_HUM, MAX_HUM
+        )
+        
+        # State
+        state_curr = clamp(
+            state_prev + state_delta + STATE_HUM_INFLUENCE * (hum_curr - hum_prev) + STATE_TEMP_INFLUENCE * (temp_curr - temp_prev) + DRIFT_STATE * (DEFAULT_STATE - state_prev),
+            MIN_STATE, MAX_STATE
+        )
+        
+        return temp_curr, hum_curr, state_curr
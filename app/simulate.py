@@ -0,0 +1,232 @@
+"""Headless garden simulator: run many gardens through the daily cycle without Flask.
+
+Run from the app directory:
+
+    python simulate.py --gardens 64 --days 365 --workers 4
+
+Every garden is played by a script: each day it completes the habits scheduled that day
+with probability --completion-rate, plants trees as their slots unlock and waters them by
+the --watering policy. Days pass on a simulated clock through the same rollover the
+scheduler runs, and each garden's randomness is drawn from --seed, so a run gives the same
+results whatever the number of workers. Gardens are spread across a process pool, each
+worker with its own in-memory database.
+
+Use it to load-test the daily cycle, or to tune the balance constants in config.py by
+comparing the summaries of runs before and after a change; --output writes every garden's
+final state as JSON.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import TREE_REQUIREMENTS
+from models.habit import WEEKDAYS
+
+DEFAULT_START = datetime.datetime(2026, 1, 5)  # A Monday, so runs line up with the same weekdays
+
+class SimulatedClock:
+    """A UTC clock that only moves when advanced"""
+    def __init__(self, start):
+        self.current = start
+    
+    def now(self):
+        return self.current
+    
+    def advance(self, days=1):
+        self.current += datetime.timedelta(days=days)
+
+def water_evenly(trees, water):
+    """Split the whole reserve evenly between the planted trees"""
+    share = water // len(trees) if trees else 0
+    return [(index, share) for index in range(len(trees))] if share > 0 else []
+
+def water_driest(trees, water):
+    """Pour the whole reserve on the driest tree"""
+    if not trees or water <= 0:
+        return []
+    return [(min(range(len(trees)), key=lambda index: trees[index]['Moisture']), water)]
+
+def water_never(trees, water):
+    """Leave the trees to the weather"""
+    return []
+
+WATERING_POLICIES = {"even": water_evenly, "driest": water_driest, "none": water_never}
+
+class GardenScript:
+    """How the simulated players run their gardens"""
+    def __init__(self, habits=5, days_per_week=5, completion_rate=0.8, watering="even"):
+        self.habits = habits
+        self.days_per_week = days_per_week
+        self.completion_rate = completion_rate
+        self.watering = watering
+    
+    def as_dict(self):
+        """Describe the script for the results file"""
+        return dict(vars(self))
+
+class SimulatedGarden:
+    """One garden and its scripted player, driving the same models and services the routes use"""
+    def __init__(self, db, garden_id, script, rng, clock):
+        from database.schema import ensure_garden
+        from models import GardenModel, TreeModel, HabitModel, WeatherModel
+        from services import GardenService, TreeService, HabitService, TimeService
+        
+        self.garden_id = garden_id
+        self.script = script
+        self.rng = rng
+        self.garden_model = GardenModel(db, garden_id)
+        self.tree_model = TreeModel(db, garden_id)
+        self.habit_model = HabitModel(db, garden_id)
+        self.weather_model = WeatherModel(db, garden_id)
+        self.tree_service = TreeService(self.tree_model, self.garden_model)
+        self.habit_service = HabitService(self.habit_model, GardenService(self.garden_model))
+        self.time_service = TimeService(garden_id, db=db, clock=clock.now, rng=rng)
+        self.completions = 0
+        self.water_spent = 0
+        
+        # Start the garden's day clock on the simulated clock instead of the real one
+        ensure_garden(db, garden_id, rng=rng)
+        with db:
+            self.weather_model.set_meta('global_last_run', clock.now().isoformat())
+        
+        for i in range(script.habits):
+            days = rng.sample(WEEKDAYS, script.days_per_week)
+            self.habit_model.add_habit(f"Habit {i}", rng.randint(0, 5), ','.join(day for day in WEEKDAYS if day in days))
+        self.plant_unlocked_trees()
+    
+    def play_day(self):
+        """Roll the garden over to the clock's day, then complete habits, plant and water"""
+        self.time_service.trigger_daily_updates()
+        
+        today = self.weather_model.get_garden_day()
+        for habit in self.habit_service.get_active_habits(today):
+            if self.rng.random() < self.script.completion_rate:
+                success, _ = self.habit_service.complete_habit(habit['name'], today)
+                self.completions += success
+        
+        self.plant_unlocked_trees()
+        
+        trees = self.tree_model.get_trees_data()
+        water = self.garden_model.get_garden_data()['Water']
+        waterings = WATERING_POLICIES[self.script.watering](trees, water)
+        if waterings:
+            success, _ = self.tree_service.water_trees(waterings)
+            if success:
+                self.water_spent += sum(amount for _, amount in waterings)
+    
+    def plant_unlocked_trees(self):
+        """Plant a tree in every slot the garden's level has unlocked"""
+        level = self.garden_model.get_garden_data()['Level']
+        planted = len(self.tree_model.get_trees_data())
+        while planted < len(TREE_REQUIREMENTS) and level >= TREE_REQUIREMENTS[planted]:
+            self.tree_model.plant_tree(f"Tree {planted}")
+            planted += 1
+    
+    def results(self):
+        """The garden's final state"""
+        garden = self.garden_model.get_garden_data()
+        return {
+            "garden_id": self.garden_id,
+            "level": garden['Level'],
+            "experience": garden['Experience'],
+            "water": garden['Water'],
+            "trees": [tree['Stage'] for tree in self.tree_model.get_trees_data()],
+            "completions": self.completions,
+            "water_spent": self.water_spent
+        }
+
+def simulate_gardens(garden_ids, days, script, seed, start):
+    """Worker: play the given gardens for days days in a private in-memory database"""
+    from database.connection import ConnectionPool
+    from database.schema import migrate
+    
+    db = ConnectionPool(':memory:', 1, instrumented=False).connect()
+    migrate(db)
+    
+    clock = SimulatedClock(start)
+    gardens = [
+        SimulatedGarden(db, garden_id, script, random.Random(f"{seed}:{garden_id}"), clock)
+        for garden_id in garden_ids
+    ]
+    for _ in range(days):
+        clock.advance()
+        for garden in gardens:
+            garden.play_day()
+    
+    results = [garden.results() for garden in gardens]
+    db.close()
+    return results
+
+def run_simulation(gardens, days, script, seed=0, workers=None, start=DEFAULT_START):
+    """Simulate gardens gardens for days days across a process pool and return the results dict"""
+    workers = min(workers or os.cpu_count() or 1, gardens)
+    garden_ids = list(range(1, gardens + 1))
+    chunks = [garden_ids[i::workers] for i in range(workers)]
+    
+    begin = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(simulate_gardens, chunk, days, script, seed, start) for chunk in chunks]
+        results = sorted((result for future in futures for result in future.result()), key=lambda result: result["garden_id"])
+    seconds = time.perf_counter() - begin
+    
+    return {
+        "gardens": gardens,
+        "days": days,
+        "workers": workers,
+        "seed": seed,
+        "script": script.as_dict(),
+        "seconds": seconds,
+        "garden_days_per_second": gardens * days / seconds,
+        "summary": summarize(results, days),
+        "garden_results": results
+    }
+
+def summarize(results, days):
+    """Spread of the outcomes that config.py's balance constants shape"""
+    def spread(values):
+        return {"mean": sum(values) / len(values), "min": min(values), "max": max(values)}
+    
+    stages = [stage for result in results for stage in result["trees"]]
+    return {
+        "level": spread([result["level"] for result in results]),
+        "trees_planted": spread([len(result["trees"]) for result in results]),
+        "tree_stage": spread(stages) if stages else None,
+        "water_banked": spread([result["water"] for result in results]),
+        "water_spent_per_day": spread([result["water_spent"] / days for result in results]),
+        "completions_per_day": spread([result["completions"] / days for result in results])
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python simulate.py', description="Simulate many gardens through the daily cycle.")
+    parser.add_argument('--gardens', type=int, default=32, help="Gardens to simulate")
+    parser.add_argument('--days', type=int, default=365, help="Days each garden is played")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for every garden's randomness")
+    parser.add_argument('--start', type=datetime.datetime.fromisoformat, default=DEFAULT_START, help="Simulated UTC start time")
+    parser.add_argument('--habits', type=int, default=5, help="Habits per garden")
+    parser.add_argument('--days-per-week', type=int, default=5, choices=range(1, 8), help="Weekdays each habit is scheduled on")
+    parser.add_argument('--completion-rate', type=float, default=0.8, help="Chance a scheduled habit is completed")
+    parser.add_argument('--watering', choices=sorted(WATERING_POLICIES), default="even", help="How the reserves are spent each day")
+    parser.add_argument('--output', help="Write the full results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    script = GardenScript(args.habits, args.days_per_week, args.completion_rate, args.watering)
+    results = run_simulation(args.gardens, args.days, script, seed=args.seed, workers=args.workers, start=args.start)
+    
+    print(f"{results['gardens']} gardens x {results['days']} days on {results['workers']} workers in {results['seconds']:.2f} s "
+          f"({results['garden_days_per_second']:.0f} garden-days/s)")
+    for name, stats in results["summary"].items():
+        if stats is not None:
+            print(f"{name:<22} mean {stats['mean']:>10.1f}   min {stats['min']:>8.1f}   max {stats['max']:>8.1f}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -65,7 +65,10 @@ function completeHabit(habitName) {
     })
         .then(response => {
             if (response.ok) {
-                window.location.reload();
+                response.json().then(data => {
+                    updateGarden(data.garden);
+                    upsertHabit(data.habit);
+                });
             } else {
                 console.log(response);
             }
@@ -75,6 +78,208 @@ function completeHabit(habitName) {
         });
 }
 
+// ========== Incremental DOM updates from mutation responses ==========
+
+function updateGarden(garden) {
+    document.getElementById('gardenWater').textContent = garden.water;
+    document.getElementById('gardenExperienceText').textContent = `${garden.experience}/${garden.experience_required}`;
+
+    const experienceBar = document.getElementById('gardenExperienceBar');
+    experienceBar.style.width = `${Math.round(garden.experience / garden.experience_required * 100)}%`;
+    experienceBar.setAttribute('aria-valuenow', garden.experience);
+    experienceBar.setAttribute('aria-valuemax', garden.experience_required);
+    document.getElementById('gardenExperience').title = `XP to next levels: ${garden.experience_to_next_levels.join(', ')}`;
+
+    const levelElement = document.getElementById('gardenLevel');
+    const previousLevel = parseInt(levelElement.textContent);
+    levelElement.textContent = garden.level;
+
+    // Levelling up can unlock new tree slots, which changes the whole grid
+    if (garden.level > previousLevel) {
+        const unlocked = Array.from(document.querySelectorAll('[data-required-level]'))
+            .some(slot => parseInt(slot.dataset.requiredLevel) <= garden.level);
+        if (unlocked) {
+            window.location.reload();
+        }
+    }
+}
+
+function updateTreeCard(tree) {
+    const card = document.querySelector(`[data-tree][data-index="${tree.index}"]`);
+    if (!card) {
+        return;
+    }
+
+    card.dataset.name = tree.name;
+    card.dataset.water = tree.water;
+    card.dataset.stage = tree.stage;
+    card.dataset.waterRequired = tree.water_required;
+    card.dataset.lastWatered = tree.last_watered;
+
+    card.querySelector('.tree-image').src = `/static/tree_stage_${tree.stage}.png`;
+    card.querySelector('.tree-name').textContent = tree.name;
+    card.querySelector('.tree-progress-text').textContent = `${tree.water}/${tree.water_required}`;
+
+    const progressBar = card.querySelector('.tree-progress-bar');
+    progressBar.style.width = `${tree.water_required ? tree.water / tree.water_required * 100 : 0}%`;
+    progressBar.setAttribute('aria-valuenow', tree.water);
+    progressBar.setAttribute('aria-valuemax', tree.water_required);
+    card.querySelector('.tree-progress').title = `Water to next stages: ${tree.water_to_next_stages.join(', ')}`;
+
+    const moisture = card.querySelector('.tree-moisture');
+    moisture.className = `mt-2 tree-moisture ${tree.moisture_class}`;
+    moisture.textContent = tree.moisture_label;
+
+    // Refresh the details card if it is showing this tree
+    const detailsCard = document.getElementById('treeDetailsCard');
+    if (!detailsCard.classList.contains('d-none') && detailsCard.dataset.index === String(tree.index)) {
+        showTreeDetails(card);
+    }
+}
+
+function renderHabitItem(habit) {
+    const item = document.createElement('div');
+    item.className = 'list-group-item d-flex justify-content-between align-items-center';
+    item.dataset.habitItem = habit.name;
+
+    const streak = document.createElement('span');
+    streak.className = 'badge bg-warning text-dark ms-1 habit-streak';
+    streak.textContent = habit.current_streak;
+    const rate = habit.completion_rate === null ? 'n/a' : `${Math.floor(habit.completion_rate * 100)}%`;
+    streak.title = `Best streak: ${habit.best_streak}, completion rate: ${rate}`;
+
+    const label = document.createElement('span');
+    label.append(document.createTextNode(habit.name + ' '), streak);
+    item.append(label);
+
+    const editButton = document.createElement('button');
+    editButton.type = 'button';
+    editButton.className = 'btn btn-sm btn-primary';
+    editButton.textContent = 'Edit';
+    editButton.dataset.bsToggle = 'modal';
+    editButton.dataset.bsTarget = '#habitModal';
+    editButton.dataset.action = 'edit';
+    editButton.dataset.habitName = habit.name;
+    editButton.dataset.habitPriority = habit.priority;
+    editButton.dataset.habitDays = habit.days;
+
+    if (!habit.active) {
+        item.append(editButton);
+        return item;
+    }
+
+    const completeButton = document.createElement('button');
+    completeButton.type = 'button';
+    completeButton.className = 'btn btn-sm btn-success';
+    if (habit.completed) {
+        completeButton.textContent = 'Completed';
+        completeButton.disabled = true;
+    } else {
+        completeButton.textContent = 'Mark as complete';
+        completeButton.addEventListener('click', () => completeHabit(habit.name));
+    }
+
+    const buttons = document.createElement('div');
+    buttons.append(editButton, document.createTextNode(' '), completeButton);
+    item.append(buttons);
+    return item;
+}
+
+function findHabitItem(name) {
+    return document.querySelector(`[data-habit-item="${CSS.escape(name)}"]`);
+}
+
+function upsertHabit(habit, previousName) {
+    // Fall back to the new name when the rename was already applied, e.g. by a live event
+    const existing = (previousName && findHabitItem(previousName)) || findHabitItem(habit.name);
+    const list = document.getElementById(habit.active ? 'activeHabitsList' : 'scheduledHabitsList');
+    const item = renderHabitItem(habit);
+
+    if (existing && existing.parentElement === list) {
+        existing.replaceWith(item);
+    } else {
+        if (existing) {
+            existing.remove();
+        }
+        list.append(item);
+    }
+    refreshHabitPlaceholders();
+}
+
+function removeHabit(name) {
+    const existing = findHabitItem(name);
+    if (existing) {
+        existing.remove();
+    }
+    refreshHabitPlaceholders();
+}
+
+function refreshHabitPlaceholders() {
+    [['activeHabitsList', 'No active habits'], ['scheduledHabitsList', 'No scheduled habits']].forEach(([id, text]) => {
+        const list = document.getElementById(id);
+        const placeholder = list.querySelector('[data-empty-placeholder]');
+        const hasHabits = list.querySelector('[data-habit-item]') !== null;
+
+        if (hasHabits && placeholder) {
+            placeholder.remove();
+        } else if (!hasHabits && !placeholder) {
+            const empty = document.createElement('div');
+            empty.className = 'list-group-item';
+            empty.dataset.emptyPlaceholder = '';
+            empty.textContent = text;
+            list.append(empty);
+        }
+    });
+}
+
+function hideModal(id) {
+    const modal = bootstrap.Modal.getInstance(document.getElementById(id));
+    if (modal) {
+        modal.hide();
+    }
+}
+
+// Keep the day countdown ticking client-side, so a cached (304) page stays accurate
+function updateDayCountdown() {
+    const countdown = document.getElementById('dayCountdown');
+    if (!countdown || !countdown.dataset.dayEnds) {
+        return;
+    }
+
+    const timeLeft = new Date(countdown.dataset.dayEnds) - new Date();
+    if (timeLeft <= 0) {
+        countdown.textContent = 'Day ended';
+        return;
+    }
+
+    const hours = Math.floor((timeLeft % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+    const minutes = Math.floor((timeLeft % (1000 * 60 * 60)) / (1000 * 60));
+    countdown.textContent = `${hours}h ${minutes}m`;
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    updateDayCountdown();
+    setInterval(updateDayCountdown, 30 * 1000);
+});
+
+// Apply changes made in other tabs or by the daily rollover as they happen
+document.addEventListener('DOMContentLoaded', () => {
+    if (!window.EventSource) {
+        return;
+    }
+
+    const events = new EventSource('/events');
+    const listen = (type, handler) => events.addEventListener(type, event => handler(JSON.parse(event.data)));
+
+    listen('garden', garden => updateGarden(garden));
+    listen('tree', tree => updateTreeCard(tree));
+    listen('habit', data => upsertHabit(data.habit, data.previous_name));
+    listen('habit_deleted', data => removeHabit(data.name));
+    listen('tree_planted', () => location.reload());
+    listen('rollover', () => location.reload());
+    listen('import', () => location.reload());
+});
+
 // Initialize Bootstrap Tooltips
 document.addEventListener('DOMContentLoaded', function () {
     var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
@@ -98,7 +303,7 @@ document.addEventListener('DOMContentLoaded', () => {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ name: newName, index: parseInt(index) })
         })
-            .then(response => response.ok ? window.location.reload() : console.error('Failed to save'))
+            .then(response => response.ok ? response.json().then(data => updateTreeCard(data.tree)) : console.error('Failed to save'))
             .catch(error => console.error('Error:', error));
     });
 
@@ -130,7 +335,11 @@ document.addEventListener('DOMContentLoaded', () => {
         })
             .then(response => {
                 if (response.ok) {
-                    window.location.reload();
+                    response.json().then(data => {
+                        updateGarden(data.garden);
+                        updateTreeCard(data.tree);
+                        hideModal('waterModal');
+                    });
                 } else {
                     // Try to parse JSON error response
                     response.json().then(data => {
@@ -157,6 +366,9 @@ document.addEventListener('DOMContentLoaded', () => {
         const confirmButton = habitModal.querySelector("#confirmButton");
         const deleteHabitButton = document.getElementById("deleteHabitButton");
 
+        // Clear any error left over from a previous attempt
+        document.getElementById('addHabitErrorText').textContent = '';
+
         const habitNameInput = document.getElementById('habitName');
         const habitPriorityInput = document.getElementById('habitPriority');
         const dayIds = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"];
@@ -227,7 +439,10 @@ document.addEventListener('DOMContentLoaded', () => {
             })
                 .then(response => {
                     if (response.ok) {
-                        window.location.reload();
+                        response.json().then(data => {
+                            upsertHabit(data.habit, data.previous_name);
+                            hideModal('habitModal');
+                        });
                     } else {
                         response.json().then(data => {
                             errorText.textContent = data.error || 'Failed to edit habit. Please try again.';
@@ -253,7 +468,10 @@ document.addEventListener('DOMContentLoaded', () => {
             })
                 .then(response => {
                     if (response.ok) {
-                        window.location.reload();
+                        response.json().then(data => {
+                            upsertHabit(data.habit);
+                            hideModal('habitModal');
+                        });
                     } else {
                         response.json().then(data => {
                             errorText.textContent = data.error || 'Failed to add habit. Please try again.';
@@ -276,16 +494,19 @@ document.addEventListener('DOMContentLoaded', () => {
         const errorText = document.getElementById('addHabitErrorText');
 
         if (confirm("Are you sure you want to delete this habit? This action cannot be undone.")) {
-            // Send POST request with the habit name.
+            // Send DELETE request with the habit name.
             const data = { habit_name: habitName };
             fetch('/delete_habit', {
-                method: 'POST',
+                method: 'DELETE',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(data)
             })
                 .then(response => {
                     if (response.ok) {
-                        window.location.reload();
+                        response.json().then(data => {
+                            removeHabit(data.name);
+                            hideModal('habitModal');
+                        });
                     } else {
                         response.json().then(data => {
                             errorText.textContent = data.error || 'Failed to delete habit. Please try again.';
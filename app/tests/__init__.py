@@ -0,0 +1,35 @@
+"""Checks that the optimized paths leave the database exactly as the code they replaced.
+
+Run from the app directory:
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+from config import DEFAULT_GARDEN_ID
+
+def open_database(directory, name='test.db', garden_id=DEFAULT_GARDEN_ID):
+    """Open a fresh, migrated save file in directory with one empty garden"""
+    from database.connection import ConnectionPool
+    from database.schema import migrate, ensure_garden
+    
+    db = ConnectionPool(os.path.join(directory, name), 1, instrumented=False).connect()
+    migrate(db)
+    ensure_garden(db, garden_id)
+    return db
+
+class DatabaseTestCase:
+    """Mixin giving each test a temporary directory for its save files"""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.databases = []
+    
+    def tearDown(self):
+        for db in self.databases:
+            db.close()
+        self.directory.cleanup()
+    
+    def open_database(self, name='test.db', garden_id=DEFAULT_GARDEN_ID):
+        db = open_database(self.directory.name, name, garden_id)
+        self.databases.append(db)
+        return db
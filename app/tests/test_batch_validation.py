@@ -0,0 +1,44 @@
+import unittest
+from config import DEFAULT_GARDEN_ID
+from models import TreeModel
+from models.habit import WEEKDAYS
+from services.batch_service import BatchService
+from tests import DatabaseTestCase
+
+class BatchValidationTest(DatabaseTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open_database()
+        TreeModel(self.db, DEFAULT_GARDEN_ID).plant_tree("Oak")
+    
+    def run_batch(self, operations, atomic=False):
+        response, _ = BatchService(self.db, DEFAULT_GARDEN_ID).run(operations, atomic=atomic)
+        return response
+    
+    def test_invalid_tree_name_fails_only_its_operation(self):
+        """An empty tree name is a 400 for that operation, not an error escaping the batch"""
+        response = self.run_batch([
+            {"op": "rename_tree", "index": 0, "name": ""},
+            {"op": "rename_tree", "index": 0, "name": "Elm"}
+        ])
+        
+        self.assertEqual(response["results"][0], {"success": False, "error": "Tree name cannot be empty.", "status": 400})
+        self.assertTrue(response["results"][1]["success"])
+        self.assertEqual(TreeModel(self.db, DEFAULT_GARDEN_ID).get_trees_data()[0]['Name'], "Elm")
+    
+    def test_invalid_priority_is_not_reported_as_a_duplicate(self):
+        """Only a taken name is reported as a duplicate; an out of range priority says so"""
+        days = ','.join(WEEKDAYS)
+        response = self.run_batch([
+            {"op": "add_habit", "habit_name": "Read", "habit_priority": 9, "days_of_the_week": days},
+            {"op": "add_habit", "habit_name": "Read", "habit_priority": "3", "days_of_the_week": days},
+            {"op": "add_habit", "habit_name": "Read", "habit_priority": 3, "days_of_the_week": days}
+        ])
+        
+        self.assertEqual([result.get("error") for result in response["results"]], [
+            "Habit priority must be a number from 0 to 5.", None, "A habit with that name already exists."
+        ])
+        self.assertEqual([result.get("status") for result in response["results"]], [400, None, 400])
+
+if __name__ == '__main__':
+    unittest.main()
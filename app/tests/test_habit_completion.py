@@ -0,0 +1,87 @@
+import datetime
+import unittest
+from config import DEFAULT_GARDEN_ID
+from models import GardenModel, HabitModel, TreeModel, WeatherModel
+from models.habit import WEEKDAYS
+from services import GardenService, HabitService, TimeService
+from tests import DatabaseTestCase
+
+class HabitCompletionTest(DatabaseTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open_database()
+        self.garden_model = GardenModel(self.db, DEFAULT_GARDEN_ID)
+        self.habit_model = HabitModel(self.db, DEFAULT_GARDEN_ID)
+        self.habit_service = HabitService(self.habit_model, GardenService(self.garden_model))
+        TreeModel(self.db, DEFAULT_GARDEN_ID).plant_tree()
+        for name in ("Read", "Run"):
+            self.habit_model.add_habit(name, 1, ','.join(WEEKDAYS))
+    
+    def history(self):
+        return [tuple(row) for row in self.db.execute('SELECT Habit_Name, Day, Completed, Water_Earned FROM Habit_History ORDER BY Habit_Name, Day')]
+    
+    def stats(self, name):
+        habit = self.habit_model.get_habit(name)
+        return habit['Current_Streak'], habit['Completions'], habit['Scheduled_Days']
+    
+    def test_completion_past_the_water_cap_is_still_logged(self):
+        """Once the daily cap is reached a completion earns no water but still counts for history and streaks"""
+        with self.db:
+            self.db.execute('UPDATE Garden SET Daily_Water_Earned = 1000 WHERE Id = ?', (DEFAULT_GARDEN_ID,))
+        
+        success, error = self.habit_service.complete_habit("Read")
+        self.assertTrue(success, error)
+        
+        day = self.habit_service.garden_day().isoformat()
+        self.assertEqual(self.history(), [("Read", day, 1, 0)])
+        self.assertEqual(self.stats("Read"), (1, 1, 1))
+        self.assertEqual(self.garden_model.get_garden_data()['Water'], 0)
+    
+    def test_second_completion_is_refused(self):
+        """Completing a habit again the same day is refused without touching experience, water, history or streak"""
+        self.assertTrue(self.habit_service.complete_habit("Read")[0])
+        garden = dict(self.garden_model.get_garden_data())
+        history = self.history()
+        stats = self.stats("Read")
+        
+        for _ in range(3):
+            self.assertEqual(self.habit_service.complete_habit("Read"), (False, "Habit already completed"))
+        
+        self.assertEqual(dict(self.garden_model.get_garden_data()), garden)
+        self.assertEqual(self.history(), history)
+        self.assertEqual(self.stats("Read"), stats)
+    
+    def test_rollover_keeps_capped_completions(self):
+        """The rollover closes the day with the capped completion kept and the other habit missed"""
+        with self.db:
+            self.db.execute('UPDATE Garden SET Daily_Water_Earned = 1000 WHERE Id = ?', (DEFAULT_GARDEN_ID,))
+        self.habit_service.complete_habit("Read")
+        day = self.habit_service.garden_day()
+        
+        clock = lambda: datetime.datetime.fromisoformat(WeatherModel(self.db, DEFAULT_GARDEN_ID).get_meta('global_last_run')) + datetime.timedelta(days=1, minutes=1)
+        TimeService(DEFAULT_GARDEN_ID, db=self.db, clock=clock).trigger_daily_updates()
+        
+        self.assertEqual(self.history(), [("Read", day.isoformat(), 1, 0), ("Run", day.isoformat(), 0, 0)])
+        self.assertEqual(self.stats("Read"), (1, 1, 1))
+        self.assertEqual(self.stats("Run"), (0, 0, 1))
+    
+    def test_active_habits_and_history_share_the_garden_day(self):
+        """A habit is active on the garden day's weekday and its completion is logged under that day"""
+        garden_day = datetime.date(2024, 1, 1)  # A Monday
+        with self.db:
+            WeatherModel(self.db, DEFAULT_GARDEN_ID).set_meta('global_last_run', datetime.datetime(2024, 1, 1, 12).isoformat())
+        self.habit_model.add_habit("Swim", 1, "Monday")
+        self.habit_model.add_habit("Walk", 1, "Tuesday")
+        
+        active, scheduled = self.habit_service.process_habits()
+        self.assertIn("Swim", [habit['name'] for habit in active])
+        self.assertIn("Walk", [habit['name'] for habit in scheduled])
+        
+        self.assertEqual(self.habit_service.complete_habit("Walk"), (False, "Habit not found in active habits"))
+        self.assertFalse(self.habit_model.get_habit("Walk")['Completed'])
+        
+        self.assertTrue(self.habit_service.complete_habit("Swim")[0])
+        self.assertEqual([row[:3] for row in self.history()], [("Swim", garden_day.isoformat(), 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import shutil
+import sqlite3
+import unittest
+from benchmarks.query_plans import capture_statements, plan_problems, query_plans
+
+class QueryPlanTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path, cls.statements = capture_statements()
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(os.path.dirname(cls.path), ignore_errors=True)
+    
+    def problems(self):
+        """The captured queries with table scans or unindexed sorts, mapped to the offending plan lines"""
+        problems = {}
+        for sql, plan in query_plans(self.path, self.statements):
+            if plan_problems(plan):
+                problems[' '.join(sql.split())] = plan_problems(plan)
+        return problems
+    
+    def test_hot_queries_use_indexes(self):
+        """Every query the hot paths run on the migrated schema is answered from an index"""
+        self.assertTrue(self.statements)
+        self.assertEqual(self.problems(), {})
+    
+    def test_missing_index_is_reported(self):
+        """Dropping an index the hot paths rely on shows up as a table scan"""
+        db = sqlite3.connect(self.path)
+        try:
+            db.execute('DROP INDEX Trees_Garden_Creation_Date')
+            problems = self.problems()
+        finally:
+            db.execute('CREATE INDEX Trees_Garden_Creation_Date ON Trees (Garden_Id, Creation_Date)')
+            db.close()
+        
+        self.assertTrue(any('FROM Trees' in sql for sql in problems), problems)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import random
+import unittest
+from array import array
+from config import (
+    DEFAULT_GARDEN_ID, MAX_MOISTURE, MOISTURE_HEALTHY_THRESHOLD, WATER_EFFICIENCY_REDUCTION,
+    WATER_TO_MOISTURE_RATIO, MOISTURE_BOOST_THRESHOLD, MOISTURE_BOOST_MULTIPLIER
+)
+from models import TreeModel, GardenModel
+from services import TreeService, TreeKernel
+from tests import DatabaseTestCase
+from tests.test_tree_update import calculate_daily_tree_state, plant_random_trees, random_weather, tree_rows
+
+TREES = 200000
+
+def calculate_water_efficiency(current_moisture):
+    """Share of the water a tree absorbs, as computed before the kernel, kept as the reference"""
+    if current_moisture > MOISTURE_HEALTHY_THRESHOLD:
+        excess_moisture = current_moisture - MOISTURE_HEALTHY_THRESHOLD
+        max_excess = MAX_MOISTURE - MOISTURE_HEALTHY_THRESHOLD
+        efficiency_penalty = (excess_moisture / max_excess) * WATER_EFFICIENCY_REDUCTION
+        return max(0.1, 1.0 - efficiency_penalty)
+    return 1.0
+
+def calculate_moisture_increase(current_moisture, water_amount):
+    """Moisture a watering adds, as computed before the kernel, kept as the reference"""
+    base_increase = water_amount / WATER_TO_MOISTURE_RATIO
+    if current_moisture < MOISTURE_BOOST_THRESHOLD:
+        base_increase *= MOISTURE_BOOST_MULTIPLIER
+    return base_increase
+
+def water_tree(tree_service, tree, amount):
+    """Return a tree's (water, stage, water_required, moisture) after a watering, as computed before the kernel"""
+    water, stage, water_required, moisture = tree
+    effective_water = int(amount * calculate_water_efficiency(moisture))
+    new_moisture = min(MAX_MOISTURE, moisture + calculate_moisture_increase(moisture, amount))
+    water, stage, water_required = tree_service.calculate_tree_growth(water + effective_water, stage, water_required)
+    return water, stage, water_required, int(new_moisture)
+
+def random_trees(rng, count):
+    return [
+        {'rowid': i, 'Moisture': rng.randint(0, 100), 'Water': rng.randint(0, 1000), 'Water_Required': rng.randint(1, 2000), 'Stage': rng.randint(1, 5)}
+        for i in range(count)
+    ]
+
+class TreeKernelTest(unittest.TestCase):
+    def test_advance_day_matches_reference(self):
+        """A day of weather on 200k random trees gives every tree the moisture and water of the old formula"""
+        rng = random.Random(0)
+        trees = random_trees(rng, TREES)
+        kernel = TreeKernel(trees)
+        
+        for _ in range(3):
+            weather = random_weather(rng)
+            kernel.advance_day(weather['Temperature'], weather['Humidity'], weather['State'])
+            for tree in trees:
+                tree['Moisture'], tree['Water'] = calculate_daily_tree_state(tree['Moisture'], tree['Water'], tree['Water_Required'], weather)
+            
+            self.assertEqual(kernel.moisture, array('q', [tree['Moisture'] for tree in trees]))
+            self.assertEqual(kernel.water, array('q', [tree['Water'] for tree in trees]))
+    
+    def test_water_trees_matches_reference(self):
+        """200k waterings, several per tree, grow and moisten every tree as the old per-tree watering did"""
+        rng = random.Random(1)
+        trees = random_trees(rng, TREES // 4)
+        kernel = TreeKernel(trees)
+        tree_service = TreeService(None, None)
+        
+        waterings = [(rng.randrange(len(trees)), rng.randint(1, 300)) for _ in range(TREES)]
+        kernel.water_trees(waterings)
+        
+        expected = [(tree['Water'], tree['Stage'], tree['Water_Required'], tree['Moisture']) for tree in trees]
+        for i, amount in waterings:
+            expected[i] = water_tree(tree_service, expected[i], amount)
+        
+        self.assertEqual([kernel.tree(i) for i in range(len(trees))], expected)
+    
+    def test_status_matches_thresholds(self):
+        """The label table gives every moisture level the label of the threshold chain"""
+        kernel = TreeKernel([{'rowid': 0, 'Moisture': 0, 'Water': 0, 'Water_Required': 1, 'Stage': 1}])
+        for moisture in range(MAX_MOISTURE + 1):
+            kernel.moisture[0] = moisture
+            self.assertEqual(kernel.status(0), kernel.tables.moisture_status(moisture))
+
+class TreeKernelDatabaseTest(DatabaseTestCase, unittest.TestCase):
+    def test_water_tree_matches_per_tree_sql(self):
+        """Watering through the kernel leaves the same Trees rows as the old per-tree update"""
+        db = self.open_database()
+        plant_random_trees(db, random.Random(2), 10)
+        tree_model = TreeModel(db, DEFAULT_GARDEN_ID)
+        tree_service = TreeService(tree_model, GardenModel(db, DEFAULT_GARDEN_ID))
+        with db:
+            db.execute('UPDATE Garden SET Water = ? WHERE Id = ?', (10 ** 9, DEFAULT_GARDEN_ID))
+        
+        rng = random.Random(2)
+        for _ in range(500):
+            tree_index, amount = rng.randrange(10), rng.randint(1, 300)
+            before = tree_model.get_tree_by_index(tree_index)
+            expected = water_tree(tree_service, (before['Water'], before['Stage'], before['Water_Required'], before['Moisture']), amount)
+            
+            self.assertEqual(tree_service.water_tree(tree_index, amount), (True, None))
+            after = tree_model.get_tree_by_index(tree_index)
+            self.assertEqual((after['Water'], after['Stage'], after['Water_Required'], after['Moisture']), expected)
+    
+    def test_water_trees_matches_single_waterings(self):
+        """One bulk watering leaves the same trees as the same waterings made one at a time"""
+        bulk_db = self.open_database('bulk.db')
+        single_db = self.open_database('single.db')
+        services = []
+        for db in (bulk_db, single_db):
+            plant_random_trees(db, random.Random(3), 10)
+            with db:
+                db.execute('UPDATE Garden SET Water = ? WHERE Id = ?', (10 ** 9, DEFAULT_GARDEN_ID))
+            services.append(TreeService(TreeModel(db, DEFAULT_GARDEN_ID), GardenModel(db, DEFAULT_GARDEN_ID)))
+        
+        rng = random.Random(3)
+        waterings = [(rng.randrange(10), rng.randint(1, 300)) for _ in range(200)]
+        self.assertEqual(services[0].water_trees(waterings), (True, None))
+        for tree_index, amount in waterings:
+            services[1].water_tree(tree_index, amount)
+        
+        strip_timestamps = lambda rows: [row[:6] + row[7:] for row in rows]
+        self.assertEqual(strip_timestamps(tree_rows(bulk_db)), strip_timestamps(tree_rows(single_db)))
+        self.assertEqual(GardenModel(bulk_db, DEFAULT_GARDEN_ID).get_garden_data()['Water'], GardenModel(single_db, DEFAULT_GARDEN_ID).get_garden_data()['Water'])
+
+if __name__ == '__main__':
+    unittest.main()
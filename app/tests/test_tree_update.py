@@ -0,0 +1,80 @@
+import random
+import unittest
+from config import (
+    DEFAULT_GARDEN_ID, MIN_MOISTURE, MAX_MOISTURE, HUMIDITY_INFLUENCE, TEMP_INFLUENCE, WEATHER_STATE_INFLUENCE,
+    DEFAULT_HUM, DEFAULT_TEMP, DEFAULT_STATE, MOISTURE_VERY_DRY_THRESHOLD, MOISTURE_DRY_THRESHOLD,
+    VERY_DRY_WATER_LOSS_PERCENTAGE, DRY_WATER_LOSS_PERCENTAGE
+)
+from models import TreeModel, GardenModel
+from services import TreeService
+from tests import DatabaseTestCase
+
+def calculate_daily_tree_state(previous_moisture, current_water, water_required, current_weather):
+    """The per-tree daily formula as it stood before the set-based update, kept as the reference"""
+    new_moisture = (
+        previous_moisture +
+        HUMIDITY_INFLUENCE * (current_weather['Humidity'] - DEFAULT_HUM) +
+        WEATHER_STATE_INFLUENCE * (current_weather['State'] - DEFAULT_STATE) -
+        TEMP_INFLUENCE * (current_weather['Temperature'] - DEFAULT_TEMP)
+    )
+    new_moisture = max(MIN_MOISTURE, min(MAX_MOISTURE, new_moisture))
+    
+    new_water = current_water
+    if new_moisture < MOISTURE_VERY_DRY_THRESHOLD:
+        new_water = max(0, current_water - int(water_required * VERY_DRY_WATER_LOSS_PERCENTAGE / 100))
+    elif new_moisture < MOISTURE_DRY_THRESHOLD:
+        new_water = max(0, current_water - int(water_required * DRY_WATER_LOSS_PERCENTAGE / 100))
+    
+    return int(new_moisture), new_water
+
+def per_tree_daily_update(tree_model, current_weather):
+    """The daily update as it stood before the set-based one: up to two committed UPDATEs per tree"""
+    db = tree_model.db
+    for tree in tree_model.get_trees_data():
+        new_moisture, new_water = calculate_daily_tree_state(
+            tree['Moisture'], tree['Water'], tree['Water_Required'], current_weather
+        )
+        with db:
+            db.execute('UPDATE Trees SET Moisture = ? WHERE rowid = ? AND Garden_Id = ?', (new_moisture, tree['rowid'], tree_model.garden_id))
+        if new_water != tree['Water']:
+            with db:
+                db.execute('UPDATE Trees SET Water = ? WHERE rowid = ? AND Garden_Id = ?', (new_water, tree['rowid'], tree_model.garden_id))
+
+def random_weather(rng):
+    return {'Temperature': rng.randint(-5, 35), 'Humidity': rng.randint(0, 100), 'State': rng.randint(0, 100)}
+
+def plant_random_trees(db, rng, count, garden_id=DEFAULT_GARDEN_ID):
+    """Plant count trees with random moisture, water and requirements"""
+    with db:
+        db.executemany('''
+            INSERT INTO Trees (Name, Creation_Date, Stage, Water, Water_Required, Last_Watered, Moisture, Garden_Id)
+            VALUES (?, ?, ?, ?, ?, '2024-01-01T00:00:00', ?, ?)
+        ''', [
+            (f"Tree {i}", f"2024-01-01T00:{i:02d}:00", rng.randint(1, 5), rng.randint(0, 200), rng.randint(1, 400), rng.randint(0, 100), garden_id)
+            for i in range(count)
+        ])
+
+def tree_rows(db):
+    return [tuple(row) for row in db.execute('SELECT rowid, * FROM Trees ORDER BY rowid')]
+
+class DailyTreeUpdateTest(DatabaseTestCase, unittest.TestCase):
+    def test_matches_per_tree_updates(self):
+        """Days of random weather leave the same trees whether written per tree or with one executemany"""
+        for seed in range(5):
+            old_db = self.open_database(f'old_{seed}.db')
+            new_db = self.open_database(f'new_{seed}.db')
+            for db in (old_db, new_db):
+                plant_random_trees(db, random.Random(seed), 10)
+            
+            old_model = TreeModel(old_db, DEFAULT_GARDEN_ID)
+            tree_service = TreeService(TreeModel(new_db, DEFAULT_GARDEN_ID), GardenModel(new_db, DEFAULT_GARDEN_ID))
+            
+            rng = random.Random(seed)
+            for day in range(200):
+                weather = random_weather(rng)
+                per_tree_daily_update(old_model, weather)
+                tree_service.daily_tree_update(weather)
+                self.assertEqual(tree_rows(old_db), tree_rows(new_db), f"seed {seed}, day {day}")
+
+if __name__ == '__main__':
+    unittest.main()